@@ -0,0 +1,91 @@
+"""Ingest admission control: per-key rate limits and a fair, alert-first scheduler.
+
+`TokenBuckets` keeps one float per device: the GCRA "theoretical arrival
+time", which behaves exactly like a token bucket of `burst` tokens refilled
+at `rate` per second. A key whose time is in the past has a full bucket, so
+those entries are dropped whenever the table grows.
+
+`FairScheduler` bounds how many windows are processed at once. When every
+slot is busy, waiters queue per key and slots are handed out round-robin
+across keys, so one chatty device cannot starve the rest. Alert windows have
+their own queue that is always served first and is never refused. Telemetry
+is refused once `max_queued` windows are waiting, and the caller answers 429.
+"""
+from __future__ import annotations
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Optional
+
+ALERT, TELEMETRY = 0, 1
+
+
+class TokenBuckets:
+    def __init__(self, rate: float, burst: int, prune_at: int = 10_000):
+        self.rate = rate
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.tolerance = (burst - 1) * self.interval
+        self.tat: Dict[str, float] = {}
+        self.prune_at = prune_at
+
+    def take(self, key: str, now: Optional[float] = None) -> float:
+        """Spend one token: 0.0 if admitted, else seconds until one is available."""
+        if self.rate <= 0:
+            return 0.0  # unlimited
+        now = time.monotonic() if now is None else now
+        tat = max(self.tat.get(key, now), now)
+        wait = tat - self.tolerance - now
+        if wait > 0:
+            return wait
+        self.tat[key] = tat + self.interval
+        if len(self.tat) > self.prune_at:
+            self.tat = {k: t for k, t in self.tat.items() if t > now}
+            self.prune_at = max(self.prune_at, 2 * len(self.tat))
+        return 0.0
+
+
+class FairScheduler:
+    def __init__(self, concurrency: int = 16, max_queued: int = 256):
+        self.free = concurrency
+        self.max_queued = max_queued
+        self.queues = (OrderedDict(), OrderedDict())  # per class: key -> deque of waiter futures
+        self.queued = [0, 0]
+
+    async def acquire(self, key: str, alert: bool) -> bool:
+        """Wait for a processing slot; False (telemetry only) if too many are already waiting."""
+        if self.free > 0 and not (self.queued[ALERT] or self.queued[TELEMETRY]):
+            self.free -= 1
+            return True
+        cls = ALERT if alert else TELEMETRY
+        if cls == TELEMETRY and self.queued[TELEMETRY] >= self.max_queued:
+            return False
+        fut = asyncio.get_running_loop().create_future()
+        queue: Optional[Deque[asyncio.Future]] = self.queues[cls].get(key)
+        if queue is None:
+            queue = self.queues[cls][key] = deque()
+        queue.append(fut)
+        self.queued[cls] += 1
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if not fut.cancelled():  # the slot was handed over just as we were cancelled
+                self.release()
+            raise
+        return True
+
+    def release(self):
+        """Hand the slot to the next waiter: alerts first, then one window per key in turn."""
+        for cls in (ALERT, TELEMETRY):
+            queues = self.queues[cls]
+            while queues:
+                key, queue = next(iter(queues.items()))
+                fut = queue.popleft()
+                self.queued[cls] -= 1
+                if queue:
+                    queues.move_to_end(key)
+                else:
+                    del queues[key]
+                if not fut.cancelled():
+                    fut.set_result(None)
+                    return
+        self.free += 1
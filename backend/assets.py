@@ -0,0 +1,115 @@
+"""Dashboard and static assets served from memory, precompressed, with ETags.
+
+Every file is read once, during startup warm-up or on first request, and
+gzip (and brotli, when the `brotli` package is installed) variants are built
+then, so a page load never touches disk or compresses anything. A client
+presenting a matching If-None-Match gets an empty 304. Edits to the files on
+disk are picked up on restart.
+
+Only content-addressed files (a hash in the name, like `app.3f9a1c2e.js`)
+get a long `max-age`; their URL changes whenever their bytes do. Everything
+else is `no-cache`, so browsers revalidate with the ETag on every use and
+pick up a deploy at once.
+"""
+from __future__ import annotations
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from typing import Dict, Optional
+
+from fastapi import HTTPException
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+MIN_COMPRESS = 256  # smaller bodies are sent as-is
+HASHED = re.compile(r"[.-][0-9a-fA-F]{8,}\.[^.]+$")  # name.<hash>.ext or name-<hash>.ext
+COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+
+def _accepts(accept_encoding: str, coding: str) -> bool:
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip() == coding:
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class Asset:
+    __slots__ = ("body", "encoded", "etag", "media_type", "cache_control")
+
+    def __init__(self, body: bytes, media_type: str, cache_control: str):
+        self.body = body
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.etag = '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+        self.encoded: Dict[str, bytes] = {}  # best encoding first
+        if len(body) >= MIN_COMPRESS and media_type.startswith(COMPRESSIBLE):
+            if brotli is not None:
+                self.encoded["br"] = brotli.compress(body, quality=11)
+            self.encoded["gzip"] = gzip.compress(body, 9, mtime=0)
+            self.encoded = {k: v for k, v in self.encoded.items() if len(v) < len(body)}
+
+    @classmethod
+    def load(cls, path: str, cache_control: str) -> "Asset":
+        with open(path, "rb") as f:
+            body = f.read()
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if media_type.startswith("text/"):
+            media_type += "; charset=utf-8"
+        return cls(body, media_type, cache_control)
+
+    def response(self, request_headers: Headers) -> Response:
+        headers = {"ETag": self.etag, "Cache-Control": self.cache_control, "Vary": "Accept-Encoding"}
+        if_none_match = request_headers.get("if-none-match", "")
+        if if_none_match.strip() == "*" or self.etag in (t.strip().removeprefix("W/") for t in if_none_match.split(",")):
+            return Response(status_code=304, headers=headers)
+        accept = request_headers.get("accept-encoding", "")
+        for coding, body in self.encoded.items():
+            if _accepts(accept, coding):
+                return Response(body, media_type=self.media_type, headers={**headers, "Content-Encoding": coding})
+        return Response(self.body, media_type=self.media_type, headers=headers)
+
+
+def load_dir(directory: str, hashed_cache_control: str) -> Dict[str, Asset]:
+    """Every file under `directory`, keyed by normalized relative path."""
+    assets = {}
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            cache_control = hashed_cache_control if HASHED.search(name) else "no-cache"
+            assets[os.path.normpath(os.path.relpath(path, directory))] = Asset.load(path, cache_control)
+    return assets
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles mount that serves the in-memory `Asset` table instead of opening files per request."""
+
+    def __init__(self, directory: str, max_age: int = 86400):
+        super().__init__(directory=directory, html=True)
+        self.cache_control = f"public, max-age={max_age}, immutable"  # content-addressed files only
+        self.assets: Optional[Dict[str, Asset]] = None
+
+    def load(self):
+        if self.assets is None:
+            self.assets = load_dir(self.directory, self.cache_control)
+        return self
+
+    def lookup(self, path: str) -> Optional[Asset]:
+        assets = self.load().assets
+        return assets.get(path) or assets.get(os.path.normpath(os.path.join(path, "index.html")))
+
+    async def get_response(self, path: str, scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405)
+        asset = self.lookup(path)
+        if asset is None:
+            raise HTTPException(status_code=404)
+        return asset.response(Headers(scope=scope))
@@ -0,0 +1,129 @@
+"""Per-patient mobility baselines with streaming drift detection.
+
+Each resident's walking bouts and sit/lie-to-stand transfers are reduced to
+one observation apiece (gait velocity, step rate, transfer time). Every
+metric keeps a slow EWMA mean/variance as the personal baseline and a fast
+EWMA of recent behaviour; drift is flagged when the fast mean sits more than
+Z_LIMIT standard errors from the baseline (an EWMA control chart). State is a
+handful of floats per metric, and each frame costs O(1).
+"""
+from __future__ import annotations
+import math
+import time
+from typing import Dict, List, Optional
+
+from backend.rollups import frame_epoch
+
+ALPHA_SLOW = 0.02   # ~50-observation memory: the personal baseline
+ALPHA_FAST = 0.2    # ~5-observation memory: recent behaviour
+WARMUP = 30         # observations before drift is reported
+Z_LIMIT = 3.0
+UPRIGHT_DEG, SEATED_DEG = 75.0, 30.0
+MAX_TRANSFER_S = 60.0
+# Direction that means deterioration: slower gait, slower cadence, longer transfers.
+ADVERSE = {"gait_velocity": -1, "step_rate": -1, "transfer_time": 1}
+LABELS = {"gait_velocity": "Gait velocity", "step_rate": "Step rate", "transfer_time": "Transfer time"}
+
+
+class EwmaDrift:
+    __slots__ = ("n", "mean", "var", "recent")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.var = 0.0
+        self.recent = 0.0
+
+    def update(self, x: float):
+        self.n += 1
+        if self.n == 1:
+            self.mean = self.recent = x
+            return
+        # Plain running mean/variance (Welford) until the EWMA window is filled, so early values are not overweighted.
+        alpha = max(1.0 / self.n, ALPHA_SLOW)
+        d = x - self.mean
+        self.mean += alpha * d
+        self.var = (1 - alpha) * (self.var + alpha * d * d)
+        self.recent += ALPHA_FAST * (x - self.recent)
+
+    @property
+    def z(self) -> float:
+        """Recent mean vs baseline, in standard errors of the fast EWMA."""
+        if self.n < WARMUP or self.var <= 0:
+            return 0.0
+        return (self.recent - self.mean) / math.sqrt(self.var * ALPHA_FAST / (2 - ALPHA_FAST))
+
+    def to_api(self) -> dict:
+        return {"n": self.n, "baseline_mean": self.mean, "baseline_std": math.sqrt(self.var),
+                "recent_mean": self.recent, "z": self.z}
+
+
+class PatientBaseline:
+    __slots__ = ("metrics", "drifting", "bout_steps", "bout_velocity", "bout_n", "bout_velocity_n", "seated_at", "was_seated")
+
+    def __init__(self):
+        self.metrics = {name: EwmaDrift() for name in ADVERSE}
+        self.drifting: Dict[str, bool] = dict.fromkeys(ADVERSE, False)
+        self.bout_steps = self.bout_velocity = 0.0
+        self.bout_n = self.bout_velocity_n = 0
+        self.seated_at: Optional[float] = None
+        self.was_seated = False
+
+    def frame(self, t: float, posture_deg: float, step_rate: float, gait_velocity: Optional[float]):
+        if step_rate > 0:
+            self.bout_steps += step_rate
+            self.bout_n += 1
+            if gait_velocity:
+                self.bout_velocity += gait_velocity
+                self.bout_velocity_n += 1
+        elif self.bout_n:
+            self._end_bout()
+        if posture_deg < SEATED_DEG:
+            self.seated_at, self.was_seated = t, True
+        elif posture_deg >= UPRIGHT_DEG and self.was_seated:
+            # Last seated frame to first upright frame; long gaps are not transfers.
+            self.was_seated = False
+            if 0 < t - self.seated_at <= MAX_TRANSFER_S:
+                self.metrics["transfer_time"].update(t - self.seated_at)
+
+    def _end_bout(self):
+        self.metrics["step_rate"].update(self.bout_steps / self.bout_n)
+        if self.bout_velocity_n:
+            self.metrics["gait_velocity"].update(self.bout_velocity / self.bout_velocity_n)
+        self.bout_steps = self.bout_velocity = 0.0
+        self.bout_n = self.bout_velocity_n = 0
+
+    def new_drift(self) -> List[str]:
+        """Narrative lines for metrics that have just started drifting adversely."""
+        out = []
+        for name, stat in self.metrics.items():
+            z = stat.z
+            drifting = z * ADVERSE[name] > Z_LIMIT
+            if drifting and not self.drifting[name]:
+                word = "above" if z > 0 else "below"
+                out.append(f"{LABELS[name]} drifting {word} personal baseline ({stat.recent:.2f} vs {stat.mean:.2f}, z={z:.1f})")
+            self.drifting[name] = drifting
+        return out
+
+    def to_api(self) -> dict:
+        return {name: {**stat.to_api(), "drifting": self.drifting[name]} for name, stat in self.metrics.items()}
+
+
+class BaselineTracker:
+    def __init__(self):
+        self.patients: Dict[str, PatientBaseline] = {}
+
+    def observe(self, patient_id: str, frames, now: Optional[float] = None) -> List[str]:
+        """Fold a window into the patient's baseline; returns narrative lines for newly detected drift."""
+        now = time.time() if now is None else now
+        baseline = self.patients.get(patient_id)
+        if baseline is None:
+            baseline = self.patients[patient_id] = PatientBaseline()
+        for f in frames:
+            baseline.frame(frame_epoch(f.timestamp, now), f.posture_angle_deg, f.step_rate_hz or 0.0,
+                           getattr(f, "gait_velocity_mps", None))
+        return baseline.new_drift()
+
+    def get(self, patient_id: str) -> Optional[dict]:
+        baseline = self.patients.get(patient_id)
+        return baseline.to_api() if baseline else None
@@ -0,0 +1,183 @@
+"""Minimal Unix-socket pub/sub broker for fanning messages out across workers.
+
+Frames are a 4-byte big-endian length followed by `topic\\n payload`. Every
+frame a client publishes is forwarded to all other clients; a slow client
+has frames dropped rather than holding up the rest.
+
+With `uvicorn --workers N` no separate process is needed: each worker's
+BrokerClient tries to bind the socket first, so whichever worker wins hosts
+the broker, and the rest connect to it. If the host worker exits, the others
+reconnect and one of them takes over. It can also run standalone:
+
+    python -m backend.broker /tmp/hakilix-broker.sock
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import fcntl
+import logging
+import os
+import struct
+import tempfile
+from typing import Awaitable, Callable, Optional, Set
+
+logger = logging.getLogger("Backend.Broker")
+
+HEADER = struct.Struct(">I")
+MAX_FRAME = 16 * 1024 * 1024
+HIGH_WATER = 4 * 1024 * 1024  # bytes buffered for one client before its frames are dropped
+DEFAULT_PATH = os.path.join(tempfile.gettempdir(), "hakilix-broker.sock")
+
+
+def encode(topic: str, payload: bytes) -> bytes:
+    body = topic.encode() + b"\n" + payload
+    return HEADER.pack(len(body)) + body
+
+
+async def read_frame(reader: asyncio.StreamReader) -> bytes:
+    (n,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+    if n > MAX_FRAME:
+        raise ValueError(f"frame of {n} bytes exceeds limit")
+    return await reader.readexactly(n)
+
+
+class BrokerServer:
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self.clients: Set[asyncio.StreamWriter] = set()
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.dropped = 0
+
+    async def start(self):
+        """Bind the socket, replacing a stale one; raises OSError if a live broker already owns it."""
+        # Serialize the stale-check-then-bind so two workers cannot both unlink and bind.
+        # Non-blocking: whoever loses raises BlockingIOError and just connects to the winner.
+        with open(self.path + ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            if os.path.exists(self.path):
+                try:
+                    _, w = await asyncio.open_unix_connection(self.path)
+                    w.close()
+                    raise FileExistsError(f"broker already running at {self.path}")
+                except (ConnectionRefusedError, FileNotFoundError):
+                    os.unlink(self.path)
+            self.server = await asyncio.start_unix_server(self._serve, self.path)
+        logger.info("Broker listening on %s", self.path)
+        return self
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.clients.add(writer)
+        try:
+            while True:
+                body = await read_frame(reader)
+                frame = HEADER.pack(len(body)) + body
+                for other in self.clients:
+                    if other is writer:
+                        continue
+                    if other.transport.get_write_buffer_size() > HIGH_WATER:
+                        self.dropped += 1
+                    else:
+                        other.write(frame)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+            for w in list(self.clients):
+                w.close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+
+class BrokerClient:
+    """Publishes to and receives from the broker, hosting it if nobody else is."""
+
+    def __init__(self, on_message: Callable[[str, bytes], Awaitable[None]], path: str = DEFAULT_PATH, host: bool = True):
+        self.path = path
+        self.on_message = on_message
+        self.host = host
+        self.server: Optional[BrokerServer] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.connected = asyncio.Event()
+        self.dropped = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def _run(self):
+        backoff = 0.05
+        while True:
+            if self.host and self.server is None:
+                try:
+                    self.server = await BrokerServer(self.path).start()
+                except OSError:
+                    pass
+            try:
+                reader, self.writer = await asyncio.open_unix_connection(self.path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 2.0)
+                continue
+            backoff = 0.05
+            self.connected.set()
+            try:
+                while True:
+                    topic, _, payload = (await read_frame(reader)).partition(b"\n")
+                    try:
+                        await self.on_message(topic.decode(), payload)
+                    except Exception:
+                        logger.exception("Broker message handler failed")
+            except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+                logger.warning("Lost broker connection at %s; reconnecting", self.path)
+            finally:
+                self.connected.clear()
+                self.writer.close()
+                self.writer = None
+
+    def publish(self, topic: str, payload: bytes):
+        """Fire and forget; dropped (and counted) while disconnected or backed up."""
+        w = self.writer
+        if w is None or w.transport.get_write_buffer_size() > HIGH_WATER:
+            self.dropped += 1
+            return
+        w.write(encode(topic, payload))
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self.writer is not None:
+            self.writer.close()
+        if self.server is not None:
+            await self.server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Standalone Hakilix pub/sub broker")
+    parser.add_argument("path", nargs="?", default=os.environ.get("HAKILIX_BROKER_SOCKET", DEFAULT_PATH))
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    async def serve():
+        await BrokerServer(args.path).start()
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Compact in-memory event log and its serialization fast path.
+
+Events live in a columnar ring buffer (one fixed-width NumPy row per event,
+with interned patient ids and labels, 16-byte uuids and epoch-ms timestamps).
+API-shaped dicts and JSON are materialized only at the edge of the API. The
+JSON encoded at creation is kept for the most recent events so the ingest
+response, WebSocket and listings reuse it.
+
+NumPy is the largest import on the server's startup path, so it is imported
+and the ring allocated on first use; the server preloads it in the
+background once it is ready.
+"""
+from __future__ import annotations
+import json
+import sys
+import uuid
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback: compact separators, same output shape
+    orjson = None
+
+
+def _default(obj):
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    def dumps(obj) -> bytes:
+        return orjson.dumps(obj, default=_default)
+    loads = orjson.loads
+else:
+    def dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), default=_default).encode("utf-8")
+    loads = json.loads
+
+
+class Interner:
+    """Bidirectional str <-> small int table; codes are stable for the process lifetime."""
+
+    def __init__(self, values: Iterable[str] = ()):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+        for v in values:
+            self.code(v)
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(sys.intern(value))
+        return code
+
+    def __getitem__(self, code: int) -> str:
+        return self.values[code]
+
+
+EVENT_FIELDS = [
+    ("uid", "V16"),
+    ("ts_ms", "<i8"),
+    ("activity_ts_ms", "<i8"),
+    ("patient", "<i4"),
+    ("type", "u1"),
+    ("severity", "u1"),
+    ("label", "u1"),
+    ("flags", "u1"),
+    ("confidence", "<f8"),
+    ("activity_confidence", "<f8"),
+    ("time_to_recover", "<f8"),
+]
+IS_FALL, VW_REVIEW, POTENTIAL_RISK, HAS_RECOVERY = 1, 2, 4, 8
+
+
+def preload():
+    """Import NumPy ahead of the first event; blocking, so call it off the event loop."""
+    import numpy  # noqa: F401
+
+
+def to_ms(dt: datetime) -> int:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+def ms_to_iso(ms: int) -> str:
+    return datetime.fromtimestamp(ms / 1000, timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+class EventLog:
+    """Fixed-capacity ring of events addressed by a monotonically increasing sequence number."""
+
+    def __init__(self, capacity: int = 100_000, body_cache: int = 1024):
+        self.capacity = capacity
+        self._rows = None  # allocated on first use
+        self.patients = Interner()
+        self.types = Interner(("TELEMETRY", "CRITICAL_FALL"))
+        self.severities = Interner(("LOW", "MEDIUM", "HIGH"))
+        self.labels = Interner(("unknown", "sleeping", "idle", "active", "walking"))
+        self.seq = 0                 # next sequence number
+        self._extra: Dict[int, tuple] = {}   # seq -> (reasons, narrative, details); only when non-empty
+        self._bodies: Dict[int, bytes] = {}  # seq -> JSON for the newest `body_cache` events
+        self.body_cache = min(body_cache, capacity)
+
+    @property
+    def rows(self):
+        if self._rows is None:
+            import numpy as np
+            self._rows = np.zeros(self.capacity, dtype=np.dtype(EVENT_FIELDS))
+        return self._rows
+
+    def __len__(self):
+        return min(self.seq, self.capacity)
+
+    @property
+    def oldest(self) -> int:
+        return self.seq - len(self)
+
+    def append(self, patient_id: str, type: str, ts: datetime, fall, activity, details: Optional[dict] = None) -> int:
+        """Store one event from a FallDetectionResult/ActivityState pair; returns its sequence number."""
+        seq = self.seq
+        self._extra.pop(seq - self.capacity, None)
+        flags = (IS_FALL if fall.is_fall else 0) | (VW_REVIEW if fall.flag_virtual_ward_review else 0) \
+            | (POTENTIAL_RISK if activity.is_potential_risk else 0) | (HAS_RECOVERY if fall.time_to_recover_seconds is not None else 0)
+        self.rows[seq % self.capacity] = (
+            uuid.uuid4().bytes, to_ms(ts), to_ms(activity.timestamp), self.patients.code(patient_id),
+            self.types.code(type), self.severities.code(fall.severity), self.labels.code(activity.label), flags,
+            fall.confidence, activity.confidence, fall.time_to_recover_seconds or 0.0,
+        )
+        if fall.reason or activity.narrative or details:
+            self._extra[seq] = (tuple(fall.reason), tuple(activity.narrative), details or {})
+        self.seq = seq + 1
+        return seq
+
+    def _row(self, seq: int):
+        if not self.oldest <= seq < self.seq:
+            raise KeyError(seq)
+        return self.rows[seq % self.capacity]
+
+    def patient_id(self, seq: int) -> str:
+        return self.patients[int(self._row(seq)["patient"])]
+
+    def type(self, seq: int) -> str:
+        return self.types[int(self._row(seq)["type"])]
+
+    def to_dict(self, seq: int) -> dict:
+        """Materialize one event in the PatientEvent shape."""
+        (uid, ts_ms, act_ms, patient, type_, severity, label, flags, conf, act_conf, ttr) = self._row(seq).tolist()
+        reasons, narrative, details = self._extra.get(seq, ((), (), {}))
+        return {
+            "id": str(uuid.UUID(bytes=bytes(uid))),
+            "patient_id": self.patients[patient],
+            "timestamp": ms_to_iso(ts_ms),
+            "type": self.types[type_],
+            "details": details,
+            "activity": {"timestamp": ms_to_iso(act_ms), "label": self.labels[label], "confidence": act_conf,
+                         "is_potential_risk": bool(flags & POTENTIAL_RISK), "narrative": list(narrative)},
+            "fall": {"is_fall": bool(flags & IS_FALL), "confidence": conf, "severity": self.severities[severity],
+                     "reason": list(reasons), "flag_virtual_ward_review": bool(flags & VW_REVIEW),
+                     "time_to_recover_seconds": ttr if flags & HAS_RECOVERY else None},
+        }
+
+    def json(self, seq: int) -> bytes:
+        body = self._bodies.get(seq)
+        if body is None:
+            body = dumps(self.to_dict(seq))
+            if seq >= self.seq - self.body_cache:
+                self._bodies[seq] = body
+                self._bodies.pop(seq - self.body_cache, None)
+        return body
+
+    def recent(self, limit: int, patient_id: Optional[str] = None) -> Iterator[int]:
+        """Sequence numbers newest first, optionally for one patient."""
+        if limit <= 0:
+            return iter(())
+        if patient_id is None:
+            return iter(range(self.seq - 1, max(self.oldest, self.seq - limit) - 1, -1))
+        code = self.patients.codes.get(patient_id)
+        if code is None:
+            return iter(())
+        import numpy as np
+        seqs = np.flatnonzero(self.rows["patient"][:len(self)] == code)
+        if self.seq > self.capacity:
+            # Slots at or after the write head belong to the previous lap of the ring.
+            head = self.seq % self.capacity
+            seqs = np.where(seqs < head, seqs, seqs - self.capacity) + (self.seq - head)
+        return iter(np.sort(seqs)[::-1][:limit].tolist())
+
+
+def join_array(bodies: Iterable[bytes]) -> bytes:
+    """JSON array from already-encoded elements, without re-encoding them."""
+    return b"[" + b",".join(bodies) + b"]"
@@ -0,0 +1,171 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+Updates are plain dict/list arithmetic on the event-loop thread; gauges that
+mirror existing state (buffer occupancy, socket counts) are callbacks that only
+run when /metrics is scraped.
+"""
+from __future__ import annotations
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+REGISTRY: List["_Metric"] = []
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+STAGE_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01, 0.05)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labels)
+        REGISTRY.append(self)
+
+    def _labels(self, values: Tuple[str, ...], extra: str = "") -> str:
+        parts = [f'{k}="{_escape(str(v))}"' for k, v in zip(self.labelnames, values)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Exposition lines for the current values."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self):
+        return [f"{self.name}{self._labels(k)} {_fmt(v)}" for k, v in self._values.items()]
+
+
+class Gauge(_Metric):
+    """Set explicitly, or pass `fn` returning a number (or {labels: number}) evaluated at scrape time."""
+    kind = "gauge"
+
+    def __init__(self, name, help, labels=(), fn: Optional[Callable] = None):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self.fn = fn
+
+    def set(self, value: float, *labels: str):
+        self._values[labels] = value
+
+    def samples(self):
+        values = self._values
+        if self.fn is not None:
+            got = self.fn()
+            values = got if isinstance(got, dict) else {(): got}
+        return [f"{self.name}{self._labels(k)} {_fmt(v)}" for k, v in values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    @contextmanager
+    def time(self, *labels: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, *labels)
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def samples(self):
+        out = []
+        for labels, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = 'le="%s"' % _fmt(bound)
+                out.append(f"{self.name}_bucket{self._labels(labels, le)} {cumulative}")
+            out.append(f"{self.name}_sum{self._labels(labels)} {_fmt(total)}")
+            out.append(f"{self.name}_count{self._labels(labels)} {cumulative}")
+        return out
+
+
+def render() -> str:
+    return "\n".join(m.render() for m in REGISTRY) + "\n"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-endpoint latency by route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            REQUEST_LATENCY.observe(time.perf_counter() - t0, scope["method"], path, str(status[0]))
+
+
+# --- Backend metrics ---
+REQUEST_LATENCY = Histogram("hakilix_http_request_duration_seconds", "HTTP request latency by endpoint.", ("method", "path", "status"))
+INGEST_FRAMES = Counter("hakilix_ingest_frames_total", "Sensor frames ingested per patient.", ("patient_id",))
+INGEST_DUPLICATES = Counter("hakilix_ingest_duplicates_total", "Retried windows dropped by sequence number.")
+INGEST_CONFLICTS = Counter("hakilix_ingest_state_conflicts_total", "Windows rerun because another worker saved the resident's state first (shared mode).")
+INGEST_THROTTLED = Counter("hakilix_ingest_throttled_total", "Telemetry windows refused (HTTP) or delayed (streams) by admission control.", ("reason",))
+INGEST_WINDOWS = Counter("hakilix_ingest_windows_total", "Sensor windows ingested per patient.", ("patient_id",))
+STAGE_LATENCY = Histogram("hakilix_analytics_stage_seconds", "Ingest analytics stage timings.", ("stage",), buckets=STAGE_BUCKETS)
+ALERTS = Counter("hakilix_alerts_total", "Alerts raised by severity.", ("severity",))
+WS_DROPPED = Counter("hakilix_ws_dropped_messages_total", "Broadcasts dropped because a client send queue was full.")
@@ -0,0 +1,137 @@
+"""Embedded MQTT 3.1.1 broker stand-in for development and tests.
+
+Enough of a mosquitto substitute for the uplink: QoS 0/1, `+`/`#` wildcards,
+keepalive pings, and persistent sessions (clean session off) whose unacked
+QoS 1 messages are resent when the client reconnects. Sessions live in
+memory only. There are no retained messages, wills, QoS 2, shared
+subscriptions or authentication; use a real broker in production.
+
+    python -m backend.mqtt_broker --port 1883
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from common import mqtt
+
+logger = logging.getLogger("Backend.MQTTBroker")
+
+MAX_INFLIGHT = 10_000  # unacked messages kept per persistent session; the oldest are dropped beyond this
+
+
+class _Session:
+    __slots__ = ("client_id", "writer", "clean", "filters", "next_id", "inflight")
+
+    def __init__(self, client_id: str, writer: asyncio.StreamWriter, clean: bool = True):
+        self.client_id = client_id
+        self.writer: Optional[asyncio.StreamWriter] = writer  # None while a persistent session is offline
+        self.clean = clean
+        self.filters: List[Tuple[str, int]] = []
+        self.next_id = 0
+        self.inflight: "OrderedDict[int, Tuple[str, bytes]]" = OrderedDict()  # QoS 1 deliveries awaiting PUBACK
+
+    def deliver(self, topic: str, payload: bytes, qos: int):
+        granted = max((q for f, q in self.filters if mqtt.topic_matches(f, topic)), default=None)
+        if granted is None:
+            return
+        qos = min(qos, granted)
+        if qos:
+            self.next_id = self.next_id % 65535 + 1
+            if not self.clean:
+                self.inflight[self.next_id] = (topic, payload)
+                if len(self.inflight) > MAX_INFLIGHT:
+                    self.inflight.popitem(last=False)
+        if self.writer is not None:
+            self.writer.write(mqtt.publish(topic, payload, qos, self.next_id))
+
+
+class MiniBroker:
+    def __init__(self, host: str = "127.0.0.1", port: int = 1883):
+        self.host, self.port = host, port
+        self.sessions: Dict[str, _Session] = {}
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]  # resolves port 0
+        logger.info("MQTT broker stand-in on %s:%d", self.host, self.port)
+        return self
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        session = None
+        try:
+            ptype, _, body = await mqtt.read_packet_async(reader)
+            if ptype != mqtt.CONNECT:
+                return
+            client_id, clean = mqtt.parse_connect(body)
+            old = self.sessions.get(client_id)
+            if old is not None and old.writer is not None:  # a reconnecting client takes over its id
+                old.writer.close()
+            if old is not None and not clean:  # resume: keep the subscriptions and resend what was not acked
+                session, session.writer, session.clean = old, writer, False
+            else:
+                session = self.sessions[client_id] = _Session(client_id, writer, clean)
+            writer.write(mqtt.connack(0))
+            for packet_id, (topic, payload) in session.inflight.items():
+                writer.write(mqtt.publish(topic, payload, 1, packet_id, dup=True))
+            while True:
+                ptype, flags, body = await mqtt.read_packet_async(reader)
+                if ptype == mqtt.PUBLISH:
+                    topic, packet_id, payload, qos, _ = mqtt.parse_publish(flags, body)
+                    for other in list(self.sessions.values()):
+                        other.deliver(topic, payload, qos)
+                    if qos:
+                        writer.write(mqtt.puback(packet_id))
+                elif ptype == mqtt.PUBACK:
+                    session.inflight.pop(int.from_bytes(body[:2], "big"), None)
+                elif ptype == mqtt.SUBSCRIBE:
+                    packet_id, filters = mqtt.parse_subscribe(body)
+                    granted = [min(q, 1) for _, q in filters]
+                    session.filters.extend((f, g) for (f, _), g in zip(filters, granted))
+                    writer.write(mqtt.suback(packet_id, granted))
+                elif ptype == mqtt.PINGREQ:
+                    writer.write(mqtt.PINGRESP_PACKET)
+                elif ptype == mqtt.DISCONNECT:
+                    return
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, mqtt.MqttError):
+            pass
+        finally:
+            if session is not None and session.writer is writer:
+                session.writer = None
+                if session.clean and self.sessions.get(session.client_id) is session:
+                    del self.sessions[session.client_id]
+            writer.close()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            for s in list(self.sessions.values()):
+                if s.writer is not None:
+                    s.writer.close()
+            await self.server.wait_closed()
+            self.server = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Embedded MQTT broker stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1883)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    async def serve():
+        await MiniBroker(args.host, args.port).start()
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
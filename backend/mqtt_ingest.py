@@ -0,0 +1,118 @@
+"""MQTT subscriber that feeds edge uplink batches into the ingest pipeline.
+
+Subscribes to `hakilix/+/windows` with QoS 1 on a persistent session (clean
+session off, stable client id). Each message is one window or a JSON array
+of windows. PUBACK is sent only after every window in the message has been
+processed. If one fails, the subscriber drops the connection without acking,
+so the broker redelivers the message on reconnect, and the per-device
+sequence numbers turn the windows that did get through into cheap
+duplicates. A message that fails MAX_ATTEMPTS times is logged and acked, so
+one bad message cannot stall the subscription.
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import socket
+from typing import Awaitable, Callable, Dict, Optional
+
+from backend import events
+from common import mqtt
+
+logger = logging.getLogger("Backend.MQTT")
+
+TOPIC = "hakilix/+/windows"
+MAX_ATTEMPTS = 3
+
+
+class MqttIngest:
+    def __init__(self, handler: Callable[[dict], Awaitable[None]], host: str, port: int = 1883,
+                 topic: str = TOPIC, client_id: Optional[str] = None, keepalive: int = 60):
+        self.handler = handler
+        self.host, self.port = host, port
+        self.topic = topic
+        self.client_id = client_id or f"hakilix-backend-{socket.gethostname()}"
+        self.keepalive = keepalive
+        self.connected = asyncio.Event()
+        self.messages = 0
+        self.attempts: Dict[int, int] = {}  # hash of a failing message -> deliveries so far
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def _run(self):
+        backoff = 0.1
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError as e:
+                logger.warning("MQTT broker %s:%d unreachable: %s", self.host, self.port, e)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 10.0)
+                continue
+            pinger = None
+            try:
+                writer.write(mqtt.connect(self.client_id, self.keepalive, clean=False))
+                ptype, _, body = await mqtt.read_packet_async(reader)
+                if ptype != mqtt.CONNACK or body[1] != 0:
+                    raise mqtt.MqttError("connection refused")
+                writer.write(mqtt.subscribe(1, [(self.topic, 1)]))
+                backoff = 0.1
+                pinger = asyncio.create_task(self._ping(writer))
+                while True:
+                    ptype, flags, body = await mqtt.read_packet_async(reader)
+                    if ptype == mqtt.SUBACK:
+                        self.connected.set()
+                        logger.info("MQTT ingest subscribed to %s on %s:%d", self.topic, self.host, self.port)
+                    elif ptype == mqtt.PUBLISH:
+                        topic, packet_id, payload, qos, _ = mqtt.parse_publish(flags, body)
+                        if not await self._handle(topic, payload) and qos:
+                            raise mqtt.MqttError("window processing failed, leaving the message unacked for redelivery")
+                        if qos:
+                            writer.write(mqtt.puback(packet_id))
+            except (asyncio.IncompleteReadError, ConnectionError, mqtt.MqttError) as e:
+                logger.warning("MQTT ingest connection lost (%s); reconnecting", e)
+            finally:
+                self.connected.clear()
+                if pinger is not None:
+                    pinger.cancel()
+                writer.close()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 10.0)
+
+    async def _ping(self, writer):
+        while True:
+            await asyncio.sleep(self.keepalive / 2)
+            writer.write(mqtt.PINGREQ_PACKET)
+
+    async def _handle(self, topic: str, payload: bytes) -> bool:
+        """Process every window in a message; False if one failed and the message should be redelivered."""
+        self.messages += 1
+        try:
+            data = events.loads(payload)
+        except ValueError:
+            logger.warning("Dropping undecodable MQTT message on %s", topic)
+            return True
+        for window in data if isinstance(data, list) else (data,):
+            try:
+                await self.handler(window)
+            except Exception:
+                key = hash((topic, payload))
+                attempts = self.attempts[key] = self.attempts.get(key, 0) + 1
+                if attempts < MAX_ATTEMPTS:
+                    logger.exception("MQTT window from %s failed (attempt %d); awaiting redelivery", topic, attempts)
+                    return False
+                logger.exception("MQTT message from %s failed %d times; dropping it", topic, attempts)
+                del self.attempts[key]
+                return True
+        self.attempts.pop(hash((topic, payload)), None)
+        return True
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
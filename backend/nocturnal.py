@@ -0,0 +1,97 @@
+"""Night-time bed exits and bathroom visits, counted incrementally from the frame stream.
+
+Per resident the tracker keeps the previous frame's zone/in-bed state, the
+counters for the night in progress and a short ring of finished nights, so
+risk scoring reads a counter instead of rescanning history.
+"""
+from __future__ import annotations
+import os
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Deque, Dict, Optional
+
+from backend.rollups import frame_epoch
+
+# Hours are UTC (the deployment is UK-based, so this is within an hour of local time).
+NIGHT_START_HOUR = int(os.environ.get("HAKILIX_NIGHT_START_HOUR", 22))
+NIGHT_END_HOUR = int(os.environ.get("HAKILIX_NIGHT_END_HOUR", 7))
+HISTORY_NIGHTS = 14
+BATHROOM = "bathroom"
+
+
+def night_of(t: float) -> Optional[str]:
+    """Date the night started on (YYYY-MM-DD), or None during the day."""
+    dt = datetime.fromtimestamp(t, timezone.utc)
+    if dt.hour >= NIGHT_START_HOUR:
+        return dt.date().isoformat()
+    if dt.hour < NIGHT_END_HOUR:
+        return (dt.date() - timedelta(days=1)).isoformat()
+    return None
+
+
+class NightCounts:
+    __slots__ = ("night", "bed_exits", "bathroom_visits")
+
+    def __init__(self, night: str):
+        self.night = night
+        self.bed_exits = 0
+        self.bathroom_visits = 0
+
+    def to_api(self) -> dict:
+        return {"night": self.night, "bed_exits": self.bed_exits, "bathroom_visits": self.bathroom_visits}
+
+
+class PatientNights:
+    __slots__ = ("in_bed", "zone", "current", "history")
+
+    def __init__(self):
+        self.in_bed: Optional[bool] = None
+        self.zone: Optional[str] = None
+        self.current: Optional[NightCounts] = None
+        self.history: Deque[NightCounts] = deque(maxlen=HISTORY_NIGHTS)
+
+    def frame(self, t: float, zone: Optional[str], in_bed: bool):
+        night = night_of(t)
+        if self.current is not None and self.current.night != night:
+            self.history.append(self.current)
+            self.current = None
+        if night is not None:
+            if self.current is None:
+                self.current = NightCounts(night)
+            if self.in_bed and not in_bed:
+                self.current.bed_exits += 1
+            if zone == BATHROOM and self.zone is not None and self.zone != BATHROOM:
+                self.current.bathroom_visits += 1
+        self.in_bed = in_bed
+        if zone is not None:
+            self.zone = zone
+
+    def last_night(self) -> Optional[NightCounts]:
+        """The night in progress if any, else the most recent finished one."""
+        return self.current or (self.history[-1] if self.history else None)
+
+
+class NocturnalTracker:
+    def __init__(self):
+        self.patients: Dict[str, PatientNights] = {}
+
+    def observe(self, patient_id: str, frames, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        nights = self.patients.get(patient_id)
+        if nights is None:
+            nights = self.patients[patient_id] = PatientNights()
+        for f in frames:
+            nights.frame(frame_epoch(f.timestamp, now), f.zone, f.is_in_bed)
+
+    def bathroom_visits(self, patient_id: str) -> Optional[int]:
+        nights = self.patients.get(patient_id)
+        last = nights.last_night() if nights else None
+        return last.bathroom_visits if last else None
+
+    def get(self, patient_id: str) -> Optional[dict]:
+        nights = self.patients.get(patient_id)
+        if nights is None:
+            return None
+        return {"current": nights.current.to_api() if nights.current else None,
+                "history": [n.to_api() for n in reversed(nights.history)]}
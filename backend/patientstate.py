@@ -0,0 +1,96 @@
+"""Per-resident analytics state shared by every worker (shared mode).
+
+With `--workers N` any worker may receive a resident's next window, and a
+retry may land on a different worker from the original. So the per-resident
+detector state (baseline, nocturnal and wandering trackers, plus the uplink
+sequence of each of the resident's devices) is kept in SQLite as one pickled
+blob per resident with a version number. A worker loads it into its own
+trackers, runs the window, and saves it back only if nobody else saved in
+between; otherwise it reloads and runs the window again. The caller records
+events and alerts only after a successful save, so a window retried on
+another worker is seen as a duplicate there and never alerts twice.
+
+Within a worker the resident's lock must be held from load to save, and by
+anything reading the trackers for that resident.
+"""
+from __future__ import annotations
+import asyncio
+import pickle
+from contextlib import asynccontextmanager
+from typing import Dict, Sequence, Set
+
+from backend.sequences import SequenceTracker
+from backend.storage import Storage
+
+
+class KeyedLocks:
+    """One asyncio.Lock per key while anyone holds or waits for it."""
+
+    def __init__(self):
+        self.locks: Dict[str, list] = {}  # key -> [lock, users]
+
+    async def __call__(self, key: str):
+        entry = self.locks.get(key)
+        if entry is None:
+            entry = self.locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        await entry[0].acquire()
+        return entry
+
+    def release(self, key: str, entry):
+        entry[0].release()
+        entry[1] -= 1
+        if not entry[1]:
+            del self.locks[key]
+
+    @asynccontextmanager
+    async def hold(self, key: str):
+        entry = await self(key)
+        try:
+            yield
+        finally:
+            self.release(key, entry)
+
+
+class SharedPatientState:
+    """Blocking load/save of one resident's trackers; the server calls it through asyncio.to_thread."""
+
+    def __init__(self, storage: Storage, trackers: Dict[str, object], sequences: SequenceTracker):
+        self.storage = storage
+        self.trackers = trackers  # name -> tracker with a `patients` dict keyed by patient_id
+        self.sequences = sequences
+        self.devices: Dict[str, Set[str]] = {}  # patient_id -> device ids in its blob
+
+    def load(self, patient_id: str) -> int:
+        """Install the stored state into the trackers; returns its version (0 if none yet)."""
+        version, body = self.storage.load_patient_state(patient_id)
+        blob = pickle.loads(body) if body is not None else {}
+        for name, tracker in self.trackers.items():
+            if blob.get(name) is None:
+                tracker.patients.pop(patient_id, None)
+            else:
+                tracker.patients[patient_id] = blob[name]
+        devices = blob.get("devices", {})
+        for device_id, dev in devices.items():
+            dev.replies.clear()  # event sequence numbers belong to whichever worker stored them
+            self.sequences.devices[device_id] = dev
+        for device_id in self.devices.get(patient_id, set()) - devices.keys():
+            self.sequences.devices.pop(device_id, None)
+        self.devices[patient_id] = set(devices)
+        return version
+
+    def save(self, patient_id: str, version: int, device_ids: Sequence[str] = ()) -> bool:
+        """Store the trackers' state for this resident; False if another worker saved since `version`."""
+        devices = self.devices.setdefault(patient_id, set())
+        devices.update(d for d in device_ids if d in self.sequences.devices)
+        blob = {name: tracker.patients.get(patient_id) for name, tracker in self.trackers.items()}
+        blob["devices"] = {d: self.sequences.devices[d] for d in devices}
+        return self.storage.save_patient_state(patient_id, version, pickle.dumps(blob, pickle.HIGHEST_PROTOCOL))
+
+    def forget(self, patient_id: str, device_id: str, seq: int):
+        """Unmark a sequence whose window was saved but then failed to record, so its retry is processed."""
+        while True:
+            version = self.load(patient_id)
+            self.sequences.forget(device_id, seq)
+            if self.save(patient_id, version):
+                return
@@ -0,0 +1,55 @@
+"""Patient registry: an in-process list, or SQLite rows shared by every worker."""
+from __future__ import annotations
+import json
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from backend.storage import Storage
+
+
+class MemoryRegistry:
+    def __init__(self, patients: List[BaseModel]):
+        self.patients = patients
+
+    def all(self) -> List[BaseModel]:
+        return list(self.patients)
+
+    def create(self, patient) -> bool:
+        if any(p.patient_id == patient.patient_id for p in self.patients):
+            return False
+        self.patients.append(patient)
+        return True
+
+    def update(self, patient_id: str, patient) -> bool:
+        for i, p in enumerate(self.patients):
+            if p.patient_id == patient_id:
+                self.patients[i] = patient
+                return True
+        return False
+
+    def delete(self, patient_id: str):
+        self.patients[:] = [p for p in self.patients if p.patient_id != patient_id]
+
+
+class SqliteRegistry:
+    """Blocking; the server calls it through asyncio.to_thread."""
+
+    def __init__(self, storage: Storage, model, seed: Optional[List[BaseModel]] = None):
+        self.storage = storage
+        self.model = model
+        if seed and not storage.list_patients():
+            for p in seed:
+                storage.insert_patient(p.patient_id, p.model_dump_json())
+
+    def all(self) -> List[BaseModel]:
+        return [self.model(**json.loads(body)) for body in self.storage.list_patients()]
+
+    def create(self, patient) -> bool:
+        return self.storage.insert_patient(patient.patient_id, patient.model_dump_json())
+
+    def update(self, patient_id: str, patient) -> bool:
+        return self.storage.update_patient(patient_id, patient.patient_id, patient.model_dump_json())
+
+    def delete(self, patient_id: str):
+        self.storage.delete_patient(patient_id)
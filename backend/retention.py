@@ -0,0 +1,144 @@
+"""Background retention for the persisted event table.
+
+Raw TELEMETRY older than the retention window is appended to per-month
+NDJSON.gz archives, counted into hourly `event_summaries` rows and deleted.
+Alerts are never removed. Work is done in small batches, each in its own
+short transaction, followed by a bounded incremental vacuum, so ingest writes
+interleave with a running compaction instead of waiting for it. Each batch is
+selected, summarized and deleted under one write lock, so workers compacting
+the same database at once never count a row twice.
+
+Run offline, with the backend stopped, to compact now or to convert a
+database created before incremental auto-vacuum (a one-time full VACUUM):
+
+    python -m backend.retention [--db hakilix.db] [--vacuum]
+"""
+from __future__ import annotations
+import argparse
+import gzip
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from backend.storage import DEFAULT_PATH, Storage
+
+logger = logging.getLogger("Backend.Retention")
+
+DAY_MS = 86_400_000
+
+SELECT_BATCH = """
+SELECT id, patient_id, type, details, timestamp, ts_ms FROM events
+WHERE type = 'TELEMETRY' AND ts_ms < ? ORDER BY ts_ms LIMIT ?
+"""
+UPSERT_SUMMARY = """
+INSERT INTO event_summaries VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (patient_id, type, bucket_start) DO UPDATE SET
+    events = events + excluded.events,
+    first_ms = min(first_ms, excluded.first_ms),
+    last_ms = max(last_ms, excluded.last_ms)
+"""
+
+
+class Compactor:
+    def __init__(self, storage: Storage, raw_days: Optional[float] = None, minute_rollup_days: Optional[float] = None,
+                 archive_dir: Optional[str] = None, batch: int = 5000, vacuum_pages: int = 256):
+        self.storage = storage
+        self.raw_days = float(os.environ.get("HAKILIX_RAW_DAYS", 7)) if raw_days is None else raw_days
+        self.minute_rollup_days = float(os.environ.get("HAKILIX_MINUTE_ROLLUP_DAYS", 31)) if minute_rollup_days is None else minute_rollup_days
+        default_dir = os.path.join(os.path.dirname(os.path.abspath(storage.path)), "archive") if storage.path != ":memory:" else None
+        self.archive_dir = archive_dir or os.environ.get("HAKILIX_ARCHIVE_DIR") or default_dir
+        self.batch = batch
+        self.vacuum_pages = vacuum_pages
+
+    def run_once(self, now: Optional[float] = None) -> dict:
+        """One full pass; returns counts. Blocking, so call it via asyncio.to_thread."""
+        now_ms = int((time.time() if now is None else now) * 1000)
+        cutoff = now_ms - int(self.raw_days * DAY_MS)
+        stats = {"compacted": 0, "archived": 0, "rollups_pruned": 0}
+        while True:
+            n, archived = self._compact_batch(cutoff)
+            stats["compacted"] += n
+            stats["archived"] += archived
+            self._vacuum()
+            if n < self.batch:
+                break
+        minute_cutoff = (now_ms - int(self.minute_rollup_days * DAY_MS)) // 1000
+        with self.storage.transaction() as conn:
+            stats["rollups_pruned"] = conn.execute(
+                "DELETE FROM rollups WHERE resolution = 60 AND bucket_start < ?", (minute_cutoff,)).rowcount
+            conn.execute("DELETE FROM rollup_labels WHERE resolution = 60 AND bucket_start < ?", (minute_cutoff,))
+        self._vacuum()
+        if stats["compacted"] or stats["rollups_pruned"]:
+            logger.info("Compaction: %(compacted)d telemetry events summarized, %(archived)d archived, "
+                        "%(rollups_pruned)d minute rollups pruned", stats)
+        return stats
+
+    def _compact_batch(self, cutoff: int):
+        # One IMMEDIATE transaction from select to delete: with --workers N every worker compacts, and a
+        # batch selected by one can then never be archived or summarized again by another.
+        with self.storage.transaction(immediate=True) as conn:
+            rows = conn.execute(SELECT_BATCH, (cutoff, self.batch)).fetchall()
+            removed = [r for r in rows if conn.execute("DELETE FROM events WHERE id = ?", (r[0],)).rowcount]
+            summaries = {}
+            for _, patient_id, type_, _, _, ts_ms in removed:
+                key = (patient_id, type_, ts_ms // 3_600_000 * 3600)
+                n, first, last = summaries.get(key, (0, ts_ms, ts_ms))
+                summaries[key] = (n + 1, min(first, ts_ms), max(last, ts_ms))
+            conn.executemany(UPSERT_SUMMARY, [k + v for k, v in summaries.items()])
+            # Archive before committing the delete: a crash in between re-archives the batch rather than losing it.
+            archived = self._archive(removed) if self.archive_dir and removed else 0
+        return len(rows), archived
+
+    def _archive(self, rows) -> int:
+        os.makedirs(self.archive_dir, exist_ok=True)
+        by_month = {}
+        for id_, patient_id, type_, details, timestamp, ts_ms in rows:
+            month = datetime.fromtimestamp(ts_ms / 1000, timezone.utc).strftime("%Y-%m")
+            by_month.setdefault(month, []).append(json.dumps(
+                {"id": id_, "patient_id": patient_id, "type": type_, "timestamp": timestamp, "ts_ms": ts_ms,
+                 "details": _load(details)}, separators=(",", ":")))
+        for month, lines in by_month.items():
+            # Appending writes a new gzip member; gzip.open reads the concatenation transparently.
+            with gzip.open(os.path.join(self.archive_dir, f"events-{month}.ndjson.gz"), "at", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        return len(rows)
+
+    def _vacuum(self):
+        with self.storage.lock:
+            self.storage.conn.execute(f"PRAGMA incremental_vacuum({int(self.vacuum_pages)})").fetchall()
+
+
+def _load(details):
+    try:
+        return json.loads(details) if details else None
+    except ValueError:
+        return details
+
+
+def read_archive(path: str):
+    """Iterate archived event dicts from one events-YYYY-MM.ndjson.gz file."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline compaction of the Hakilix database")
+    parser.add_argument("--db", default=os.environ.get("HAKILIX_DB", DEFAULT_PATH))
+    parser.add_argument("--vacuum", action="store_true", help="first convert an older file to incremental auto-vacuum (full VACUUM)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    db = Storage(args.db)
+    if args.vacuum:
+        logger.info("Converting %s to incremental auto-vacuum", args.db)
+        db.convert_to_incremental_vacuum()
+    logger.info("Done: %s", Compactor(db).run_once())
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Incremental per-patient telemetry rollups at 1-min, 15-min and 1-hour resolution.
+
+Frames are folded into the open 1-minute bucket; when it closes it is queued
+for persistence and merged into the open 15-minute bucket, and so on up to
+the hour. Only closed buckets are written; open ones are merged in at query time.
+"""
+from __future__ import annotations
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+RESOLUTIONS = (60, 900, 3600)
+
+
+class Bucket:
+    __slots__ = ("start", "frames", "e_min", "e_max", "e_sum", "peak_g", "step_sum", "step_n", "labels")
+
+    def __init__(self, start: int):
+        self.start = start
+        self.frames = 0
+        self.e_min = float("inf")
+        self.e_max = float("-inf")
+        self.e_sum = 0.0
+        self.peak_g = 0.0
+        self.step_sum = 0.0
+        self.step_n = 0
+        self.labels: Dict[str, int] = {}
+
+    def add(self, energy: float, g: float, step_rate: float):
+        self.frames += 1
+        if energy < self.e_min: self.e_min = energy
+        if energy > self.e_max: self.e_max = energy
+        self.e_sum += energy
+        if g > self.peak_g: self.peak_g = g
+        if step_rate > 0:
+            self.step_sum += step_rate
+            self.step_n += 1
+
+    def merge(self, other: "Bucket"):
+        self.frames += other.frames
+        self.e_min = min(self.e_min, other.e_min)
+        self.e_max = max(self.e_max, other.e_max)
+        self.e_sum += other.e_sum
+        self.peak_g = max(self.peak_g, other.peak_g)
+        self.step_sum += other.step_sum
+        self.step_n += other.step_n
+        for label, n in other.labels.items():
+            self.labels[label] = self.labels.get(label, 0) + n
+
+    def rebased(self, resolution: int) -> "Bucket":
+        b = Bucket(self.start - self.start % resolution)
+        b.merge(self)
+        return b
+
+    def to_api(self) -> dict:
+        return {
+            "t": datetime.fromtimestamp(self.start, timezone.utc).isoformat().replace("+00:00", "Z"),
+            "frames": self.frames,
+            "energy": {"min": self.e_min, "max": self.e_max, "mean": self.e_sum / self.frames if self.frames else 0.0},
+            "peak_g": self.peak_g,
+            "step_rate": self.step_sum / self.step_n if self.step_n else 0.0,
+            "labels": self.labels,
+        }
+
+
+def frame_epoch(ts: str, default: float) -> float:
+    """Device timestamp (ISO-8601, naive means UTC) as epoch seconds; `default` if unparseable."""
+    try:
+        dt = datetime.fromisoformat(ts[:-1] + "+00:00" if ts.endswith("Z") else ts)
+    except (TypeError, ValueError):
+        return default
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+class RollupEngine:
+    def __init__(self, resolutions=RESOLUTIONS):
+        self.resolutions = tuple(resolutions)
+        self.open: Dict[str, List[Optional[Bucket]]] = {}  # patient -> open bucket per level
+        self.pending: List[tuple] = []  # (patient_id, resolution, Bucket) closed but not yet persisted
+
+    def add_window(self, patient_id: str, frames: Iterable, label: str, now: Optional[float] = None):
+        """Fold one ingested window into the patient's buckets; `label` is the window's activity label."""
+        now = time.time() if now is None else now
+        res = self.resolutions[0]
+        current: Optional[Bucket] = None
+        for f in frames:
+            t = int(frame_epoch(f.timestamp, now))
+            start = t - t % res
+            if current is None or current.start != start:
+                if current is not None:
+                    self._absorb(patient_id, 0, current)
+                current = Bucket(start)
+            current.add(f.movement_energy, abs(f.vertical_accel_g), f.step_rate_hz or 0.0)
+            current.labels[label] = current.labels.get(label, 0) + 1
+        if current is not None:
+            self._absorb(patient_id, 0, current)
+
+    def _absorb(self, patient_id: str, level: int, part: Bucket):
+        if level == len(self.resolutions):
+            return
+        levels = self.open.get(patient_id)
+        if levels is None:
+            levels = self.open[patient_id] = [None] * len(self.resolutions)
+        res = self.resolutions[level]
+        start = part.start - part.start % res
+        current = levels[level]
+        if current is None or start > current.start:
+            if current is not None:
+                self._close(patient_id, level, current)
+            levels[level] = part if part.start == start else part.rebased(res)
+        elif start == current.start:
+            current.merge(part)
+        else:
+            # Late data for a bucket that already closed: persist it as a delta (upserts add up).
+            self._close(patient_id, level, part.rebased(res))
+
+    def _close(self, patient_id: str, level: int, bucket: Bucket):
+        self.pending.append((patient_id, self.resolutions[level], bucket))
+        self._absorb(patient_id, level + 1, bucket.rebased(self.resolutions[level + 1]) if level + 1 < len(self.resolutions) else bucket)
+
+    def close_all(self):
+        """Queue every open bucket (shutdown). A restart continuing the same bucket adds to it."""
+        for patient_id, levels in list(self.open.items()):
+            for level in range(len(levels)):
+                bucket, levels[level] = levels[level], None
+                if bucket is not None:
+                    self._close(patient_id, level, bucket)  # folds it into the next level before that one closes
+        self.open.clear()
+
+    def drain(self):
+        """Closed buckets as (rollup rows, label rows) for Storage.upsert_rollups."""
+        pending, self.pending = self.pending, []
+        rows, labels = [], []
+        for patient_id, res, b in pending:
+            rows.append((patient_id, res, b.start, b.frames, b.e_min, b.e_max, b.e_sum, b.peak_g, b.step_sum, b.step_n))
+            labels.extend((patient_id, res, b.start, label, n) for label, n in b.labels.items())
+        return rows, labels
+
+    def query(self, patient_id: str, resolution: int, start: int, end: int, stored=((), ())) -> List[dict]:
+        """Persisted buckets (`stored`, from Storage.query_rollups) merged with pending and open ones, oldest first."""
+        merged: Dict[int, Bucket] = {}
+
+        def put(b: Bucket):
+            key = b.start - b.start % resolution
+            if start <= key < end:
+                if key in merged:
+                    merged[key].merge(b)
+                else:
+                    merged[key] = b.rebased(resolution)
+
+        rows, labels = stored
+        for (bucket_start, frames, e_min, e_max, e_sum, peak_g, step_sum, step_n) in rows:
+            b = merged[bucket_start] = Bucket(bucket_start)
+            b.frames, b.e_min, b.e_max, b.e_sum, b.peak_g, b.step_sum, b.step_n = frames, e_min, e_max, e_sum, peak_g, step_sum, step_n
+        for bucket_start, label, n in labels:
+            if bucket_start in merged:
+                merged[bucket_start].labels[label] = n
+        for pid, res, b in self.pending:
+            if pid == patient_id and res == resolution:
+                put(b)
+        # Open buckets at this level, plus finer open buckets not yet folded into it.
+        for level, b in enumerate(self.open.get(patient_id, ())):
+            if b is not None and self.resolutions[level] <= resolution:
+                put(b)
+        return [merged[k].to_api() for k in sorted(merged)]
@@ -0,0 +1,269 @@
+"""Consistent-hash sharding of residents across backend processes.
+
+Each shard is an ordinary `backend.server` process that owns the detector
+state, rollups and event partition of the residents hashed to it. The router
+forwards `/api/ingest` to the owning shard (one window at a time per resident,
+so per-patient order is kept), fans `/api/events` and `/api/patients` out and
+merges them, and sends every per-resident request (patient CRUD, baseline,
+nocturnal, wandering, rollups, uplink, risk score) and device stream to the
+owning shard. `/ws` merges every shard's live events. Anything else, such as
+the dashboard and twin metrics, comes from the first shard. `/ws/state` is
+not proxied: each shard has its own revision epoch, so a state client
+connects to every shard directly.
+
+    python -m backend.router --spawn 4 --port 8080                 # 4 local shards on 8081-8084
+    python -m backend.router --shards http://10.0.0.2:8080,http://10.0.0.3:8080
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import subprocess
+import sys
+import time
+from bisect import bisect
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import List, Optional, Sequence
+
+import httpx
+import uvicorn
+import websockets
+from fastapi import FastAPI, HTTPException, Request, WebSocket
+from fastapi.responses import Response
+from websockets.exceptions import WebSocketException
+
+from backend import events
+from backend.patientstate import KeyedLocks
+
+logger = logging.getLogger("Backend.Router")
+
+VNODES = 128
+PER_PATIENT = ("patients", "alerts", "baseline", "nocturnal", "wandering", "rollups", "uplink")  # /api/<name>/<patient_id>
+JSON = {"content-type": "application/json"}
+# Not copied onto relayed replies: hop-by-hop, or describing the body as it arrived (httpx has already decoded it).
+DROP_HEADERS = {"connection", "keep-alive", "transfer-encoding", "content-length", "content-encoding", "date", "server"}
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Each node owns VNODES points on a 64-bit ring; a key goes to the next point clockwise."""
+
+    def __init__(self, nodes: Sequence[str], vnodes: int = VNODES):
+        if not nodes:
+            raise ValueError("HashRing needs at least one node")
+        self.nodes = list(nodes)
+        points = sorted((_hash(f"{node}#{i}"), node) for node in self.nodes for i in range(vnodes))
+        self._keys = [p[0] for p in points]
+        self._owners = [p[1] for p in points]
+
+    def node_for(self, key: str) -> str:
+        return self._owners[bisect(self._keys, _hash(key)) % len(self._keys)]
+
+
+def patient_of(body: bytes) -> str:
+    try:
+        return events.loads(body)["patient_id"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=422, detail="patient_id required")
+
+
+async def _bridge(websocket: WebSocket, upstreams: Sequence):
+    """Pump messages both ways until either side goes away; client messages go to every upstream."""
+    async def down(up):
+        async for message in up:
+            await (websocket.send_bytes(message) if isinstance(message, bytes) else websocket.send_text(message))
+
+    async def up():
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            data = message.get("text") if message.get("text") is not None else message.get("bytes")
+            for u in upstreams:
+                await u.send(data)
+
+    tasks = [asyncio.ensure_future(up())] + [asyncio.ensure_future(down(u)) for u in upstreams]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def create_app(shards: Sequence[str]) -> FastAPI:
+    ring = HashRing(shards)
+    locks = KeyedLocks()
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        if app.state.client is not None:
+            await app.state.client.aclose()
+
+    app = FastAPI(title="Hakilix Shard Router", lifespan=lifespan)
+    app.state.ring = ring
+    app.state.client = None
+
+    def client() -> httpx.AsyncClient:
+        if app.state.client is None:
+            app.state.client = httpx.AsyncClient(timeout=10.0, limits=httpx.Limits(max_keepalive_connections=256))
+        return app.state.client
+
+    def relay(res: httpx.Response) -> Response:
+        headers = {k: v for k, v in res.headers.items() if k.lower() not in DROP_HEADERS}
+        return Response(content=res.content, status_code=res.status_code, headers=headers)
+
+    @app.post("/api/ingest")
+    async def ingest(request: Request):
+        body = await request.body()
+        patient_id = patient_of(body)
+        entry = await locks(patient_id)
+        try:
+            res = await client().post(f"{ring.node_for(patient_id)}/api/ingest", content=body,
+                                      headers={"content-type": "application/json"})
+        finally:
+            locks.release(patient_id, entry)
+        return relay(res)
+
+    @app.get("/api/events")
+    async def get_events(limit: int = 100, patient_id: Optional[str] = None):
+        params = {"limit": limit}
+        if patient_id:
+            params["patient_id"] = patient_id
+            return relay(await client().get(f"{ring.node_for(patient_id)}/api/events", params=params))
+        replies = await asyncio.gather(*(client().get(f"{node}/api/events", params=params) for node in ring.nodes))
+        merged = [e for r in replies if r.status_code == 200 for e in events.loads(r.content)]
+        # Timestamps are uniform ISO-8601 UTC strings, so they sort lexically.
+        merged.sort(key=lambda e: e["timestamp"], reverse=True)
+        return Response(content=events.dumps(merged[:limit]), media_type="application/json")
+
+    @app.get("/api/patients")
+    async def get_patients():
+        replies = await asyncio.gather(*(client().get(f"{node}/api/patients") for node in ring.nodes))
+        # Every shard seeds the default residents; keep each one only from the shard that owns it.
+        merged = [p for node, r in zip(ring.nodes, replies) if r.status_code == 200
+                  for p in events.loads(r.content) if ring.node_for(p["patient_id"]) == node]
+        merged.sort(key=lambda p: p["patient_id"])
+        return Response(content=events.dumps(merged), media_type="application/json")
+
+    @app.post("/api/patients")
+    async def create_patient(request: Request):
+        body = await request.body()
+        return relay(await client().post(f"{ring.node_for(patient_of(body))}/api/patients", content=body, headers=JSON))
+
+    @app.put("/api/patients/{patient_id}")
+    async def update_patient(patient_id: str, request: Request):
+        body = await request.body()
+        old, new = ring.node_for(patient_id), ring.node_for(patient_of(body))
+        if old == new:
+            return relay(await client().put(f"{old}/api/patients/{patient_id}", content=body, headers=JSON))
+        # Renamed onto another shard: create it there, then drop the old record.
+        listing = await client().get(f"{old}/api/patients")
+        if listing.status_code != 200 or patient_id not in {p["patient_id"] for p in events.loads(listing.content)}:
+            raise HTTPException(status_code=404, detail="Not found")
+        res = await client().post(f"{new}/api/patients", content=body, headers=JSON)
+        if res.status_code == 200:
+            await client().delete(f"{old}/api/patients/{patient_id}")
+        return relay(res)
+
+    @app.post("/api/risk-score")
+    async def risk_score(request: Request):
+        body = await request.body()
+        try:
+            patient_id = events.loads(body).get("patientId")
+        except (ValueError, AttributeError):
+            patient_id = None
+        node = ring.node_for(patient_id) if patient_id else ring.nodes[0]
+        return relay(await client().post(f"{node}/api/risk-score", content=body, headers=JSON))
+
+    @app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
+    async def passthrough(path: str, request: Request):
+        parts = path.split("/")
+        node = ring.nodes[0]
+        if len(parts) == 3 and parts[0] == "api" and parts[1] in PER_PATIENT:
+            # Uplink state is keyed by device; a device with its own id names its resident with ?patient_id=.
+            node = ring.node_for(request.query_params.get("patient_id", parts[2]) if parts[1] == "uplink" else parts[2])
+        res = await client().request(request.method, f"{node}/{path}", params=request.query_params,
+                                     content=await request.body(), headers={k: v for k, v in request.headers.items() if k == "content-type"})
+        return relay(res)
+
+    async def proxy_socket(websocket: WebSocket, urls: Sequence[str]):
+        async with AsyncExitStack() as stack:
+            try:
+                upstreams = [await stack.enter_async_context(websockets.connect(url)) for url in urls]
+            except (OSError, WebSocketException):
+                logger.warning("Shard socket unreachable: %s", urls)
+                await websocket.close(code=1013)
+                return
+            await websocket.accept()
+            await _bridge(websocket, upstreams)
+        try:
+            await websocket.close()
+        except RuntimeError:
+            pass  # the client already went away
+
+    def ws_url(node: str, path: str, query: str = "") -> str:
+        return node.replace("http", "ws", 1) + path + (f"?{query}" if query else "")
+
+    @app.websocket("/ws/device/{patient_id}")
+    async def device_stream(websocket: WebSocket, patient_id: str):
+        await proxy_socket(websocket, [ws_url(ring.node_for(patient_id), f"/ws/device/{patient_id}", websocket.url.query)])
+
+    @app.websocket("/ws")
+    async def event_stream(websocket: WebSocket):
+        await proxy_socket(websocket, [ws_url(node, "/ws") for node in ring.nodes])
+
+    return app
+
+
+def spawn_shards(n: int, base_port: int, db_dir: str = ".") -> List[subprocess.Popen]:
+    """Start n local backend processes, each with its own database file."""
+    procs = []
+    for i in range(n):
+        env = {**os.environ, "HAKILIX_DB": os.path.join(db_dir, f"hakilix-shard{i}.db")}
+        procs.append(subprocess.Popen([sys.executable, "-m", "uvicorn", "backend.server:app", "--host", "127.0.0.1",
+                                       "--port", str(base_port + i), "--log-level", "warning"], env=env))
+    return procs
+
+
+def wait_ready(urls: Sequence[str], timeout: float = 20.0):
+    deadline = time.monotonic() + timeout
+    for url in urls:
+        while True:
+            try:
+                if httpx.get(f"{url}/api/ready", timeout=1.0).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"shard {url} did not start")
+            time.sleep(0.1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consistent-hash router in front of backend shards")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8080)))
+    parser.add_argument("--shards", default=os.environ.get("HAKILIX_SHARDS", ""), help="comma-separated shard base URLs")
+    parser.add_argument("--spawn", type=int, default=0, help="start this many local shards on the following ports")
+    args = parser.parse_args(argv)
+    procs = []
+    shards = [u.strip().rstrip("/") for u in args.shards.split(",") if u.strip()]
+    if args.spawn:
+        procs = spawn_shards(args.spawn, args.port + 1)
+        shards += [f"http://127.0.0.1:{args.port + 1 + i}" for i in range(args.spawn)]
+        wait_ready(shards)
+    try:
+        uvicorn.run(create_app(shards), host="0.0.0.0", port=args.port)
+    finally:
+        for p in procs:
+            p.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Per-device uplink sequence tracking: duplicate suppression and gap detection.
+
+Each device has a high-water mark (highest sequence seen) and a WINDOW-bit
+bitmap of which of the sequences just below it have arrived. A window is a
+duplicate if its bit is set, a retry filling a gap if it is not, and new if
+it is above the mark. Every check is a few integer bit operations. A jump far
+beyond the window (device reset or a lost counter) re-anchors the tracker
+instead of reporting a huge gap.
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Dict, Optional
+
+WINDOW = 4096
+MASK = (1 << WINDOW) - 1
+REPLAY = 64  # responses kept per device so a retried window gets its original event back
+
+NEW, DUPLICATE, STALE = "new", "duplicate", "stale"
+
+
+class DeviceSequence:
+    __slots__ = ("hwm", "anchor", "bits", "gaps", "duplicates", "resets", "replies")
+
+    def __init__(self):
+        self.hwm = -1
+        self.anchor = 0      # first sequence after the last reset; nothing below it counts as missing
+        self.bits = 0        # bit i set <=> sequence hwm - i has been seen
+        self.gaps = 0        # sequences skipped when the mark jumped (some may arrive later)
+        self.duplicates = 0
+        self.resets = 0
+        self.replies: "OrderedDict[int, int]" = OrderedDict()  # seq -> event sequence in the EventLog
+
+    def check(self, seq: int) -> str:
+        if self.hwm < 0 or seq > self.hwm + WINDOW or seq < self.hwm - 4 * WINDOW:
+            # First contact, or a jump no retry could explain: start over from here.
+            if self.hwm >= 0:
+                self.resets += 1
+            self.hwm = self.anchor = seq
+            self.bits = 1
+            return NEW
+        if seq > self.hwm:
+            shift = seq - self.hwm
+            self.bits = ((self.bits << shift) | 1) & MASK
+            self.hwm = seq
+            self.gaps += shift - 1
+            return NEW
+        offset = self.hwm - seq
+        if offset >= WINDOW:
+            self.duplicates += 1
+            return STALE
+        bit = 1 << offset
+        if self.bits & bit:
+            self.duplicates += 1
+            return DUPLICATE
+        self.bits |= bit
+        return NEW
+
+    @property
+    def missing(self) -> int:
+        """Sequences inside the window that have not arrived yet."""
+        return min(WINDOW, self.hwm - self.anchor + 1) - bin(self.bits).count("1")
+
+    def forget(self, seq: int):
+        """Unmark a sequence whose processing failed, so a retry counts as new."""
+        offset = self.hwm - seq
+        if 0 <= offset < WINDOW:
+            self.bits &= ~(1 << offset)
+
+    def remember(self, seq: int, event_seq: int):
+        self.replies[seq] = event_seq
+        if len(self.replies) > REPLAY:
+            self.replies.popitem(last=False)
+
+    def to_api(self) -> dict:
+        return {"high_water_mark": self.hwm, "missing": self.missing, "gaps": self.gaps,
+                "duplicates": self.duplicates, "resets": self.resets}
+
+
+class SequenceTracker:
+    def __init__(self):
+        self.devices: Dict[str, DeviceSequence] = {}
+
+    def check(self, device_id: str, seq: int) -> str:
+        dev = self.devices.get(device_id)
+        if dev is None:
+            dev = self.devices[device_id] = DeviceSequence()
+        return dev.check(seq)
+
+    def remember(self, device_id: str, seq: int, event_seq: int):
+        self.devices[device_id].remember(seq, event_seq)
+
+    def forget(self, device_id: str, seq: int):
+        dev = self.devices.get(device_id)
+        if dev is not None:
+            dev.forget(seq)
+
+    def reply_for(self, device_id: str, seq: int) -> Optional[int]:
+        dev = self.devices.get(device_id)
+        return dev.replies.get(seq) if dev else None
+
+    def get(self, device_id: str) -> Optional[dict]:
+        dev = self.devices.get(device_id)
+        return dev.to_api() if dev else None
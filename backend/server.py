@@ -1,27 +1,73 @@
 from __future__ import annotations
 import time
+_IMPORT_STARTED = time.perf_counter()
+import asyncio
+import math
 import json
 import random
 import logging
 import uuid
 import os
+import socket
 from collections import deque
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 from enum import Enum
 from statistics import mean
 
-import uvicorn
-from fastapi import FastAPI, Query, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, Query, HTTPException, Request
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
+
+# The broker, MQTT subscriber, compactor and uvicorn are imported where they are first used.
+from backend import admission, assets, baseline, events, metrics, nocturnal, patientstate, registry, rollups, sequences, statesync, storage, wandering
+from common.logger import install_async_logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("Backend")
 
-app = FastAPI(title="Hakilix Core Enterprise", version="22.0.0")
+FLUSH_SECONDS = float(os.environ.get("HAKILIX_FLUSH_SECONDS", 5))
+COMPACT_SECONDS = float(os.environ.get("HAKILIX_COMPACT_SECONDS", 3600))
+# Shared-state mode for `uvicorn --workers N`: registry and events in SQLite, WebSocket fan-out over a local broker.
+SHARED = os.environ.get("HAKILIX_SHARED", "") not in ("", "0", "false")
+BROKER = None
+MQTT_BROKER = os.environ.get("HAKILIX_MQTT_BROKER", "")  # host[:port]; enables the MQTT ingest subscriber
+MQTT_TOPIC = os.environ.get("HAKILIX_MQTT_TOPIC", "hakilix/+/windows")  # must be $share/<group>/... in shared mode
+MQTT = None
+
+READY = asyncio.Event()
+STARTUP = {}  # warm-up timings and counts, served by /api/ready
+
+@asynccontextmanager
+async def lifespan(app):
+    global BROKER, MQTT
+    install_async_logging()  # here, not at import: importing the module must not take over the root logger
+    if MQTT_BROKER and SHARED and not MQTT_TOPIC.startswith("$share/"):
+        # A plain subscription in every worker would process every message once per worker.
+        raise RuntimeError("MQTT ingest with HAKILIX_SHARED needs a shared subscription: set HAKILIX_MQTT_TOPIC=$share/<group>/hakilix/+/windows")
+    tasks = [asyncio.create_task(_flush_forever()), asyncio.create_task(_compact_forever()), asyncio.create_task(warm_up())]
+    if SHARED:
+        from backend import broker
+        BROKER = await broker.BrokerClient(_on_broker_message, os.environ.get("HAKILIX_BROKER_SOCKET", broker.DEFAULT_PATH)).start()
+    if MQTT_BROKER:
+        from backend import mqtt_ingest
+        host, _, port = MQTT_BROKER.partition(":")
+        # Workers in one shared-subscription group each need their own persistent session.
+        client_id = f"hakilix-backend-{socket.gethostname()}-{os.getpid()}" if SHARED else None
+        MQTT = await mqtt_ingest.MqttIngest(_ingest_from_mqtt, host, int(port or 1883), topic=MQTT_TOPIC, client_id=client_id).start()
+    yield
+    for task in tasks: task.cancel()
+    if MQTT is not None:
+        await MQTT.close()
+        MQTT = None
+    if BROKER is not None:
+        await BROKER.close()
+        BROKER = None
+    ROLLUPS.close_all()
+    await flush_storage()
+
+app = FastAPI(title="Hakilix Core Enterprise", version="22.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -29,6 +75,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(metrics.MetricsMiddleware)
 
 # --- DATA MODELS (Adapted from hakilix_single.py) ---
 class SensorFrame(BaseModel):
@@ -39,10 +86,35 @@ class SensorFrame(BaseModel):
     zone: Optional[str] = None
     is_in_bed: bool = False
     step_rate_hz: Optional[float] = 0.0
+    gait_velocity_mps: Optional[float] = None
+
+class DecisionLatency(BaseModel):
+    n: int = Field(default=0, ge=0)
+    p50: float = Field(default=0.0, ge=0)
+    p99: float = Field(default=0.0, ge=0)
+    max: float = Field(default=0.0, ge=0)
+
+class SensorHealth(BaseModel):
+    n: int = Field(default=0, ge=0)
+    interval_ms_p50: float = Field(default=0.0, ge=0)
+    jitter_ms_p99: float = Field(default=0.0, ge=0)
+    late: int = Field(default=0, ge=0)
+    dropped: int = Field(default=0, ge=0)
+
+class EdgeTelemetrySummary(BaseModel):
+    """Edge health summary piggybacked on a window (edge.utils.telemetry.EdgeTelemetry.summary)."""
+    window_s: float = Field(default=0.0, ge=0)
+    decision_ms: DecisionLatency = DecisionLatency()
+    sensors: Dict[str, SensorHealth] = {}
+    uplink_retries: int = Field(default=0, ge=0)
 
 class SensorWindow(BaseModel):
     patient_id: str
     frames: List[SensorFrame]
+    device_id: Optional[str] = None  # defaults to patient_id
+    seq: Optional[int] = None        # per-device uplink sequence number; enables duplicate suppression
+    evidence: Optional[dict] = None
+    telemetry: Optional[EdgeTelemetrySummary] = None
 
 class FallDetectionResult(BaseModel):
     is_fall: bool
@@ -92,10 +164,11 @@ class IntakeResponse(BaseModel):
 class RiskScoreInput(BaseModel):
     gaitVelocity: float = Field(ge=0, le=3)
     timeToStand: float = Field(ge=0, le=60)
-    nighttimeBathroomVisits: int = Field(ge=0, le=20)
+    nighttimeBathroomVisits: Optional[int] = Field(default=None, ge=0, le=20)  # derived from telemetry when omitted
     recentFallsCount: int = Field(ge=0, le=10)
     age: int = Field(ge=40, le=110)
     frailtyIndex: Optional[float] = Field(default=None, ge=0, le=1)
+    patientId: Optional[str] = None
 
 class RiskScoreResult(BaseModel):
     riskScore: float
@@ -121,7 +194,39 @@ PATIENTS = [
     Patient(patient_id="PAT_VW01", display_name="Ms E. Garcia", year_of_birth=1952, living_setting="Home", programme="Virtual ward (COPD)", clinical_focus="Nocturnal activity"),
     Patient(patient_id="PAT_VW02", display_name="Mr K. Mensah", year_of_birth=1960, living_setting="Home", programme="Virtual ward (HF)", clinical_focus="Decompensation tracking"),
 ]
-_EVENTS = deque(maxlen=5000)
+EVENT_LOG = events.EventLog(capacity=int(os.environ.get("HAKILIX_EVENT_BUFFER", 100_000)))
+_EDGE_HEALTH = {}  # patient_id -> latest edge telemetry summary
+ROLLUPS = rollups.RollupEngine()
+BASELINES = baseline.BaselineTracker()
+NOCTURNAL = nocturnal.NocturnalTracker()
+WANDERING = wandering.WanderingDetector()
+SEQUENCES = sequences.SequenceTracker()
+_PATIENT_LOCKS = patientstate.KeyedLocks()
+_SHARED_STATE = None
+_PENDING_EVENTS = []  # rows awaiting the next batched write to the events table
+_REGISTRY = None
+STATE = statesync.StateLog()
+_STATE_SEEDED = False
+ALERT_TTL_S = float(os.environ.get("HAKILIX_ALERT_TTL_HOURS", 24)) * 3600  # older alerts are not reloaded as live at startup
+
+def get_shared_state():
+    """Shared mode: per-resident tracker state kept in the database (see backend.patientstate)."""
+    global _SHARED_STATE
+    if _SHARED_STATE is None:
+        _SHARED_STATE = patientstate.SharedPatientState(storage.get_storage(), {"baseline": BASELINES, "nocturnal": NOCTURNAL, "wandering": WANDERING}, SEQUENCES)
+    return _SHARED_STATE
+
+async def _load_fresh(patient_id: str):
+    """Shared mode: reload a resident's trackers from the database before reading them."""
+    if not SHARED: return
+    shared = await asyncio.to_thread(get_shared_state)
+    async with _PATIENT_LOCKS.hold(patient_id): await asyncio.to_thread(shared.load, patient_id)
+
+def get_registry():
+    global _REGISTRY
+    if _REGISTRY is None:
+        _REGISTRY = registry.SqliteRegistry(storage.get_storage(), Patient, PATIENTS) if SHARED else registry.MemoryRegistry(PATIENTS)
+    return _REGISTRY
 
 # --- ADVANCED LOGIC (From hakilix_single.py) ---
 
@@ -140,6 +245,13 @@ def compute_risk_score(payload: RiskScoreInput) -> RiskScoreResult:
         score += 20
         explanation.append("Prolonged time to stand suggests deconditioning.")
     
+    visits = payload.nighttimeBathroomVisits or 0
+    if visits >= 3:
+        score += 15
+        explanation.append(f"{visits} night-time bathroom visits: nocturia is linked with night-time falls.")
+    elif visits >= 2:
+        score += 5
+
     score += min(payload.recentFallsCount * 10, 30)
     if payload.age >= 85: score += 15
     elif payload.age >= 75: score += 10
@@ -150,6 +262,8 @@ def compute_risk_score(payload: RiskScoreInput) -> RiskScoreResult:
 
     return RiskScoreResult(riskScore=score, band=band, explanation=explanation, recommendations=recs)
 
+FALL_G = 2.5  # peak vertical acceleration that marks a possible fall
+
 def detect_fall_logic(frames: List[SensorFrame]) -> FallDetectionResult:
     peak_g = max((abs(f.vertical_accel_g) for f in frames), default=0.0)
     is_fall = False
@@ -157,7 +271,7 @@ def detect_fall_logic(frames: List[SensorFrame]) -> FallDetectionResult:
     conf = 0.0
     reasons = []
 
-    if peak_g > 2.5:
+    if peak_g > FALL_G:
         is_fall = True
         reasons.append(f"High-G impact detected: {peak_g:.2f}g")
         if peak_g > 3.5:
@@ -190,86 +304,411 @@ def generate_twin_metrics() -> TwinMetrics:
 
 # --- ENDPOINTS ---
 
+_ROOT = os.path.join(os.path.dirname(__file__), "..")
+STATIC_MAX_AGE = int(os.environ.get("HAKILIX_STATIC_MAX_AGE", 86400))
+_WEB_INDEX = os.path.join(_ROOT, "web", "index.html")
+WEB_INDEX = None  # loaded by warm-up or the first request
+_STATIC_MOUNTS = []
+for _name in ("public", "frontend"):
+    if os.path.isdir(os.path.join(_ROOT, _name)):
+        _STATIC_MOUNTS.append(assets.CachedStaticFiles(os.path.join(_ROOT, _name), STATIC_MAX_AGE))
+        app.mount(f"/{_name}", _STATIC_MOUNTS[-1], name=_name)
+
+def load_assets():
+    global WEB_INDEX
+    if WEB_INDEX is None and os.path.exists(_WEB_INDEX):
+        # The dashboard shell changes with each deploy, so clients revalidate it every time (a cheap 304).
+        WEB_INDEX = assets.Asset.load(_WEB_INDEX, "no-cache")
+    for mount in _STATIC_MOUNTS: mount.load()
+
 @app.get("/", response_class=HTMLResponse)
-async def read_root():
-    try:
-        path = os.path.join(os.path.dirname(__file__), "../web/index.html")
-        with open(path, "r", encoding="utf-8") as f:
-            return f.read()
-    except: return "<h1>Web Interface Missing</h1>"
+async def read_root(request: Request):
+    if WEB_INDEX is None: load_assets()
+    if WEB_INDEX is None: return "<h1>Web Interface Missing</h1>"
+    return WEB_INDEX.response(request.headers)
 
 @app.get("/api/patients", response_model=List[Patient])
-def get_patients(): return PATIENTS
+def get_patients(): return get_registry().all()
 
 @app.post("/api/patients", response_model=Patient)
-def create_patient(patient: Patient):
-    if any(p.patient_id == patient.patient_id for p in PATIENTS): raise HTTPException(status_code=400, detail="Exists")
-    PATIENTS.append(patient)
+async def create_patient(patient: Patient):
+    if not await asyncio.to_thread(lambda: get_registry().create(patient)): raise HTTPException(status_code=400, detail="Exists")
+    await apply_state(statesync.PATIENT, patient.patient_id, patient.model_dump())
     return patient
 
 @app.put("/api/patients/{patient_id}", response_model=Patient)
-def update_patient(patient_id: str, patient: Patient):
-    for i, p in enumerate(PATIENTS):
-        if p.patient_id == patient_id:
-            PATIENTS[i] = patient
-            return patient
-    raise HTTPException(status_code=404, detail="Not found")
+async def update_patient(patient_id: str, patient: Patient):
+    if not await asyncio.to_thread(lambda: get_registry().update(patient_id, patient)): raise HTTPException(status_code=404, detail="Not found")
+    if patient.patient_id != patient_id: await apply_state(statesync.PATIENT, patient_id, None)
+    await apply_state(statesync.PATIENT, patient.patient_id, patient.model_dump())
+    return patient
 
 @app.delete("/api/patients/{patient_id}")
-def delete_patient(patient_id: str):
-    global PATIENTS
-    PATIENTS = [p for p in PATIENTS if p.patient_id != patient_id]
+async def delete_patient(patient_id: str):
+    await asyncio.to_thread(lambda: get_registry().delete(patient_id))
+    await apply_state(statesync.PATIENT, patient_id, None)
     return {"status": "deleted"}
 
+async def _state_call(fn, *args):
+    """Run a state log method: in place for the in-process log, off the loop for the SQLite one."""
+    return await asyncio.to_thread(fn, *args) if SHARED else fn(*args)
+
+async def get_state():
+    """The state log (shared through SQLite in shared mode), seeded from the registry on first use."""
+    global STATE, _STATE_SEEDED
+    if not _STATE_SEEDED:
+        patients = await asyncio.to_thread(lambda: get_registry().all())
+        if SHARED and not isinstance(STATE, statesync.SqliteStateLog):
+            STATE = await asyncio.to_thread(statesync.SqliteStateLog, storage.get_storage())
+        if not _STATE_SEEDED:
+            def seed(state):
+                for p in patients: state.set(statesync.PATIENT, p.patient_id, p.model_dump())
+            await _state_call(seed, STATE)
+            _STATE_SEEDED = True
+    return STATE
+
+async def _push_state(change: dict):
+    await state_manager.broadcast(events.dumps({"epoch": (await get_state()).epoch, "rev": change["rev"], "from": change["rev"] - 1,
+                                                "reset": False, "changes": [change]}).decode("utf-8"))
+
+async def apply_state(kind: str, key: str, value):
+    """Record a state change and push it to state sockets (and, in shared mode, the other workers' sockets)."""
+    state = await get_state()
+    change = await _state_call(state.set, kind, key, value)
+    if change is None: return
+    await _push_state(change)
+    if BROKER is not None: BROKER.publish("state", events.dumps(change))
+
+async def warm_up():
+    """Open storage and fill the patient, alert and asset caches in bulk, then report ready."""
+    t0 = time.perf_counter()
+    try:
+        db = await asyncio.to_thread(storage.get_storage)
+        t1 = time.perf_counter()
+        state = await get_state()
+        alerts = await asyncio.to_thread(db.latest_alerts, int((time.time() - ALERT_TTL_S) * 1000))
+        live = await _state_call(state.get, statesync.ALERT)
+        for pid, type_, severity, ts in alerts:
+            if pid not in live: await apply_state(statesync.ALERT, pid, {"type": type_, "severity": severity, "timestamp": ts})
+        t2 = time.perf_counter()
+        await asyncio.to_thread(load_assets)
+        t3 = time.perf_counter()
+        patients = len(await _state_call(state.get, statesync.PATIENT))
+    except Exception:
+        logger.exception("Startup warm-up failed")
+        raise
+    STARTUP.update(import_ms=round((_IMPORTED - _IMPORT_STARTED) * 1000, 1), storage_ms=round((t1 - t0) * 1000, 1),
+                   state_ms=round((t2 - t1) * 1000, 1), assets_ms=round((t3 - t2) * 1000, 1),
+                   ready_ms=round((t3 - _IMPORT_STARTED) * 1000, 1),
+                   patients=patients, alerts=len(alerts))
+    READY.set()
+    logger.info("Ready in %.0f ms (%s)", STARTUP["ready_ms"], STARTUP)
+    await asyncio.to_thread(events.preload)  # so the first window does not pay for importing NumPy
+
+@app.get("/api/ready")
+async def get_ready():
+    """Readiness probe: 503 until warm-up has finished."""
+    if not READY.is_set(): return JSONResponse({"ready": False}, status_code=503)
+    return {"ready": True, **STARTUP}
+
+@app.get("/api/state")
+async def get_state_changes(since: Optional[int] = None, epoch: Optional[str] = None):
+    """Patients, live statuses and latest alerts changed after revision `since` (a full snapshot if omitted or too old)."""
+    state = await get_state()
+    return Response(content=events.dumps(await _state_call(state.changes_since, since, epoch)), media_type="application/json")
+
+@app.delete("/api/alerts/{patient_id}")
+async def clear_alert(patient_id: str):
+    """Acknowledge a resident's alert: it leaves the live state and the dashboard banner count."""
+    await apply_state(statesync.ALERT, patient_id, None)
+    return {"status": "cleared"}
+
 @app.post("/api/intake", response_model=IntakeResponse)
 def api_intake(payload: IntakeRequest):
     return IntakeResponse(ok=True, message=f"Received application from {payload.organisationName}")
 
 @app.post("/api/risk-score", response_model=RiskScoreResult)
-def api_risk_score(payload: RiskScoreInput):
+async def api_risk_score(payload: RiskScoreInput):
+    if payload.nighttimeBathroomVisits is None and payload.patientId:
+        await _load_fresh(payload.patientId)
+        payload.nighttimeBathroomVisits = NOCTURNAL.bathroom_visits(payload.patientId)
     return compute_risk_score(payload)
 
 @app.get("/api/twin-metrics", response_model=TwinMetrics)
 def api_twin_metrics():
     return generate_twin_metrics()
 
-@app.post("/api/ingest", response_model=PatientEvent)
-async def ingest_telemetry(payload: SensorWindow):
+async def process_window(payload: SensorWindow) -> Optional[bytes]:
+    """Analytics, storage and fan-out for one window, whatever transport it came in on.
+
+    Returns the event JSON. A retried window does no work: it gets the original
+    event if that is still held, else None.
+    """
+    device_id = payload.device_id or payload.patient_id
+    if SHARED: return await _process_shared(payload, device_id)
+    if payload.seq is not None and SEQUENCES.check(device_id, payload.seq) != sequences.NEW:
+        metrics.INGEST_DUPLICATES.inc()
+        original = SEQUENCES.reply_for(device_id, payload.seq)
+        return EVENT_LOG.json(original) if original is not None and original >= EVENT_LOG.oldest else None
+    try:
+        return await _record_window(payload, device_id, *_analyze_window(payload))
+    except BaseException:
+        # Not recorded: unmark the sequence so the sender's retry is processed rather than answered 409.
+        if payload.seq is not None and SEQUENCES.reply_for(device_id, payload.seq) is None:
+            SEQUENCES.forget(device_id, payload.seq)
+        raise
+
+async def _process_shared(payload: SensorWindow, device_id: str) -> Optional[bytes]:
+    """Shared mode: run the window on the resident's state from the database and record it only once that is saved."""
+    shared = await asyncio.to_thread(get_shared_state)
+    async with _PATIENT_LOCKS.hold(payload.patient_id):
+        while True:
+            version = await asyncio.to_thread(shared.load, payload.patient_id)
+            if payload.seq is not None and SEQUENCES.check(device_id, payload.seq) != sequences.NEW:
+                metrics.INGEST_DUPLICATES.inc()
+                await asyncio.to_thread(shared.save, payload.patient_id, version, (device_id,))  # keep the duplicate count; a lost race only loses that
+                return None  # replies are not shared between workers
+            results = _analyze_window(payload)
+            if await asyncio.to_thread(shared.save, payload.patient_id, version, (device_id,)): break
+            metrics.INGEST_CONFLICTS.inc()  # another worker saved this resident first: rerun on its state
+        try:
+            return await _record_window(payload, device_id, *results)
+        except BaseException:
+            if payload.seq is not None: await asyncio.to_thread(shared.forget, payload.patient_id, device_id, payload.seq)
+            raise
+
+def _analyze_window(payload: SensorWindow):
+    """Detection and per-resident pattern trackers; no side effects beyond the trackers' state."""
+    t0 = time.perf_counter()
     fall_result = detect_fall_logic(payload.frames)
+    t1 = time.perf_counter()
     activity_result = classify_activity(payload.frames)
-    
+    t2 = time.perf_counter()
+    metrics.STAGE_LATENCY.observe(t1 - t0, "detect_fall")
+    metrics.STAGE_LATENCY.observe(t2 - t1, "classify_activity")
+
+    activity_result.narrative.extend(BASELINES.observe(payload.patient_id, payload.frames))
+    NOCTURNAL.observe(payload.patient_id, payload.frames)
+    zone_notes = WANDERING.observe(payload.patient_id, payload.frames)
+    if zone_notes or WANDERING.is_wandering(payload.patient_id):
+        activity_result.is_potential_risk = True
+        activity_result.narrative.extend(zone_notes)
+    metrics.STAGE_LATENCY.observe(time.perf_counter() - t2, "patterns")
+    return fall_result, activity_result
+
+async def _record_window(payload: SensorWindow, device_id: str, fall_result: FallDetectionResult, activity_result: ActivityState) -> bytes:
+    metrics.INGEST_WINDOWS.inc(payload.patient_id)
+    metrics.INGEST_FRAMES.inc(payload.patient_id, amount=len(payload.frames))
+    if payload.telemetry:
+        _EDGE_HEALTH[payload.patient_id] = {**payload.telemetry.model_dump(), "received_at": datetime.now().isoformat()}
     event_type = "TELEMETRY"
     if fall_result.is_fall:
         event_type = "CRITICAL_FALL"
-        logger.critical(f"[ALERT] {payload.patient_id} FALL DETECTED")
-
-    event = PatientEvent(
-        id=str(uuid.uuid4()),
-        patient_id=payload.patient_id,
-        timestamp=datetime.now(),
-        type=event_type,
-        details=fall_result.dict(),
-        activity=activity_result,
-        fall=fall_result
-    )
-    _EVENTS.append(event)
-    return event
-
-@app.get("/api/events")
-async def get_events(limit: int = 100):
-    return list(reversed(list(_EVENTS)))[:limit]
+        metrics.ALERTS.inc(fall_result.severity)
+        logger.critical("[ALERT] %s FALL DETECTED", payload.patient_id)
+
+    t3 = time.perf_counter()
+    ROLLUPS.add_window(payload.patient_id, payload.frames, activity_result.label)
+    t4 = time.perf_counter()
+    metrics.STAGE_LATENCY.observe(t4 - t3, "rollup")
+
+    now = datetime.utcnow()
+    seq = EVENT_LOG.append(payload.patient_id, event_type, now, fall_result, activity_result,
+                           {"evidence": payload.evidence} if payload.evidence else None)
+    if payload.seq is not None: SEQUENCES.remember(device_id, payload.seq, seq)
+    ts_ms = events.to_ms(now)
+    iso = events.ms_to_iso(ts_ms)
+    await apply_state(statesync.STATUS, payload.patient_id, {"activity": activity_result.label, "at_risk": activity_result.is_potential_risk})
+    if fall_result.is_fall:
+        await apply_state(statesync.ALERT, payload.patient_id, {"type": event_type, "severity": fall_result.severity, "timestamp": iso})
+    body = EVENT_LOG.json(seq)
+    text = body.decode("utf-8")
+    row = (payload.patient_id, event_type, text, iso, ts_ms)
+    if SHARED:
+        # Other workers serve /api/events from the table, so write through instead of batching.
+        await asyncio.to_thread(storage.get_storage().insert_events, [row])
+    else:
+        _PENDING_EVENTS.append(row)
+    t5 = time.perf_counter()
+    metrics.STAGE_LATENCY.observe(t5 - t4, "store_serialize")
+    await manager.broadcast(text)
+    if BROKER is not None: BROKER.publish("events", body)
+    metrics.STAGE_LATENCY.observe(time.perf_counter() - t5, "broadcast")
+    return body
+
+# Per-device token buckets for telemetry (rate 0 disables them) and the alert-first fair scheduler.
+INGEST_LIMIT = admission.TokenBuckets(float(os.environ.get("HAKILIX_INGEST_RATE", 10)), int(os.environ.get("HAKILIX_INGEST_BURST", 30)))
+SCHEDULER = admission.FairScheduler(int(os.environ.get("HAKILIX_INGEST_CONCURRENCY", 16)), int(os.environ.get("HAKILIX_INGEST_QUEUE", 256)))
+
+async def admit(payload: SensorWindow, wait: bool) -> float:
+    """Take a processing slot for this window: 0.0 once held, else (wait=False) seconds the sender should back off.
+
+    Windows that may hold a fall skip the rate limit and jump the queue. Streams
+    pass wait=True and are slowed down instead of refused.
+    """
+    key = payload.device_id or payload.patient_id
+    alert = any(abs(f.vertical_accel_g) > FALL_G for f in payload.frames)
+    if not alert and (delay := INGEST_LIMIT.take(key)):
+        metrics.INGEST_THROTTLED.inc("rate")
+        if not wait: return delay
+        while delay:
+            await asyncio.sleep(delay)
+            delay = INGEST_LIMIT.take(key)
+    if not await SCHEDULER.acquire(key, alert):
+        metrics.INGEST_THROTTLED.inc("overload")
+        if not wait: return 1.0
+        while not await SCHEDULER.acquire(key, alert): await asyncio.sleep(0.1)
+    return 0.0
+
+@app.post("/api/ingest", response_model=PatientEvent)
+async def ingest_telemetry(payload: SensorWindow):
+    delay = await admit(payload, wait=False)
+    if delay: raise HTTPException(status_code=429, detail="Ingest rate limit exceeded", headers={"Retry-After": str(math.ceil(delay))})
+    try: body = await process_window(payload)
+    finally: SCHEDULER.release()
+    if body is None: raise HTTPException(status_code=409, detail="Duplicate window")
+    return Response(content=body, media_type="application/json")
+
+async def _ingest_from_mqtt(window: dict):
+    try:
+        payload = SensorWindow.model_validate(window)
+    except ValidationError as e:
+        logger.warning("Invalid MQTT window: %s", e.errors()[:1])
+        return
+    await admit(payload, wait=True)  # holding back the PUBACK pushes back on the broker
+    try: await process_window(payload)
+    finally: SCHEDULER.release()
+
+@app.get("/api/edge-health")
+def get_edge_health(): return _EDGE_HEALTH
+
+@app.get("/api/uplink/{device_id}")
+async def get_uplink(device_id: str, patient_id: Optional[str] = None):
+    """Sequence high-water mark, missing windows and duplicates for one device (patient_id if it differs from device_id)."""
+    await _load_fresh(patient_id or device_id)
+    state = SEQUENCES.get(device_id)
+    if state is None: raise HTTPException(status_code=404, detail="No sequenced uplink from this device")
+    return {"device_id": device_id, **state}
+
+@app.get("/api/events", response_model=List[PatientEvent])
+async def get_events(limit: int = 100, patient_id: Optional[str] = None):
+    if SHARED:
+        rows = await asyncio.to_thread(storage.get_storage().recent_events, limit, patient_id)
+        return Response(content=events.join_array(r.encode("utf-8") for r in rows), media_type="application/json")
+    return Response(content=events.join_array(EVENT_LOG.json(seq) for seq in EVENT_LOG.recent(limit, patient_id)), media_type="application/json")
+
+@app.get("/api/baseline/{patient_id}")
+async def get_baseline(patient_id: str):
+    """Personal mobility baseline vs recent behaviour, per metric."""
+    await _load_fresh(patient_id)
+    state = BASELINES.get(patient_id)
+    if state is None: raise HTTPException(status_code=404, detail="No baseline yet")
+    return {"patient_id": patient_id, "metrics": state}
+
+@app.get("/api/nocturnal/{patient_id}")
+async def get_nocturnal(patient_id: str):
+    """Night-time bed exits and bathroom visits: the night in progress and recent nights, newest first."""
+    await _load_fresh(patient_id)
+    state = NOCTURNAL.get(patient_id)
+    if state is None: raise HTTPException(status_code=404, detail="No telemetry yet")
+    return {"patient_id": patient_id, **state}
+
+@app.get("/api/wandering/{patient_id}")
+async def get_wandering(patient_id: str):
+    """Current zone-sequence statistics behind the wandering flag."""
+    await _load_fresh(patient_id)
+    state = WANDERING.get(patient_id)
+    if state is None: raise HTTPException(status_code=404, detail="No telemetry yet")
+    return {"patient_id": patient_id, **state}
+
+@app.get("/api/rollups/{patient_id}")
+async def get_rollups(patient_id: str, resolution: int = 60, start: Optional[int] = None, end: Optional[int] = None):
+    """Trend buckets for one patient; start/end are epoch seconds, defaulting to the last 720 buckets."""
+    if resolution not in ROLLUPS.resolutions:
+        raise HTTPException(status_code=400, detail=f"resolution must be one of {list(ROLLUPS.resolutions)}")
+    end = int(time.time()) + resolution if end is None else end
+    start = end - resolution * 720 if start is None else start
+    db = await asyncio.to_thread(storage.get_storage)
+    stored = await asyncio.to_thread(db.query_rollups, patient_id, resolution, start, end)
+    buckets = ROLLUPS.query(patient_id, resolution, start, end, stored)
+    return {"patient_id": patient_id, "resolution": resolution, "buckets": buckets}
+
+async def flush_storage():
+    """Write closed rollup buckets and buffered events in one batch each, off the event loop.
+
+    A batch whose write fails (and so was rolled back) goes back on the front of
+    its queue for the next flush.
+    """
+    global _PENDING_EVENTS
+    closed = ROLLUPS.pending
+    rows, labels = ROLLUPS.drain()
+    pending, _PENDING_EVENTS = _PENDING_EVENTS, []
+    if not (rows or pending): return
+    try:
+        db = await asyncio.to_thread(storage.get_storage)
+        await asyncio.to_thread(db.upsert_rollups, rows, labels)
+    except Exception:
+        ROLLUPS.pending[:0] = closed
+        _PENDING_EVENTS[:0] = pending
+        raise
+    try: await asyncio.to_thread(db.insert_events, pending)
+    except Exception:
+        _PENDING_EVENTS[:0] = pending
+        raise
+
+async def _flush_forever():
+    while True:
+        await asyncio.sleep(FLUSH_SECONDS)
+        try: await flush_storage()
+        except Exception: logger.exception("Storage flush failed")
+
+async def _compact_forever():
+    while True:
+        await asyncio.sleep(COMPACT_SECONDS)
+        try:
+            db = await asyncio.to_thread(storage.get_storage)
+            from backend import retention
+            await asyncio.to_thread(retention.Compactor(db).run_once)
+        except Exception: logger.exception("Compaction failed")
 
 # --- WEBSOCKETS ---
 from fastapi import WebSocket, WebSocketDisconnect
 class ConnectionManager:
-    def __init__(self): self.active_connections = []
-    async def connect(self, websocket: WebSocket): await websocket.accept(); self.active_connections.append(websocket)
-    def disconnect(self, websocket: WebSocket): self.active_connections.remove(websocket)
+    """Dashboard sockets, each drained by its own sender task so a slow client never blocks ingest."""
+    def __init__(self, max_queue: int = 256):
+        self.active_connections = []
+        self.queues = {}
+        self.senders = {}
+        self.max_queue = max_queue
+    async def connect(self, websocket: WebSocket):
+        await websocket.accept()
+        self.active_connections.append(websocket)
+        self.queues[websocket] = queue = asyncio.Queue(self.max_queue)
+        self.senders[websocket] = asyncio.create_task(self._sender(websocket, queue))
+    def disconnect(self, websocket: WebSocket):
+        if websocket in self.active_connections: self.active_connections.remove(websocket)
+        self.queues.pop(websocket, None)
+        task = self.senders.pop(websocket, None)
+        if task and task is not asyncio.current_task(): task.cancel()
+    async def _sender(self, websocket: WebSocket, queue: asyncio.Queue):
+        try:
+            while True: await websocket.send_text(await queue.get())
+        except asyncio.CancelledError: raise
+        except Exception: self.disconnect(websocket)
     async def broadcast(self, message: str):
-        for connection in self.active_connections: await connection.send_text(message)
+        for queue in list(self.queues.values()):
+            try: queue.put_nowait(message)
+            except asyncio.QueueFull: metrics.WS_DROPPED.inc()
+    def queue_depths(self): return [q.qsize() for q in self.queues.values()]
 
 manager = ConnectionManager()
 
+state_manager = ConnectionManager()
+
+async def _on_broker_message(topic: str, payload: bytes):
+    if topic == "events": await manager.broadcast(payload.decode("utf-8"))
+    elif topic == "state": await _push_state(events.loads(payload))  # already recorded in the shared log
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await manager.connect(websocket)
@@ -277,6 +716,92 @@ async def websocket_endpoint(websocket: WebSocket):
         while True: await websocket.receive_text()
     except WebSocketDisconnect: manager.disconnect(websocket)
 
+DEVICE_CREDIT = int(os.environ.get("HAKILIX_DEVICE_CREDIT", 32))  # unacked windows a streaming device may have in flight
+_DEVICE_STREAMS = {}
+
+@app.websocket("/ws/device/{patient_id}")
+async def device_stream(websocket: WebSocket, patient_id: str, device_id: Optional[str] = None):
+    """Streaming ingest for always-on edges: one window (or bare frame list) per message, acked in order.
+
+    The hello and every ack carry `credit`, the number of unacked windows the
+    device may send ahead. Windows are processed one at a time, so a device
+    that ignores it is simply held back by socket backpressure.
+    """
+    device_id = device_id or patient_id
+    await websocket.accept()
+    _DEVICE_STREAMS[device_id] = _DEVICE_STREAMS.get(device_id, 0) + 1
+    try:
+        await websocket.send_text(f'{{"type":"hello","credit":{DEVICE_CREDIT}}}')
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect": break
+            seq = None
+            try:
+                data = events.loads(message.get("text") or message.get("bytes") or b"")
+                if isinstance(data, list): data = {"frames": data}
+                seq = data.get("seq")
+                window = SensorWindow.model_validate({**data, "patient_id": patient_id, "device_id": device_id})
+            except (ValueError, AttributeError, ValidationError):
+                status = "invalid"
+            else:
+                await admit(window, wait=True)
+                try: status = "ok" if await process_window(window) is not None else "duplicate"
+                finally: SCHEDULER.release()
+            await websocket.send_text(events.dumps({"ack": seq, "status": status, "credit": DEVICE_CREDIT}).decode("utf-8"))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        _DEVICE_STREAMS[device_id] -= 1
+        if not _DEVICE_STREAMS[device_id]: del _DEVICE_STREAMS[device_id]
+
+@app.websocket("/ws/state")
+async def state_socket(websocket: WebSocket, since: Optional[int] = None, epoch: Optional[str] = None):
+    """Dashboard state stream: a snapshot or catch-up delta, then one message per change.
+
+    Each pushed message carries `from`, the revision it applies on top of; a
+    client whose revision differs (it missed a message) catches up via /api/state.
+    """
+    state = await get_state()
+    await state_manager.connect(websocket)
+    first = await _state_call(state.changes_since, since, epoch)
+    state_manager.queues[websocket].put_nowait(events.dumps({**first, "from": since}).decode("utf-8"))
+    try:
+        while True: await websocket.receive_text()
+    except WebSocketDisconnect: state_manager.disconnect(websocket)
+
+# --- METRICS ---
+metrics.Gauge("hakilix_event_buffer_events", "Events held in the in-memory buffer.", fn=lambda: len(EVENT_LOG))
+metrics.Gauge("hakilix_event_buffer_capacity", "Capacity of the in-memory event buffer.", fn=lambda: EVENT_LOG.capacity)
+metrics.Gauge("hakilix_ws_clients", "Connected dashboard WebSocket clients.", fn=lambda: len(manager.active_connections))
+metrics.Gauge("hakilix_ingest_queued_windows", "Windows waiting for an ingest slot.", ("class",),
+              fn=lambda: {("alert",): SCHEDULER.queued[admission.ALERT], ("telemetry",): SCHEDULER.queued[admission.TELEMETRY]})
+metrics.Gauge("hakilix_ingest_free_slots", "Idle ingest processing slots.", fn=lambda: SCHEDULER.free)
+metrics.Gauge("hakilix_state_revision", "Current dashboard state revision.", fn=lambda: STATE.rev)
+metrics.Gauge("hakilix_ws_send_queue_depth", "Messages queued for dashboard sockets.", ("stat",),
+              fn=lambda: {("total",): sum(manager.queue_depths()), ("max",): max(manager.queue_depths(), default=0)})
+metrics.Gauge("hakilix_baseline_drifting_patients", "Residents whose recent mobility has drifted adversely from their baseline.", ("metric",),
+              fn=lambda: {(m,): sum(b.drifting[m] for b in BASELINES.patients.values()) for m in baseline.ADVERSE})
+metrics.Gauge("hakilix_wandering_patients", "Residents currently flagged as wandering.",
+              fn=lambda: sum(z.wandering for z in WANDERING.patients.values()))
+metrics.Gauge("hakilix_device_streams", "Edge devices connected to the streaming ingest socket.", fn=lambda: len(_DEVICE_STREAMS))
+metrics.Gauge("hakilix_broker_dropped", "Cross-worker broadcasts dropped while the broker was unreachable or backed up.",
+              fn=lambda: BROKER.dropped if BROKER is not None else 0)
+metrics.Gauge("hakilix_uplink_missing_windows", "Sequence numbers inside each device's window that have not arrived.", ("device_id",),
+              fn=lambda: {(d,): s.missing for d, s in SEQUENCES.devices.items()})
+metrics.Gauge("hakilix_edge_decision_latency_p99_ms", "Edge acquisition-to-decision p99 from the latest device summary.", ("patient_id",),
+              fn=lambda: {(pid,): h["decision_ms"]["p99"] for pid, h in _EDGE_HEALTH.items()})
+metrics.Gauge("hakilix_edge_dropped_frames", "Frames dropped on the edge in the latest summary window.", ("patient_id",),
+              fn=lambda: {(pid,): sum(s["dropped"] for s in h["sensors"].values()) for pid, h in _EDGE_HEALTH.items()})
+metrics.Gauge("hakilix_edge_uplink_retries", "Edge uplink retries in the latest summary window.", ("patient_id",),
+              fn=lambda: {(pid,): h["uplink_retries"] for pid, h in _EDGE_HEALTH.items()})
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+_IMPORTED = time.perf_counter()
+
 if __name__ == "__main__":
+    import uvicorn
     port = int(os.environ.get("PORT", 8080))
-    uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=port)
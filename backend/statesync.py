@@ -0,0 +1,105 @@
+"""Revisioned dashboard state so clients sync by delta instead of refetching.
+
+State is a set of (kind, key) -> value entries: patients, live statuses and
+latest alerts, each keyed by patient_id. Every real change bumps a single
+revision counter and moves its entry to the end of an ordered map, so
+"changes since N" walks back from the end only as far as N, and a key that
+changed many times is sent once with its latest value. Deletes leave a
+tombstone (value None). The oldest tombstones are pruned past a limit,
+which raises `floor`; a client asking from below it gets a full snapshot.
+
+The epoch changes on every restart, so a revision from another process is
+never mistaken for one of ours. In shared mode every worker uses
+`SqliteStateLog` instead: the same log kept in the database, so all workers
+hand out one revision sequence under one epoch and a client can catch up
+from whichever worker answers.
+"""
+from __future__ import annotations
+import json
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+PATIENT, STATUS, ALERT = "patient", "status", "alert"
+
+
+class StateLog:
+    def __init__(self, max_tombstones: int = 10_000):
+        self.epoch = uuid.uuid4().hex[:12]
+        self.rev = 0
+        self.floor = 0
+        self.max_tombstones = max_tombstones
+        self.tombstones = 0
+        self.entries: "OrderedDict[Tuple[str, str], Tuple[int, Any]]" = OrderedDict()
+
+    def set(self, kind: str, key: str, value: Any) -> Optional[dict]:
+        """Record a value (None deletes); returns the change, or None if nothing changed."""
+        old = self.entries.get((kind, key))
+        if (old[1] if old is not None else None) == value:
+            return None
+        self.rev += 1
+        self.entries[(kind, key)] = (self.rev, value)
+        self.entries.move_to_end((kind, key))
+        self.tombstones += (value is None) - (old is not None and old[1] is None)
+        if self.tombstones > self.max_tombstones:
+            self._prune()
+        return {"rev": self.rev, "kind": kind, "key": key, "value": value}
+
+    def delete(self, kind: str, key: str) -> Optional[dict]:
+        return self.set(kind, key, None)
+
+    def _prune(self):
+        for k, (rev, value) in list(self.entries.items()):
+            if self.tombstones <= self.max_tombstones // 2:
+                break
+            if value is None:
+                del self.entries[k]
+                self.tombstones -= 1
+                self.floor = rev
+
+    def changes_since(self, since: Optional[int] = None, epoch: Optional[str] = None) -> dict:
+        """Delta from `since`, or a full snapshot (reset=True) if that is not possible."""
+        out: List[dict] = []
+        if since is None or epoch != self.epoch or not self.floor <= since <= self.rev:
+            for (kind, key), (rev, value) in self.entries.items():
+                if value is not None:
+                    out.append({"rev": rev, "kind": kind, "key": key, "value": value})
+            return {"epoch": self.epoch, "rev": self.rev, "reset": True, "changes": out}
+        for (kind, key), (rev, value) in reversed(self.entries.items()):
+            if rev <= since:
+                break
+            out.append({"rev": rev, "kind": kind, "key": key, "value": value})
+        out.reverse()
+        return {"epoch": self.epoch, "rev": self.rev, "reset": False, "changes": out}
+
+    def get(self, kind: str) -> Dict[str, Any]:
+        return {key: value for (k, key), (_, value) in self.entries.items() if k == kind and value is not None}
+
+
+class SqliteStateLog:
+    """StateLog in SQLite, shared by every worker. Blocking; the server calls it through asyncio.to_thread."""
+
+    def __init__(self, storage, max_tombstones: int = 10_000):
+        self.storage = storage
+        self.max_tombstones = max_tombstones
+        self.epoch = storage.state_epoch(uuid.uuid4().hex[:12])
+
+    @property
+    def rev(self) -> int:
+        return self.storage.state_rev()
+
+    def set(self, kind: str, key: str, value: Any) -> Optional[dict]:
+        rev = self.storage.set_state(kind, key, None if value is None else json.dumps(value), self.max_tombstones)
+        return None if rev is None else {"rev": rev, "kind": kind, "key": key, "value": value}
+
+    def delete(self, kind: str, key: str) -> Optional[dict]:
+        return self.set(kind, key, None)
+
+    def changes_since(self, since: Optional[int] = None, epoch: Optional[str] = None) -> dict:
+        rev, reset, rows = self.storage.state_changes(since if epoch == self.epoch else None)
+        changes = [{"rev": r, "kind": kind, "key": key, "value": None if value is None else json.loads(value)}
+                   for r, kind, key, value in rows]
+        return {"epoch": self.epoch, "rev": rev, "reset": reset, "changes": changes}
+
+    def get(self, kind: str) -> Dict[str, Any]:
+        return {key: json.loads(value) for key, value in self.storage.state_values(kind)}
@@ -0,0 +1,277 @@
+"""SQLite persistence for the backend (hakilix.db by default, HAKILIX_DB to override)."""
+from __future__ import annotations
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("Backend.Storage")
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "hakilix.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    patient_id TEXT NOT NULL,
+    resolution INTEGER NOT NULL,
+    bucket_start INTEGER NOT NULL,
+    frames INTEGER NOT NULL,
+    energy_min REAL NOT NULL,
+    energy_max REAL NOT NULL,
+    energy_sum REAL NOT NULL,
+    peak_g REAL NOT NULL,
+    step_rate_sum REAL NOT NULL,
+    step_frames INTEGER NOT NULL,
+    PRIMARY KEY (patient_id, resolution, bucket_start)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_labels (
+    patient_id TEXT NOT NULL,
+    resolution INTEGER NOT NULL,
+    bucket_start INTEGER NOT NULL,
+    label TEXT NOT NULL,
+    frames INTEGER NOT NULL,
+    PRIMARY KEY (patient_id, resolution, bucket_start, label)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    patient_id TEXT,
+    type TEXT,
+    details TEXT,
+    timestamp TEXT,
+    ts_ms INTEGER
+);
+CREATE TABLE IF NOT EXISTS patients (
+    patient_id TEXT PRIMARY KEY,
+    body TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS event_summaries (
+    patient_id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    bucket_start INTEGER NOT NULL,
+    events INTEGER NOT NULL,
+    first_ms INTEGER NOT NULL,
+    last_ms INTEGER NOT NULL,
+    PRIMARY KEY (patient_id, type, bucket_start)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS patient_state (
+    patient_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    body BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS state_meta (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    epoch TEXT NOT NULL,
+    rev INTEGER NOT NULL,
+    floor INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS state (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    rev INTEGER NOT NULL,
+    value TEXT,
+    PRIMARY KEY (kind, key)
+) WITHOUT ROWID;
+"""
+# Applied after SCHEMA so databases created before ts_ms existed are migrated first.
+INDEXES = """
+CREATE INDEX IF NOT EXISTS events_type_ts ON events (type, ts_ms);
+CREATE INDEX IF NOT EXISTS events_patient_ts ON events (patient_id, ts_ms);
+CREATE INDEX IF NOT EXISTS state_rev ON state (rev);
+"""
+
+# Re-flushing a bucket (late frames, restarts) adds to what is stored rather than replacing it.
+UPSERT_ROLLUP = """
+INSERT INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (patient_id, resolution, bucket_start) DO UPDATE SET
+    frames = frames + excluded.frames,
+    energy_min = min(energy_min, excluded.energy_min),
+    energy_max = max(energy_max, excluded.energy_max),
+    energy_sum = energy_sum + excluded.energy_sum,
+    peak_g = max(peak_g, excluded.peak_g),
+    step_rate_sum = step_rate_sum + excluded.step_rate_sum,
+    step_frames = step_frames + excluded.step_frames
+"""
+UPSERT_LABEL = """
+INSERT INTO rollup_labels VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (patient_id, resolution, bucket_start, label) DO UPDATE SET frames = frames + excluded.frames
+"""
+
+
+class Storage:
+    """One shared connection guarded by a lock; callers run it off the event loop via asyncio.to_thread."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.environ.get("HAKILIX_DB", DEFAULT_PATH)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.lock = threading.Lock()
+        # Must precede the first table on a new file; existing files are converted in _migrate.
+        self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        if self.path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self.conn.executescript(INDEXES)
+
+    def _migrate(self):
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(events)")}
+        if "ts_ms" not in columns:
+            logger.info("Migrating events table: adding ts_ms")
+            self.conn.execute("ALTER TABLE events ADD COLUMN ts_ms INTEGER")
+            self.conn.execute("UPDATE events SET ts_ms = CAST((julianday(timestamp) - 2440587.5) * 86400000 AS INTEGER)")
+        if self.conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            logger.warning("%s predates incremental auto-vacuum, so compaction cannot return freed pages; "
+                           "convert it offline with `python -m backend.retention --vacuum`", self.path)
+
+    def convert_to_incremental_vacuum(self):
+        """One-time full VACUUM that switches an older file to incremental auto-vacuum.
+
+        It rewrites the whole file and blocks every writer meanwhile, so it is an
+        offline step (`python -m backend.retention --vacuum`), never part of startup.
+        """
+        with self.lock:
+            self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            self.conn.execute("VACUUM")
+
+    @contextmanager
+    def transaction(self, immediate: bool = False):
+        """immediate: take the write lock up front, for read-then-write across processes."""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield self.conn
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def upsert_rollups(self, rows: Sequence[tuple], labels: Sequence[tuple]):
+        if not rows and not labels:
+            return
+        with self.transaction() as conn:
+            conn.executemany(UPSERT_ROLLUP, rows)
+            conn.executemany(UPSERT_LABEL, labels)
+
+    def insert_events(self, rows: Sequence[tuple]):
+        """rows: (patient_id, type, details JSON, ISO timestamp, ts_ms)."""
+        if not rows:
+            return
+        with self.transaction() as conn:
+            conn.executemany("INSERT INTO events (patient_id, type, details, timestamp, ts_ms) VALUES (?, ?, ?, ?, ?)", rows)
+
+    def query_rollups(self, patient_id: str, resolution: int, start: int, end: int) -> Tuple[List[tuple], List[tuple]]:
+        args = (patient_id, resolution, start, end)
+        where = "WHERE patient_id = ? AND resolution = ? AND bucket_start >= ? AND bucket_start < ?"
+        with self.lock:
+            rows = self.conn.execute(f"SELECT bucket_start, frames, energy_min, energy_max, energy_sum, peak_g, step_rate_sum, step_frames FROM rollups {where} ORDER BY bucket_start", args).fetchall()
+            labels = self.conn.execute(f"SELECT bucket_start, label, frames FROM rollup_labels {where}", args).fetchall()
+        return rows, labels
+
+    def recent_events(self, limit: int, patient_id: Optional[str] = None) -> List[str]:
+        """Newest persisted event bodies first.
+
+        Rows written by insert_events hold the full event JSON. Rows from before
+        that (details holding only the fall details) are wrapped into the same shape.
+        """
+        where, args = ("WHERE patient_id = ? ", (patient_id, limit)) if patient_id else ("", (limit,))
+        with self.lock:
+            return [r[0] for r in self.conn.execute(
+                "SELECT CASE WHEN json_valid(details) AND json_extract(details, '$.patient_id') IS NOT NULL THEN details "
+                "ELSE json_object('id', CAST(id AS TEXT), 'patient_id', patient_id, 'timestamp', timestamp, 'type', type, "
+                "'details', CASE WHEN json_valid(details) THEN json(details) ELSE json_object() END) END "
+                f"FROM events {where}ORDER BY ts_ms DESC, id DESC LIMIT ?", args)]
+
+    def latest_alerts(self, since_ms: int = 0) -> List[tuple]:
+        """(patient_id, type, severity, timestamp) of each patient's newest alert at or after since_ms, in one pass."""
+        with self.lock:
+            # SQLite takes the bare columns from the row that supplies max(ts_ms).
+            return [r[:4] for r in self.conn.execute(
+                "SELECT patient_id, type, json_extract(details, '$.fall.severity'), timestamp, max(ts_ms) "
+                "FROM events WHERE type <> 'TELEMETRY' AND ts_ms >= ? GROUP BY patient_id", (since_ms,))]
+
+    def load_patient_state(self, patient_id: str) -> Tuple[int, Optional[bytes]]:
+        with self.lock:
+            row = self.conn.execute("SELECT version, body FROM patient_state WHERE patient_id = ?", (patient_id,)).fetchone()
+        return row if row else (0, None)
+
+    def save_patient_state(self, patient_id: str, version: int, body: bytes) -> bool:
+        """Compare-and-swap: False if the stored version is no longer `version`."""
+        with self.lock:
+            if version == 0:
+                cur = self.conn.execute("INSERT OR IGNORE INTO patient_state VALUES (?, 1, ?)", (patient_id, body))
+            else:
+                cur = self.conn.execute("UPDATE patient_state SET version = version + 1, body = ? WHERE patient_id = ? AND version = ?",
+                                        (body, patient_id, version))
+            return cur.rowcount == 1
+
+    def state_epoch(self, epoch: str) -> str:
+        """The database's state epoch, set to `epoch` by whichever worker gets here first."""
+        with self.transaction(immediate=True) as conn:
+            conn.execute("INSERT OR IGNORE INTO state_meta VALUES (0, ?, 0, 0)", (epoch,))
+            return conn.execute("SELECT epoch FROM state_meta").fetchone()[0]
+
+    def state_rev(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT rev FROM state_meta").fetchone()[0]
+
+    def set_state(self, kind: str, key: str, value: Optional[str], max_tombstones: int) -> Optional[int]:
+        """Store a JSON value (None deletes) under the next shared revision; None if it was unchanged."""
+        with self.transaction(immediate=True) as conn:
+            old = conn.execute("SELECT value FROM state WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+            if (old[0] if old else None) == value:
+                return None
+            conn.execute("UPDATE state_meta SET rev = rev + 1")
+            rev = conn.execute("SELECT rev FROM state_meta").fetchone()[0]
+            conn.execute("INSERT OR REPLACE INTO state VALUES (?, ?, ?, ?)", (kind, key, rev, value))
+            if value is None and conn.execute("SELECT count(*) FROM state WHERE value IS NULL").fetchone()[0] > max_tombstones:
+                # Drop the oldest half; clients behind the newest dropped one get a snapshot.
+                cut = conn.execute("SELECT rev FROM state WHERE value IS NULL ORDER BY rev LIMIT 1 OFFSET ?",
+                                   (max_tombstones // 2,)).fetchone()[0]
+                conn.execute("DELETE FROM state WHERE value IS NULL AND rev < ?", (cut,))
+                conn.execute("UPDATE state_meta SET floor = max(floor, ?)", (cut - 1,))
+            return rev
+
+    def state_changes(self, since: Optional[int]) -> Tuple[int, bool, List[tuple]]:
+        """(rev, reset, [(rev, kind, key, value JSON)]): rows after `since`, or every live row if that is not possible."""
+        with self.transaction() as conn:  # one read snapshot for the revision and the rows
+            rev, floor = conn.execute("SELECT rev, floor FROM state_meta").fetchone()
+            if since is not None and floor <= since <= rev:
+                return rev, False, conn.execute("SELECT rev, kind, key, value FROM state WHERE rev > ? ORDER BY rev", (since,)).fetchall()
+            return rev, True, conn.execute("SELECT rev, kind, key, value FROM state WHERE value IS NOT NULL ORDER BY rev").fetchall()
+
+    def state_values(self, kind: str) -> List[tuple]:
+        with self.lock:
+            return self.conn.execute("SELECT key, value FROM state WHERE kind = ? AND value IS NOT NULL", (kind,)).fetchall()
+
+    def list_patients(self) -> List[str]:
+        with self.lock:
+            return [r[0] for r in self.conn.execute("SELECT body FROM patients ORDER BY rowid")]
+
+    def insert_patient(self, patient_id: str, body: str) -> bool:
+        """False if the id already exists."""
+        with self.lock:
+            return self.conn.execute("INSERT OR IGNORE INTO patients VALUES (?, ?)", (patient_id, body)).rowcount == 1
+
+    def update_patient(self, patient_id: str, new_id: str, body: str) -> bool:
+        with self.lock:
+            return self.conn.execute("UPDATE patients SET patient_id = ?, body = ? WHERE patient_id = ?", (new_id, body, patient_id)).rowcount == 1
+
+    def delete_patient(self, patient_id: str):
+        with self.lock:
+            self.conn.execute("DELETE FROM patients WHERE patient_id = ?", (patient_id,))
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+_storage: Optional[Storage] = None
+
+
+def get_storage() -> Storage:
+    """Open the database on first use so importing the app never touches disk."""
+    global _storage
+    if _storage is None:
+        _storage = Storage()
+    return _storage
@@ -0,0 +1,147 @@
+"""Wandering and out-of-pattern night movement from streaming zone sequences.
+
+Per resident the analyzer keeps the last WINDOW zone transitions and running
+counts over them: zone visits (for Shannon entropy, updated in O(1) via the
+sum of c*log2(c)) and repeated from->to pairs (back-and-forth pacing loops).
+A burst of frequent transitions that is either aimless (high entropy) or
+looping (mostly repeats) is flagged as wandering. A learned night-time
+transition table flags night moves the resident rarely makes. Every frame
+costs O(1).
+"""
+from __future__ import annotations
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from backend.nocturnal import night_of
+from backend.rollups import frame_epoch
+
+WINDOW = 24                 # transitions in the sliding window
+MIN_TRANSITIONS = 12        # before the window is judged
+WINDOW_GAP_S = 600.0        # a quiet spell this long starts a fresh window
+MIN_RATE_PER_MIN = 1.0      # zone changes per minute for a burst
+ENTROPY_BITS = 1.8          # aimless: visits spread over ~4+ zones
+REPEAT_FRACTION = 0.6       # looping: most transitions retrace an earlier one
+NIGHT_HISTORY = 50          # night transitions out of a zone before it is judged
+RARE_PROBABILITY = 0.05
+
+
+def _clog(c: int) -> float:
+    return c * math.log2(c) if c > 1 else 0.0
+
+
+class ZoneSequence:
+    __slots__ = ("zone", "last_t", "window", "visits", "pairs", "clog_sum", "repeats", "wandering", "night_counts", "night_totals")
+
+    def __init__(self):
+        self.zone: Optional[str] = None
+        self.last_t = 0.0  # time of the latest frame, moving or not
+        self.window: Deque[Tuple[float, str, Tuple[str, str]]] = deque()
+        self.visits: Dict[str, int] = {}
+        self.pairs: Dict[Tuple[str, str], int] = {}
+        self.clog_sum = 0.0
+        self.repeats = 0
+        self.wandering = False
+        self.night_counts: Dict[Tuple[str, str], int] = {}
+        self.night_totals: Dict[str, int] = {}
+
+    def _count(self, zone: str, pair: Tuple[str, str], d: int):
+        c = self.visits.get(zone, 0)
+        self.clog_sum += _clog(c + d) - _clog(c)
+        self.visits[zone] = c + d
+        p = self.pairs.get(pair, 0)
+        # repeats = sum(max(count - 1, 0)) over pairs
+        self.repeats += (max(p + d - 1, 0) - max(p - 1, 0))
+        self.pairs[pair] = p + d
+
+    def _reset_window(self):
+        self.window.clear()
+        self.visits.clear()
+        self.pairs.clear()
+        self.clog_sum = 0.0
+        self.repeats = 0
+
+    @property
+    def entropy(self) -> float:
+        n = len(self.window)
+        return math.log2(n) - self.clog_sum / n if n else 0.0
+
+    def rate_per_min(self) -> float:
+        """Transitions per minute from the window's first change up to the latest frame, so it decays while still."""
+        if len(self.window) < 2:
+            return 0.0
+        span = max(self.window[-1][0], self.last_t) - self.window[0][0]
+        return 60.0 * (len(self.window) - 1) / span if span > 0 else math.inf
+
+    def transition(self, t: float, to: str) -> Optional[str]:
+        """Record a zone change; returns a narrative line for a rare night move."""
+        pair = (self.zone, to)
+        if self.window and t - self.window[-1][0] > WINDOW_GAP_S:
+            self._reset_window()
+        self.window.append((t, to, pair))
+        self._count(to, pair, 1)
+        if len(self.window) > WINDOW:
+            _, old_zone, old_pair = self.window.popleft()
+            self._count(old_zone, old_pair, -1)
+        note = None
+        if night_of(t) is not None:
+            total = self.night_totals.get(self.zone, 0)
+            seen = self.night_counts.get(pair, 0)
+            if total >= NIGHT_HISTORY and seen / total < RARE_PROBABILITY:
+                note = f"Unusual night-time movement: {self.zone} -> {to}"
+            self.night_counts[pair] = seen + 1
+            self.night_totals[self.zone] = total + 1
+        return note
+
+    def judge(self) -> bool:
+        if self.window and self.last_t - self.window[-1][0] > WINDOW_GAP_S:
+            self._reset_window()  # quiet long enough: the burst is over
+        n = len(self.window)
+        if n < MIN_TRANSITIONS or self.rate_per_min() < MIN_RATE_PER_MIN:
+            return False
+        return self.entropy >= ENTROPY_BITS or self.repeats / n >= REPEAT_FRACTION
+
+    def to_api(self) -> dict:
+        n = len(self.window)
+        return {"zone": self.zone, "wandering": self.wandering, "window_transitions": n,
+                "entropy_bits": self.entropy, "repeat_fraction": self.repeats / n if n else 0.0,
+                "transitions_per_min": self.rate_per_min() if n > 1 else 0.0}
+
+
+class WanderingDetector:
+    def __init__(self):
+        self.patients: Dict[str, ZoneSequence] = {}
+
+    def observe(self, patient_id: str, frames, now: Optional[float] = None) -> List[str]:
+        """Fold a window's zones in; returns narrative lines (new wandering episodes, rare night moves)."""
+        now = time.time() if now is None else now
+        seq = self.patients.get(patient_id)
+        if seq is None:
+            seq = self.patients[patient_id] = ZoneSequence()
+        notes = []
+        for f in frames:
+            zone = f.zone
+            if zone is None or zone == seq.zone:
+                continue
+            if seq.zone is not None:
+                note = seq.transition(frame_epoch(f.timestamp, now), zone)
+                if note:
+                    notes.append(note)
+            seq.zone = zone
+        if frames:
+            seq.last_t = max(seq.last_t, frame_epoch(frames[-1].timestamp, now))
+        wandering = seq.judge()
+        if wandering and not seq.wandering:
+            notes.append(f"Possible wandering: {len(seq.window)} zone changes at {seq.rate_per_min():.1f}/min "
+                         f"(entropy {seq.entropy:.1f} bits, {seq.repeats / len(seq.window):.0%} repeated)")
+        seq.wandering = wandering
+        return notes
+
+    def is_wandering(self, patient_id: str) -> bool:
+        seq = self.patients.get(patient_id)
+        return seq is not None and seq.wandering
+
+    def get(self, patient_id: str) -> Optional[dict]:
+        seq = self.patients.get(patient_id)
+        return seq.to_api() if seq else None
@@ -0,0 +1,18 @@
+"""Hot-path benchmarks (pytest-benchmark).
+
+Record a baseline, then compare later runs against it and fail on regressions:
+
+    pytest benchmarks --benchmark-autosave
+    pytest benchmarks --benchmark-compare --benchmark-compare-fail=median:15%
+
+Baselines are saved under .benchmarks/<machine>/ by pytest-benchmark.
+"""
+import os
+import sys
+import importlib.util
+os.environ.setdefault("HAKILIX_DB", ":memory:")
+os.environ.setdefault("HAKILIX_INGEST_RATE", "0")  # one resident posting flat out would otherwise be rate limited
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+if importlib.util.find_spec("pytest_benchmark") is None:
+    collect_ignore_glob = ["test_*.py"]
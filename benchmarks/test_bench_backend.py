@@ -0,0 +1,35 @@
+import pytest
+from fastapi.testclient import TestClient
+from backend.server import RiskScoreInput, SensorFrame, app, classify_activity, compute_risk_score, detect_fall_logic
+
+def _frames(n):
+    return [SensorFrame(timestamp=f"2025-01-06T10:00:{i % 60:02d}", vertical_accel_g=0.98 + (i % 7) * 0.01,
+                        posture_angle_deg=90.0, movement_energy=0.2 + (i % 5) * 0.05, zone="kitchen", step_rate_hz=1.2)
+            for i in range(n)]
+
+@pytest.mark.parametrize("window", [1, 10, 100, 1000])
+def test_detect_fall_logic(benchmark, window):
+    benchmark(detect_fall_logic, _frames(window))
+
+@pytest.mark.parametrize("window", [1, 10, 100, 1000])
+def test_classify_activity(benchmark, window):
+    benchmark(classify_activity, _frames(window))
+
+def test_compute_risk_score(benchmark):
+    payload = RiskScoreInput(gaitVelocity=0.7, timeToStand=22, nighttimeBathroomVisits=3, recentFallsCount=1, age=86, frailtyIndex=0.3)
+    benchmark(compute_risk_score, payload)
+
+@pytest.mark.parametrize("window", [1, 50])
+def test_ingest_end_to_end(benchmark, window):
+    client = TestClient(app)
+    body = {"patient_id": "HKLX-01", "frames": [f.model_dump() for f in _frames(window)]}
+    res = benchmark(client.post, "/api/ingest", json=body)
+    assert res.status_code == 200
+
+@pytest.mark.parametrize("revalidate", [False, True])
+def test_dashboard_root(benchmark, revalidate):
+    client = TestClient(app)
+    headers = {"Accept-Encoding": "gzip"}
+    if revalidate: headers["If-None-Match"] = client.get("/").headers["etag"]
+    res = benchmark(client.get, "/", headers=headers)
+    assert res.status_code == (304 if revalidate else 200)
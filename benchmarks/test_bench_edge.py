@@ -0,0 +1,29 @@
+import random
+from edge.core.fusion_engine import FusionEngine
+from edge.core.home_bridge import HomeBridge
+from edge.core.lif_neuron import LIFNeuron
+from edge.core.snn_network import SpikingNetwork
+
+def test_lif_step(benchmark):
+    neuron = LIFNeuron(0)
+    benchmark(neuron.step, 0.3)
+
+def test_snn_infer(benchmark):
+    snn = SpikingNetwork()
+    benchmark(snn.infer, 0.4, 4.0, 0.5)
+
+def test_fusion_process(benchmark):
+    engine = FusionEngine()
+    rng = random.Random(0)
+    frames = [({"timestamp": i * 0.1, "velocity": rng.uniform(0.0, 0.5), "acceleration": 2.0},
+               {"max_temp": 36.5, "variance": rng.uniform(0.1, 0.9)}) for i in range(1000)]
+    state = {"i": 0}
+    def step():
+        radar, thermal = frames[state["i"] % 1000]
+        state["i"] += 1
+        return engine.process(radar, thermal)
+    benchmark(step)
+
+def test_fhir_conversion(benchmark):
+    bridge = HomeBridge()
+    benchmark(bridge.convert_to_fhir, "CRITICAL_ALERT", 0.95)
@@ -0,0 +1,66 @@
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+TARGET_S = 1.0  # new replicas must be ready in under a second
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _probe(port):
+    """/api/ready body once it answers 200, else None.
+
+    A bare http.client request, like an orchestrator's probe: a fresh httpx
+    client per poll costs enough CPU to slow the server it is timing.
+    """
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=0.5)
+    try:
+        conn.request("GET", "/api/ready")
+        res = conn.getresponse()
+        body = res.read()
+        return json.loads(body) if res.status == 200 else None
+    except OSError:
+        return None
+    finally:
+        conn.close()
+
+def _time_to_ready(db):
+    """Wall time from spawning the container command (`python -m backend.server`) until /api/ready answers 200."""
+    port = _free_port()
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "backend.server"], cwd=ROOT,
+                            env={**os.environ, "HAKILIX_DB": db, "PORT": str(port), "HAKILIX_LOG_LEVEL": "WARNING"},
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - t0 < 30:
+            startup = _probe(port)
+            if startup is not None:
+                return time.perf_counter() - t0, startup
+            time.sleep(0.01)
+        raise TimeoutError("backend never became ready")
+    finally:
+        proc.terminate()
+        proc.wait(10)
+
+def test_backend_time_to_ready(benchmark):
+    with tempfile.TemporaryDirectory() as d:
+        db = os.path.join(d, "hakilix.db")
+        _time_to_ready(db)  # creates and migrates the database
+        elapsed = []
+        def run():
+            result = _time_to_ready(db)
+            elapsed.append(result[0])
+            return result
+        _, startup = benchmark.pedantic(run, rounds=5, iterations=1)
+    benchmark.extra_info.update(startup)
+    assert startup["ready"]
+    assert statistics.median(elapsed) < TARGET_S
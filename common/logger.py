@@ -0,0 +1,113 @@
+"""Logging setup shared by the backend and the edge processes."""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+try:
+    import colorlog
+except ImportError:  # colour is cosmetic; plain output still works
+    colorlog = None
+
+IMMUTABLE = (str, int, float, bool, bytes, type(None))  # args safe to format later, on the writer thread
+FORMAT = '%(asctime)s | %(name)-15s | %(levelname)-8s | %(message)s'
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers."""
+
+    def format(self, record):
+        out = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        return json.dumps(out, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the writer thread without formatting or ever blocking.
+
+    The stock QueueHandler merges msg % args in the calling thread; here a
+    record whose args are all immutable scalars goes over untouched and is
+    formatted by the writer. Any other args (lists, dicts, objects the caller
+    may change next) are merged here, so the line shows their value at the
+    call. When the queue is full the record is dropped and counted rather
+    than stalling the caller.
+    """
+
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record):
+        args = record.args
+        if args and not all(isinstance(a, IMMUTABLE) for a in (args.values() if isinstance(args, dict) else args)):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _console_handler(json_output: bool, stream):
+    if json_output:
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(JsonFormatter())
+    elif colorlog is not None:
+        handler = colorlog.StreamHandler(stream)
+        handler.setFormatter(colorlog.ColoredFormatter('%(log_color)s' + FORMAT))
+    else:
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter(FORMAT))
+    return handler
+
+
+def install_async_logging(level=None, json_output=None, stream=None, queue_size=10000):
+    """Route the root logger through a bounded queue drained by a background writer thread.
+
+    Level defaults to HAKILIX_LOG_LEVEL (INFO); JSON output to HAKILIX_LOG_JSON.
+    Calling it again replaces the previous writer.
+    """
+    global _listener
+    level = level if level is not None else os.environ.get("HAKILIX_LOG_LEVEL", "INFO").upper()
+    if json_output is None:
+        json_output = os.environ.get("HAKILIX_LOG_JSON", "") not in ("", "0", "false")
+    if _listener is not None:
+        _listener.stop()
+    q = queue.Queue(queue_size)
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    root.addHandler(NonBlockingQueueHandler(q))
+    root.setLevel(level)
+    _listener = logging.handlers.QueueListener(q, _console_handler(json_output, stream or sys.stdout), respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(shutdown_logging)
+
+
+def setup_logger(name):
+    if _listener is None:
+        install_async_logging()
+    return logging.getLogger(name)
@@ -0,0 +1,230 @@
+"""The small subset of MQTT 3.1.1 the uplink needs, with no third-party client.
+
+Covers CONNECT/CONNACK, PUBLISH with QoS 0/1 and PUBACK, SUBSCRIBE/SUBACK,
+PINGREQ/PINGRESP and DISCONNECT, with clean or persistent sessions.
+`MqttPublisher` is the blocking client used on the edge; the backend
+subscriber and the broker stand-in use the same codec with asyncio streams.
+"""
+import logging
+import socket
+import struct
+import time
+
+logger = logging.getLogger("Hakilix.MQTT")
+
+CONNECT, CONNACK, PUBLISH, PUBACK, SUBSCRIBE, SUBACK = 1, 2, 3, 4, 8, 9
+PINGREQ, PINGRESP, DISCONNECT = 12, 13, 14
+MAX_PACKET = 256 * 1024 * 1024
+
+
+class MqttError(Exception):
+    pass
+
+
+def _varint(n):
+    out = bytearray()
+    while True:
+        n, digit = divmod(n, 128)
+        out.append(digit | (0x80 if n else 0))
+        if not n:
+            return bytes(out)
+
+
+def _str(s):
+    b = s.encode("utf-8")
+    return struct.pack(">H", len(b)) + b
+
+
+def packet(ptype, flags, body=b""):
+    return bytes([ptype << 4 | flags]) + _varint(len(body)) + body
+
+
+def connect(client_id, keepalive=60, clean=True):
+    return packet(CONNECT, 0, _str("MQTT") + bytes([4, 0x02 if clean else 0]) + struct.pack(">H", keepalive) + _str(client_id))
+
+
+def connack(rc=0):
+    return packet(CONNACK, 0, bytes([0, rc]))
+
+
+def publish(topic, payload, qos=0, packet_id=0, dup=False):
+    body = _str(topic) + (struct.pack(">H", packet_id) if qos else b"") + payload
+    return packet(PUBLISH, (dup << 3) | (qos << 1), body)
+
+
+def puback(packet_id):
+    return packet(PUBACK, 0, struct.pack(">H", packet_id))
+
+
+def subscribe(packet_id, filters):
+    return packet(SUBSCRIBE, 0x02, struct.pack(">H", packet_id) + b"".join(_str(t) + bytes([q]) for t, q in filters))
+
+
+def suback(packet_id, granted):
+    return packet(SUBACK, 0, struct.pack(">H", packet_id) + bytes(granted))
+
+
+PINGREQ_PACKET = packet(PINGREQ, 0)
+PINGRESP_PACKET = packet(PINGRESP, 0)
+DISCONNECT_PACKET = packet(DISCONNECT, 0)
+
+
+def parse_publish(flags, body):
+    """(topic, packet_id, payload, qos, dup) from a PUBLISH body."""
+    (n,) = struct.unpack_from(">H", body)
+    topic = body[2:2 + n].decode("utf-8")
+    qos = (flags >> 1) & 3
+    pos = 2 + n
+    packet_id = 0
+    if qos:
+        (packet_id,) = struct.unpack_from(">H", body, pos)
+        pos += 2
+    return topic, packet_id, body[pos:], qos, bool(flags & 0x08)
+
+
+def parse_connect(body):
+    """(client id, clean session) from a CONNECT body (protocol level 4 only)."""
+    (n,) = struct.unpack_from(">H", body)
+    if body[2:2 + n] != b"MQTT" or body[2 + n] != 4:
+        raise MqttError("unsupported protocol")
+    clean = bool(body[3 + n] & 0x02)
+    pos = 2 + n + 4
+    (m,) = struct.unpack_from(">H", body, pos)
+    return body[pos + 2:pos + 2 + m].decode("utf-8"), clean
+
+
+def parse_subscribe(body):
+    (packet_id,) = struct.unpack_from(">H", body)
+    pos, filters = 2, []
+    while pos < len(body):
+        (n,) = struct.unpack_from(">H", body, pos)
+        filters.append((body[pos + 2:pos + 2 + n].decode("utf-8"), body[pos + 2 + n]))
+        pos += 3 + n
+    return packet_id, filters
+
+
+def topic_matches(pattern, topic):
+    p, t = pattern.split("/"), topic.split("/")
+    for i, part in enumerate(p):
+        if part == "#":
+            return True
+        if i >= len(t) or (part != "+" and part != t[i]):
+            return False
+    return len(p) == len(t)
+
+
+def _remaining_length(read_byte):
+    n, mult = 0, 1
+    for _ in range(4):
+        b = read_byte()
+        n += (b & 0x7F) * mult
+        if not b & 0x80:
+            if n > MAX_PACKET:
+                raise MqttError("packet too large")
+            return n
+        mult *= 128
+    raise MqttError("malformed remaining length")
+
+
+async def read_packet_async(reader):
+    """(type, flags, body) from an asyncio StreamReader."""
+    first = (await reader.readexactly(1))[0]
+    n, mult = 0, 1
+    for _ in range(4):
+        b = (await reader.readexactly(1))[0]
+        n += (b & 0x7F) * mult
+        if not b & 0x80:
+            break
+        mult *= 128
+    else:
+        raise MqttError("malformed remaining length")
+    if n > MAX_PACKET:
+        raise MqttError("packet too large")
+    return first >> 4, first & 0x0F, await reader.readexactly(n) if n else b""
+
+
+class MqttPublisher:
+    """Blocking QoS-1 publisher that holds one persistent connection.
+
+    `publish()` returns once the broker has acknowledged the message; on any
+    socket error the connection is dropped and the next call reconnects and
+    resends with the DUP flag, so delivery is at-least-once.
+    """
+
+    def __init__(self, host, port=1883, client_id="hakilix-edge", keepalive=60, timeout=5.0):
+        self.host, self.port = host, port
+        self.client_id = client_id
+        self.keepalive = keepalive
+        self.timeout = timeout
+        self.sock = None
+        self._buf = b""
+        self._next_id = 0
+        self._last_io = 0.0
+
+    def _recv_exact(self, n):
+        while len(self._buf) < n:
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("broker closed the connection")
+            self._buf += chunk
+        out, self._buf = self._buf[:n], self._buf[n:]
+        return out
+
+    def _read_packet(self):
+        first = self._recv_exact(1)[0]
+        n = _remaining_length(lambda: self._recv_exact(1)[0])
+        return first >> 4, first & 0x0F, self._recv_exact(n) if n else b""
+
+    def connect(self):
+        self.close()
+        self.sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.sendall(connect(self.client_id, self.keepalive))
+        ptype, _, body = self._read_packet()
+        if ptype != CONNACK or body[1] != 0:
+            self.close()
+            raise MqttError(f"connection refused (code {body[1] if len(body) > 1 else '?'})")
+        self._last_io = time.monotonic()
+        logger.info("MQTT connected to %s:%d", self.host, self.port)
+
+    def publish(self, topic, payload, qos=1):
+        dup = False
+        self._next_id = self._next_id % 65535 + 1
+        packet_id = self._next_id
+        for attempt in range(2):
+            try:
+                if self.sock is None:
+                    self.connect()
+                self.sock.sendall(publish(topic, payload, qos, packet_id, dup))
+                self._last_io = time.monotonic()
+                while qos:
+                    ptype, _, body = self._read_packet()
+                    if ptype == PUBACK and struct.unpack(">H", body)[0] == packet_id:
+                        break
+                return
+            except (OSError, MqttError):
+                self.close()
+                dup = True
+                if attempt:
+                    raise
+
+    def ping_if_idle(self):
+        """Keep the connection alive between sparse publishes."""
+        if self.sock is not None and time.monotonic() - self._last_io > self.keepalive / 2:
+            try:
+                self.sock.sendall(PINGREQ_PACKET)
+                while self._read_packet()[0] != PINGRESP:
+                    pass
+                self._last_io = time.monotonic()
+            except (OSError, MqttError):
+                self.close()
+
+    def close(self):
+        if self.sock is not None:
+            try:
+                self.sock.sendall(DISCONNECT_PACKET)
+            except OSError:
+                pass
+            self.sock.close()
+            self.sock = None
+            self._buf = b""
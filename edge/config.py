@@ -1,6 +1,146 @@
-from pydantic import Field
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Literal
+from pydantic import Field, ValidationError, model_validator
 from pydantic_settings import BaseSettings
+
+logger = logging.getLogger("Hakilix.Config")
+
 class Settings(BaseSettings):
-    DEVICE_ID: str = Field(default="HKLX-EDGE-001")
+    DEVICE_ID: str = Field(default="HKLX-EDGE-001", min_length=1)
     MQTT_BROKER: str = "iot.eu-west-2.amazonaws.com"
-config = Settings()
\ No newline at end of file
+    MQTT_PORT: int = Field(default=1883, gt=0, lt=65536)
+    # --- Uplink ---
+    UPLINK: Literal["http", "mqtt", "ws"] = "http"
+    MQTT_BATCH_WINDOWS: int = Field(default=10, ge=1)
+    MQTT_BATCH_SECONDS: float = Field(default=1.0, gt=0)
+    # --- SNN / fusion ---
+    LIF_DECAY: float = Field(default=0.9, gt=0, le=1)
+    LIF_THRESHOLD: float = 1.0
+    LIF_REST: float = 0.0
+    FALL_VELOCITY_LIMIT: float = Field(default=2.0, gt=0)
+    # --- Acquisition ---
+    FRAME_RATE_HZ: float = Field(default=10.0, gt=0, le=1000)
+    IDLE_RATE_HZ: float = Field(default=1.0, gt=0)
+    IDLE_AFTER_SECONDS: float = Field(default=60.0, ge=0)
+    ACTIVITY_ENERGY_LEVEL: float = Field(default=0.6, ge=0)
+    ACTIVITY_MEMBRANE_LEVEL: float = 0.5
+    # --- Alert evidence ---
+    EVIDENCE_PRE_SECONDS: float = Field(default=10.0, ge=0, le=300)
+    EVIDENCE_POST_SECONDS: float = Field(default=5.0, ge=0, le=300)
+    # --- Telemetry ---
+    TELEMETRY_SUMMARY_SECONDS: float = Field(default=60.0, gt=0)
+    # --- Hot reload ---
+    CONFIG_POLL_SECONDS: float = Field(default=2.0, gt=0)
+
+    @model_validator(mode="after")
+    def _check_consistency(self):
+        if self.LIF_THRESHOLD <= self.LIF_REST:
+            raise ValueError("LIF_THRESHOLD must be above LIF_REST")
+        if self.IDLE_RATE_HZ > self.FRAME_RATE_HZ:
+            raise ValueError("IDLE_RATE_HZ must not exceed FRAME_RATE_HZ")
+        return self
+
+
+class ConfigSnapshot:
+    """Immutable, slotted copy of one validated `Settings` for the inner loop."""
+
+    __slots__ = tuple(Settings.model_fields) + ("version",)
+
+    def __init__(self, settings: Settings, version: int):
+        for name in Settings.model_fields:
+            object.__setattr__(self, name, getattr(settings, name))
+        object.__setattr__(self, "version", version)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ConfigSnapshot is immutable; use config.update()")
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in Settings.model_fields}
+
+
+class ConfigStore:
+    """Holds the current snapshot and swaps it atomically on reload.
+
+    Sources, lowest to highest precedence: defaults, environment, the JSON
+    file named by HAKILIX_CONFIG_FILE, then runtime `update()` overrides.
+    Components register with `subscribe()` and receive every new snapshot
+    through `apply_config(snapshot)`, so hot paths read plain attributes
+    instead of consulting the store on each step.
+    """
+
+    def __init__(self, path=None):
+        self.path = path if path is not None else os.environ.get("HAKILIX_CONFIG_FILE")
+        self._overrides = {}
+        self._listeners = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._mtime = self._stat()
+        self._next_poll = 0.0
+        self.snapshot = ConfigSnapshot(Settings(**self._file_values()), 0)
+
+    def __getattr__(self, name):
+        # Cold-path convenience: config.DEVICE_ID reads the current snapshot.
+        if name == "snapshot":
+            raise AttributeError(name)
+        return getattr(self.snapshot, name)
+
+    def _stat(self):
+        try:
+            return os.stat(self.path).st_mtime if self.path else None
+        except OSError:
+            return None
+
+    def _file_values(self) -> dict:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _publish(self, overrides: dict) -> ConfigSnapshot:
+        with self._lock:
+            settings = Settings(**{**self._file_values(), **overrides})
+            self._overrides = overrides
+            self.snapshot = ConfigSnapshot(settings, self.snapshot.version + 1)
+            snapshot = self.snapshot
+        for listener in list(self._listeners):
+            listener.apply_config(snapshot)
+        return snapshot
+
+    def subscribe(self, listener):
+        self._listeners.add(listener)
+        listener.apply_config(self.snapshot)
+
+    def update(self, **overrides) -> ConfigSnapshot:
+        """Apply runtime overrides; raises ValidationError and keeps the old snapshot if invalid."""
+        return self._publish({**self._overrides, **overrides})
+
+    def reset(self) -> ConfigSnapshot:
+        return self._publish({})
+
+    def reload(self) -> bool:
+        """Re-read environment and file. An invalid source is logged and ignored."""
+        try:
+            self._publish(self._overrides)
+        except (ValidationError, ValueError, OSError) as e:
+            logger.error("Config reload rejected, keeping v%s: %s", self.snapshot.version, e)
+            return False
+        logger.info("Config reloaded (v%s)", self.snapshot.version)
+        return True
+
+    def poll(self, now=None) -> bool:
+        """Reload if the config file changed. Cheap enough to call every frame."""
+        now = time.monotonic() if now is None else now
+        if now < self._next_poll:
+            return False
+        self._next_poll = now + self.snapshot.CONFIG_POLL_SECONDS
+        mtime = self._stat()
+        if mtime == self._mtime:
+            return False
+        self._mtime = mtime
+        return self.reload()
+
+config = ConfigStore()
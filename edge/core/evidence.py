@@ -0,0 +1,111 @@
+import base64
+import logging
+import zlib
+import numpy as np
+
+logger = logging.getLogger("Hakilix.Evidence")
+
+# Column layout shared by the ring buffer, the alert attachment and recorded sessions.
+FIELDS = ("t", "velocity", "acceleration", "max_temp", "variance")
+
+
+class FrameRingBuffer:
+    """Fixed-size ring of fused radar/thermal frames.
+
+    Storage is allocated once; `push` only overwrites a row in place so the
+    acquisition loop never allocates per frame.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 2:
+            raise ValueError("capacity must be >= 2")
+        self.capacity = capacity
+        self._buf = np.zeros((capacity, len(FIELDS)), dtype=np.float64)
+        self._head = 0
+        self.count = 0
+
+    def push(self, t, velocity, acceleration, max_temp, variance):
+        row = self._buf[self._head]
+        row[0] = t
+        row[1] = velocity
+        row[2] = acceleration
+        row[3] = max_temp
+        row[4] = variance
+        self._head = (self._head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def window(self, t_start: float, t_end: float) -> np.ndarray:
+        """Copy of the frames with t_start <= t <= t_end, oldest first."""
+        n = self.count
+        idx = (self._head - n + np.arange(n)) % self.capacity
+        ordered = self._buf[idx]
+        t = ordered[:, 0]
+        return ordered[(t >= t_start) & (t <= t_end)]
+
+
+class Evidence:
+    """Pre/post-event frames captured around one alert."""
+
+    __slots__ = ("device_id", "trigger_t", "frames")
+
+    def __init__(self, device_id: str, trigger_t: float, frames: np.ndarray):
+        self.device_id = device_id
+        self.trigger_t = trigger_t
+        self.frames = frames
+
+    def to_payload(self) -> dict:
+        # Times are made relative to the trigger so float32 keeps ms precision.
+        rel = self.frames.astype(np.float32)
+        rel[:, 0] = self.frames[:, 0] - self.trigger_t
+        return {
+            "device_id": self.device_id,
+            "trigger_t": self.trigger_t,
+            "fields": list(FIELDS),
+            "shape": list(rel.shape),
+            "dtype": "<f4",
+            "encoding": "zlib+base64",
+            "data": base64.b64encode(zlib.compress(rel.astype("<f4").tobytes())).decode("ascii"),
+        }
+
+    @staticmethod
+    def decode(payload: dict) -> np.ndarray:
+        raw = zlib.decompress(base64.b64decode(payload["data"]))
+        return np.frombuffer(raw, dtype=payload["dtype"]).reshape(payload["shape"])
+
+
+class EvidenceRecorder:
+    """Keeps recent frames and emits an `Evidence` bundle once the post-event window has elapsed."""
+
+    def __init__(self, device_id: str, pre_seconds: float, post_seconds: float, max_rate_hz: float):
+        self.buffer = None
+        self._pending = []
+        self.configure(device_id, pre_seconds, post_seconds, max_rate_hz)
+
+    def configure(self, device_id: str, pre_seconds: float, post_seconds: float, max_rate_hz: float):
+        self.device_id = device_id
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        capacity = int((pre_seconds + post_seconds) * max_rate_hz) + 2
+        # Only reallocate (and drop history) when the window no longer fits.
+        if self.buffer is None or self.buffer.capacity < capacity:
+            self.buffer = FrameRingBuffer(capacity)
+
+    def trigger(self, t: float):
+        # Alerts inside an open capture window are already covered by it.
+        if self._pending and t <= self._pending[-1] + self.post_seconds:
+            return
+        self._pending.append(t)
+
+    def push(self, t, velocity, acceleration, max_temp, variance):
+        """Record a frame; returns completed Evidence bundles (usually an empty list)."""
+        self.buffer.push(t, velocity, acceleration, max_temp, variance)
+        if not self._pending or t < self._pending[0] + self.post_seconds:
+            return ()
+        ready = []
+        while self._pending and t >= self._pending[0] + self.post_seconds:
+            trigger_t = self._pending.pop(0)
+            frames = self.buffer.window(trigger_t - self.pre_seconds, trigger_t + self.post_seconds)
+            logger.info("Evidence captured: %d frames around t=%.2f", len(frames), trigger_t)
+            ready.append(Evidence(self.device_id, trigger_t, frames))
+        return ready
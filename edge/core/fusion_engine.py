@@ -1,5 +1,7 @@
 import logging
+import time
 from edge.config import config
+from edge.core.evidence import EvidenceRecorder
 from edge.core.snn_network import SpikingNetwork
 
 logger = logging.getLogger("Hakilix.Fusion")
@@ -7,16 +9,41 @@ logger = logging.getLogger("Hakilix.Fusion")
 class FusionEngine:
     def __init__(self):
         self.snn = SpikingNetwork()
+        self.recorder = None
+        self.evidence = []
+        config.subscribe(self)
+
+    def apply_config(self, cfg):
+        self.fall_velocity_limit = cfg.FALL_VELOCITY_LIMIT
+        if self.recorder is None:
+            self.recorder = EvidenceRecorder(cfg.DEVICE_ID, cfg.EVIDENCE_PRE_SECONDS,
+                                             cfg.EVIDENCE_POST_SECONDS, cfg.FRAME_RATE_HZ)
+        else:
+            self.recorder.configure(cfg.DEVICE_ID, cfg.EVIDENCE_PRE_SECONDS,
+                                    cfg.EVIDENCE_POST_SECONDS, cfg.FRAME_RATE_HZ)
 
     def process(self, radar_data, thermal_data):
         v_z = radar_data.get('velocity', 0.0)
         acc = radar_data.get('acceleration', 0.0)
         t_var = thermal_data.get('variance', 0.0)
-        
+        t = radar_data.get('timestamp')
+        if t is None:
+            t = time.time()
+
+        ready = self.recorder.push(t, v_z, acc, thermal_data.get('max_temp', 0.0), t_var)
+        if ready:
+            self.evidence.extend(ready)
+
         spike_detected = self.snn.infer(v_z, acc, t_var)
         
         if spike_detected:
-            if v_z > config.FALL_VELOCITY_LIMIT:
-                logger.critical(f"FALL DETECTED! Velocity={v_z:.2f} m/s")
+            if v_z > self.fall_velocity_limit:
+                logger.critical("FALL DETECTED! Velocity=%.2f m/s", v_z)
+                self.recorder.trigger(t)
                 return "CRITICAL_ALERT"
-        return "SAFE"
\ No newline at end of file
+        return "SAFE"
+
+    def pop_evidence(self):
+        """Completed pre/post-event attachments, ready for the uplink."""
+        ready, self.evidence = self.evidence, []
+        return [e.to_payload() for e in ready]
\ No newline at end of file
@@ -2,16 +2,22 @@ import numpy as np
 from edge.config import config
 
 class LIFNeuron:
-    def __init__(self, neuron_id: int):
+    def __init__(self, neuron_id: int, cfg=None):
         self.id = neuron_id
-        self.v_mem = config.LIF_REST
+        self.apply_config(cfg or config.snapshot)
+        self.v_mem = self.rest
         self.spike = 0
+
+    def apply_config(self, cfg):
+        self.decay = cfg.LIF_DECAY
+        self.threshold = cfg.LIF_THRESHOLD
+        self.rest = cfg.LIF_REST
     
     def step(self, input_current: float) -> int:
-        self.v_mem = self.v_mem * config.LIF_DECAY + input_current
-        if self.v_mem >= config.LIF_THRESHOLD:
+        self.v_mem = self.v_mem * self.decay + input_current
+        if self.v_mem >= self.threshold:
             self.spike = 1
-            self.v_mem = config.LIF_REST
+            self.v_mem = self.rest
         else:
             self.spike = 0
         return self.spike
\ No newline at end of file
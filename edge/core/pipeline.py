@@ -0,0 +1,44 @@
+import asyncio
+import logging
+import time
+from edge.config import config
+from edge.core.fusion_engine import FusionEngine
+from edge.core.rate_controller import AdaptiveRateController
+from edge.drivers.radar_driver import RadarDriver
+from edge.drivers.thermal_driver import ThermalDriver
+from edge.utils.telemetry import telemetry
+
+logger = logging.getLogger("Hakilix.Pipeline")
+
+class EdgePipeline:
+    """Acquisition loop: drivers -> FusionEngine, paced by the rate controller.
+
+    `sink(status, radar, thermal)` is called with every decided frame.
+    """
+
+    def __init__(self, radar=None, thermal=None, engine=None, rate=None, telemetry=telemetry, sink=None):
+        self.telemetry = telemetry
+        self.sink = sink
+        self.rate = rate or AdaptiveRateController()
+        self.radar = radar or RadarDriver(self.rate)
+        self.thermal = thermal or ThermalDriver(self.rate)
+        self.engine = engine or FusionEngine()
+
+    async def step(self):
+        config.poll()
+        expected = self.rate.interval
+        radar, thermal = await asyncio.gather(self.radar.get_frame(), self.thermal.get_frame())
+        now = time.monotonic()
+        self.telemetry.frame("radar", now, expected)
+        self.telemetry.frame("thermal", now, expected)
+        status = self.engine.process(radar, thermal)
+        self.telemetry.decided(time.time() - radar['timestamp'])
+        self.rate.observe(radar['timestamp'], abs(radar['velocity']), self.engine.snn.membrane())
+        if self.sink is not None:
+            self.sink(status, radar, thermal)
+        return status
+
+    async def run(self):
+        await asyncio.gather(self.radar.connect(), self.thermal.connect())
+        while True:
+            await self.step()
\ No newline at end of file
@@ -0,0 +1,46 @@
+import logging
+from edge.config import config
+
+logger = logging.getLogger("Hakilix.Rate")
+
+class AdaptiveRateController:
+    """Activity-driven frame interval shared by the sensor drivers.
+
+    Any frame with motion energy or SNN membrane potential above its level
+    snaps the drivers back to the full rate; only after `idle_after_s` of
+    uninterrupted quiet do they drop to the idle polling rate.
+    """
+
+    def __init__(self, active_hz=None, idle_hz=None, idle_after_s=None, energy_level=None, membrane_level=None):
+        # Explicit arguments pin a parameter; the rest follow config reloads.
+        self._pinned = {k: v for k, v in dict(FRAME_RATE_HZ=active_hz, IDLE_RATE_HZ=idle_hz, IDLE_AFTER_SECONDS=idle_after_s,
+                                             ACTIVITY_ENERGY_LEVEL=energy_level, ACTIVITY_MEMBRANE_LEVEL=membrane_level).items()
+                        if v is not None}
+        self.interval = None
+        self._last_active = None
+        config.subscribe(self)
+
+    def apply_config(self, cfg):
+        get = lambda name: self._pinned.get(name, getattr(cfg, name))
+        was_idle = self.interval is not None and self.idle
+        self.active_interval = 1.0 / get("FRAME_RATE_HZ")
+        self.idle_interval = 1.0 / get("IDLE_RATE_HZ")
+        self.idle_after_s = get("IDLE_AFTER_SECONDS")
+        self.energy_level = get("ACTIVITY_ENERGY_LEVEL")
+        self.membrane_level = get("ACTIVITY_MEMBRANE_LEVEL")
+        self.interval = self.idle_interval if was_idle else self.active_interval
+
+    @property
+    def idle(self) -> bool:
+        return self.interval == self.idle_interval
+
+    def observe(self, t: float, motion_energy: float, membrane: float) -> float:
+        if self._last_active is None or motion_energy >= self.energy_level or membrane >= self.membrane_level:
+            if self.idle:
+                logger.info("Activity detected, sampling at %.1f Hz", 1.0 / self.active_interval)
+            self._last_active = t
+            self.interval = self.active_interval
+        elif not self.idle and t - self._last_active >= self.idle_after_s:
+            logger.info("Idle for %.0fs, sampling at %.1f Hz", self.idle_after_s, 1.0 / self.idle_interval)
+            self.interval = self.idle_interval
+        return self.interval
\ No newline at end of file
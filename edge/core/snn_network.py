@@ -1,4 +1,5 @@
 import logging
+from edge.config import config
 from edge.core.lif_neuron import LIFNeuron
 logger = logging.getLogger("Hakilix.SNN")
 
@@ -9,6 +10,11 @@ class SpikingNetwork:
             'accel': LIFNeuron(1),
             'thermal': LIFNeuron(2)
         }
+        config.subscribe(self)
+
+    def apply_config(self, cfg):
+        for neuron in self.neurons.values():
+            neuron.apply_config(cfg)
 
     def infer(self, radar_velocity, radar_accel, thermal_variance):
         spikes = {
@@ -18,5 +24,9 @@ class SpikingNetwork:
         }
         is_critical = (spikes['v'] == 1) and (spikes['t'] == 1)
         if is_critical:
-            logger.info(f"SNN COINCIDENCE DETECTED: Spikes={spikes}")
-        return is_critical
\ No newline at end of file
+            logger.info("SNN COINCIDENCE DETECTED: Spikes=%s", spikes)
+        return is_critical
+
+    def membrane(self):
+        # Motion pathway only: thermal variance never settles in an occupied room.
+        return self.neurons['velocity'].v_mem
\ No newline at end of file
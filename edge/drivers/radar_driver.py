@@ -1,16 +1,17 @@
 import asyncio
 import logging
 import random
+import time
 from edge.config import config
 logger = logging.getLogger("Hakilix.Radar")
 
 class RadarDriver:
-    def __init__(self): self.connected = False
+    def __init__(self, rate=None): self.connected = False; self.rate = rate
     async def connect(self):
         logger.info(f"[SIM] Radar IWR6843 initialized.")
         self.connected = True
     async def get_frame(self):
-        await asyncio.sleep(0.1)
+        await asyncio.sleep(self.rate.interval if self.rate else 1.0 / config.FRAME_RATE_HZ)
         is_fall = random.random() > 0.99
         velocity = random.uniform(2.5, 4.0) if is_fall else random.uniform(0.0, 0.5)
-        return {"velocity": velocity, "acceleration": velocity/0.1}
\ No newline at end of file
+        return {"timestamp": time.time(), "velocity": velocity, "acceleration": velocity/0.1}
\ No newline at end of file
@@ -0,0 +1,45 @@
+import logging
+import os
+import numpy as np
+logger = logging.getLogger("Hakilix.Replay")
+
+# A recorded session is a directory holding two float64 .npy arrays:
+#   radar.npy   (N, 3): t, velocity, acceleration
+#   thermal.npy (M, 3): t, max_temp, variance
+RADAR_FIELDS = ("t", "velocity", "acceleration")
+THERMAL_FIELDS = ("t", "max_temp", "variance")
+
+def save_session(path, radar, thermal):
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "radar.npy"), np.asarray(radar, dtype=np.float64).reshape(-1, len(RADAR_FIELDS)))
+    np.save(os.path.join(path, "thermal.npy"), np.asarray(thermal, dtype=np.float64).reshape(-1, len(THERMAL_FIELDS)))
+
+class ReplayDriver:
+    """Streams a recorded session from memory-mapped files.
+
+    Each radar frame is paired with the most recent thermal frame at or
+    before it, the same fusion the live drivers get from running side by side.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.radar = np.load(os.path.join(path, "radar.npy"), mmap_mode="r")
+        self.thermal = np.load(os.path.join(path, "thermal.npy"), mmap_mode="r")
+        self.connected = False
+
+    def __len__(self): return len(self.radar)
+
+    async def connect(self):
+        logger.info("[REPLAY] %s: %d radar / %d thermal frames", self.path, len(self.radar), len(self.thermal))
+        self.connected = True
+
+    def __iter__(self, chunk=4096):
+        # Pair and convert a chunk at a time; per-row numpy scalar access dominates otherwise.
+        thermal_t = self.thermal[:, 0]
+        for start in range(0, len(self.radar), chunk):
+            radar = self.radar[start:start + chunk]
+            idx = np.searchsorted(thermal_t, radar[:, 0], side="right") - 1
+            thermal = np.where((idx >= 0)[:, None], self.thermal[np.maximum(idx, 0)], 0.0)
+            for (t, velocity, acceleration), (t_th, max_temp, variance) in zip(radar.tolist(), thermal.tolist()):
+                yield ({"timestamp": t, "velocity": velocity, "acceleration": acceleration},
+                       {"timestamp": t_th, "max_temp": max_temp, "variance": variance})
\ No newline at end of file
@@ -1,14 +1,15 @@
 import asyncio
 import logging
 import random
+import time
 from edge.config import config
 logger = logging.getLogger("Hakilix.Thermal")
 
 class ThermalDriver:
-    def __init__(self): self.connected = False
+    def __init__(self, rate=None): self.connected = False; self.rate = rate
     async def connect(self):
         logger.info("[SIM] FLIR Lepton initialized.")
         self.connected = True
     async def get_frame(self):
-        await asyncio.sleep(0.1)
-        return {"max_temp": 36.5, "variance": random.uniform(0.1, 0.9)}
\ No newline at end of file
+        await asyncio.sleep(self.rate.interval if self.rate else 1.0 / config.FRAME_RATE_HZ)
+        return {"timestamp": time.time(), "max_temp": 36.5, "variance": random.uniform(0.1, 0.9)}
\ No newline at end of file
@@ -0,0 +1,202 @@
+"""Deterministic fleet load generator for the backend ingest path.
+
+Emulates N seeded virtual residents, each posting SensorWindows to /api/ingest
+on its own schedule, while optional dashboard subscribers listen on /ws.
+
+    python -m edge.loadgen --url http://localhost:8080 --residents 2000 --duration 60 --seed 42 --ws 20
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+from datetime import datetime, timedelta
+
+import httpx
+
+logger = logging.getLogger("Hakilix.LoadGen")
+
+ZONES = ("bedroom", "bathroom", "kitchen", "living_room", "hallway")
+# Daytime activity chain: state -> (next states, weights). Night is handled separately.
+TRANSITIONS = {
+    "idle": (("idle", "active", "walking"), (0.80, 0.15, 0.05)),
+    "active": (("active", "idle", "walking"), (0.70, 0.20, 0.10)),
+    "walking": (("walking", "active", "idle"), (0.60, 0.30, 0.10)),
+}
+ENERGY = {"sleeping": (0.0, 0.03), "idle": (0.0, 0.05), "active": (0.08, 0.3), "walking": (0.35, 0.8)}
+
+class VirtualResident:
+    """One seeded resident: a day/night activity chain plus Poisson-scheduled falls."""
+
+    def __init__(self, index: int, seed: int, falls_per_hour: float, start: datetime):
+        self.patient_id = f"SIM-{index:05d}"
+        self.rng = random.Random(f"{seed}:{index}")
+        self.clock = start + timedelta(seconds=self.rng.uniform(0, 86400))
+        self.state = "idle"
+        self.zone = self.rng.choice(ZONES)
+        self.falls_per_hour = falls_per_hour
+        self._next_fall = self._draw_fall_gap()
+        self.falls = 0
+
+    def _draw_fall_gap(self) -> float:
+        return self.rng.expovariate(self.falls_per_hour / 3600.0) if self.falls_per_hour > 0 else math.inf
+
+    def window(self, dt: float, n_frames: int) -> dict:
+        """Advance the simulated clock by dt seconds and return a SensorWindow payload."""
+        frames = []
+        step = dt / n_frames
+        for _ in range(n_frames):
+            self.clock += timedelta(seconds=step)
+            self._next_fall -= step
+            night = self.clock.hour >= 23 or self.clock.hour < 7
+            if night and self.state != "walking" and self.rng.random() > 0.02:
+                self.state, self.zone = "sleeping", "bedroom"
+            else:
+                if self.state == "sleeping":
+                    self.state = "walking"
+                nxt, weights = TRANSITIONS[self.state]
+                self.state = self.rng.choices(nxt, weights)[0]
+                if self.state == "walking" and self.rng.random() < 0.3:
+                    self.zone = self.rng.choice(ZONES)
+            lo, hi = ENERGY[self.state]
+            frame = {
+                "timestamp": self.clock.isoformat(),
+                "vertical_accel_g": 0.98 + self.rng.uniform(-0.05, 0.05),
+                "posture_angle_deg": 0.0 if self.state == "sleeping" else 90.0,
+                "movement_energy": self.rng.uniform(lo, hi),
+                "zone": self.zone,
+                "is_in_bed": self.state == "sleeping",
+                "step_rate_hz": self.rng.uniform(1.4, 2.0) if self.state == "walking" else 0.0,
+            }
+            if self._next_fall <= 0:
+                frame.update(vertical_accel_g=self.rng.uniform(2.6, 4.5), posture_angle_deg=0.0, movement_energy=2.5, is_in_bed=False)
+                self.state = "idle"
+                self.falls += 1
+                self._next_fall = self._draw_fall_gap()
+            frames.append(frame)
+        return {"patient_id": self.patient_id, "frames": frames}
+
+
+class LoadStats:
+    def __init__(self):
+        self.latencies_ms = []
+        self.status = {}
+        self.errors = 0
+        self.alerts = 0
+        self.ws_messages = 0
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies_ms:
+            return 0.0
+        ordered = sorted(self.latencies_ms)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def _send(client, url, payload, stats, sem, scheduled):
+    async with sem:
+        try:
+            res = await client.post(url, json=payload)
+            # From the scheduled send time, so time spent queued behind a slow backend counts (no coordinated omission).
+            stats.latencies_ms.append((time.perf_counter() - scheduled) * 1000.0)
+            stats.status[res.status_code] = stats.status.get(res.status_code, 0) + 1
+            if res.status_code >= 400:
+                stats.errors += 1
+            elif res.json().get("type") == "CRITICAL_FALL":
+                stats.alerts += 1
+        except httpx.HTTPError as e:
+            stats.errors += 1
+            stats.status[type(e).__name__] = stats.status.get(type(e).__name__, 0) + 1
+
+
+async def _resident_loop(client, url, resident, stats, sem, t_end, interval, n_frames):
+    # Seeded phase offset spreads residents across the interval instead of a thundering herd.
+    next_send = time.perf_counter() + resident.rng.uniform(0, interval)
+    inflight = set()
+    while next_send < t_end:
+        delay = next_send - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # Open loop: each window goes out on schedule in its own task, so a slow response never delays the next.
+        task = asyncio.create_task(_send(client, url, resident.window(interval, n_frames), stats, sem, next_send))
+        inflight.add(task)
+        task.add_done_callback(inflight.discard)
+        next_send += interval
+    if inflight:
+        await asyncio.gather(*inflight)
+
+
+async def _subscriber(ws_url, stats, t_end):
+    import websockets
+    try:
+        async with websockets.connect(ws_url) as ws:
+            while True:
+                remaining = t_end - time.perf_counter()
+                if remaining <= 0:
+                    return
+                try:
+                    await asyncio.wait_for(ws.recv(), timeout=remaining)
+                    stats.ws_messages += 1
+                except asyncio.TimeoutError:
+                    return
+    except Exception as e:
+        logger.warning("WebSocket subscriber failed: %s", e)
+        stats.errors += 1
+
+
+async def run_load(base_url="http://localhost:8080", residents=100, duration=10.0, rate_hz=1.0, seed=0,
+                   ws_clients=0, concurrency=256, frames_per_window=1, falls_per_hour=0.5, transport=None) -> dict:
+    """Drive /api/ingest (and /ws) for `duration` seconds and return a summary dict."""
+    stats = LoadStats()
+    start = datetime(2025, 1, 6)
+    fleet = [VirtualResident(i, seed, falls_per_hour, start) for i in range(residents)]
+    sem = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    t0 = time.perf_counter()
+    t_end = t0 + duration
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=10.0, transport=transport) as client:
+        tasks = [_resident_loop(client, "/api/ingest", r, stats, sem, t_end, 1.0 / rate_hz, frames_per_window) for r in fleet]
+        ws_url = base_url.replace("http", "ws", 1).rstrip("/") + "/ws"
+        tasks += [_subscriber(ws_url, stats, t_end) for _ in range(ws_clients)]
+        await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - t0
+    sent = len(stats.latencies_ms)
+    return {
+        "residents": residents, "duration_s": round(elapsed, 2), "requests": sent,
+        "throughput_rps": round(sent / elapsed, 1), "offered_rps": round(residents * rate_hz, 1),
+        "p50_ms": round(stats.percentile(0.50), 2), "p99_ms": round(stats.percentile(0.99), 2),
+        "max_ms": round(max(stats.latencies_ms, default=0.0), 2),
+        "errors": stats.errors, "error_rate": round(stats.errors / max(1, sent + stats.errors), 4),
+        "status": {str(k): v for k, v in sorted(stats.status.items(), key=lambda kv: str(kv[0]))},
+        "falls_injected": sum(r.falls for r in fleet), "alerts_returned": stats.alerts,
+        "ws_clients": ws_clients, "ws_messages": stats.ws_messages,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m edge.loadgen", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8080")
+    parser.add_argument("--residents", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load")
+    parser.add_argument("--rate", type=float, default=1.0, help="windows per resident per second")
+    parser.add_argument("--frames", type=int, default=1, help="frames per window")
+    parser.add_argument("--falls-per-hour", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ws", type=int, default=0, help="number of /ws subscribers")
+    parser.add_argument("--concurrency", type=int, default=256, help="max in-flight requests")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    report = asyncio.run(run_load(args.url, args.residents, args.duration, args.rate, args.seed, args.ws,
+                                  args.concurrency, args.frames, args.falls_per_hour))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"--- HAKILIX LOAD: {report['residents']} residents, {report['duration_s']}s ---")
+    print(f"requests: {report['requests']}  throughput: {report['throughput_rps']} req/s (offered {report['offered_rps']})")
+    print(f"latency: p50 {report['p50_ms']} ms  p99 {report['p99_ms']} ms  max {report['max_ms']} ms")
+    print(f"errors: {report['errors']} ({report['error_rate']:.2%})  status: {report['status']}")
+    print(f"falls injected: {report['falls_injected']}  alerts returned: {report['alerts_returned']}  ws messages: {report['ws_messages']}")
+
+if __name__ == "__main__": main()
@@ -1,37 +1,85 @@
-import time, random, logging, requests, os
+import asyncio, logging, os
 from datetime import datetime
+from common.logger import install_async_logging
+from edge.config import config
+from edge.core.pipeline import EdgePipeline
+from edge.uplink import MqttUplink, StreamUplink, Uplink
+from edge.utils.telemetry import telemetry
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("Hakilix")
-BACKEND_URL = f"{os.environ.get('CLOUD_URL', 'http://localhost:8080')}/api/ingest"
+CLOUD_URL = os.environ.get('CLOUD_URL', 'http://localhost:8080')
+BACKEND_URL = f"{CLOUD_URL}/api/ingest"
 DEVICE_ID = "HKLX-01"
+WINDOW_SECONDS = 1.0  # frames per uplink window; an alert closes its window at once
+G = 9.81
 
-def run():
-    print("--- HAKILIX EDGE SENSOR ACTIVE ---")
+def to_frame(status, radar, thermal):
+    """Backend SensorFrame for one fused radar/thermal reading."""
+    fall = status == "CRITICAL_ALERT"
+    return {
+        "timestamp": datetime.fromtimestamp(radar["timestamp"]).isoformat(),
+        "vertical_accel_g": radar["acceleration"] / G,
+        "posture_angle_deg": 0.0 if fall else 90.0,
+        "movement_energy": radar["velocity"],
+        "zone": "living_room",
+        "is_in_bed": False,
+    }
+
+class WindowBuffer:
+    """Pipeline sink: groups decided frames into uplink windows and queues them for the sender."""
+
+    def __init__(self, engine, outbox, seconds=WINDOW_SECONDS):
+        self.engine = engine
+        self.outbox = outbox
+        self.seconds = seconds
+        self.frames = []
+        self.opened = None
+        self.evidence = []  # completed pre/post-event bundles, one per outgoing window
+
+    def __call__(self, status, radar, thermal):
+        if self.opened is None: self.opened = radar["timestamp"]
+        self.frames.append(to_frame(status, radar, thermal))
+        self.evidence.extend(self.engine.pop_evidence())
+        if status != "CRITICAL_ALERT" and radar["timestamp"] - self.opened < self.seconds:
+            return
+        body = {"patient_id": DEVICE_ID, "frames": self.frames}
+        if self.evidence: body["evidence"] = self.evidence.pop(0)
+        summary = telemetry.maybe_summary()
+        if summary: body["telemetry"] = summary
+        self.outbox.put_nowait(body)
+        self.frames, self.opened = [], None
+
+def make_uplink():
+    seq_path = os.environ.get("HAKILIX_SEQ_FILE", f".hakilix-{DEVICE_ID}.seq")
+    if config.UPLINK == "mqtt":
+        return MqttUplink(DEVICE_ID, config.MQTT_BROKER, config.MQTT_PORT, seq_path,
+                          config.MQTT_BATCH_WINDOWS, config.MQTT_BATCH_SECONDS)
+    if config.UPLINK == "ws":
+        return StreamUplink(f"{CLOUD_URL.replace('http', 'ws', 1)}/ws/device/{DEVICE_ID}", DEVICE_ID, seq_path)
+    return Uplink(BACKEND_URL, DEVICE_ID, seq_path=seq_path)
+
+async def send_windows(uplink, outbox):
+    """Sends off the acquisition loop, so a slow uplink never delays the next frame."""
     while True:
+        body = await outbox.get()
         try:
-            accel_z = 0.98 + random.uniform(-0.05, 0.05)
-            is_fall_sim = False
-            
-            if random.random() > 0.95:
-                accel_z = 4.1
-                is_fall_sim = True
-                logger.warning(f"SIMULATING IMPACT: {accel_z:.2f}G")
-
-            frame = {
-                "timestamp": datetime.now().isoformat(),
-                "vertical_accel_g": accel_z,
-                "posture_angle_deg": 90.0 if not is_fall_sim else 0.0,
-                "movement_energy": 0.5 if not is_fall_sim else 2.5,
-                "zone": "living_room",
-                "is_in_bed": False,
-                "step_rate_hz": 1.2
-            }
-            
-            requests.post(BACKEND_URL, json={"patient_id": DEVICE_ID, "frames": [frame]}, timeout=1)
-            time.sleep(1.0)
-            
-        except KeyboardInterrupt: break
-        except Exception as e: pass; time.sleep(2)
-
-if __name__ == "__main__": run()
\ No newline at end of file
+            if not await asyncio.to_thread(uplink.send, body): telemetry.retry()
+        except Exception:
+            logger.exception("Uplink send failed")
+            telemetry.retry()
+
+async def run():
+    install_async_logging()
+    print("--- HAKILIX EDGE SENSOR ACTIVE ---")
+    outbox = asyncio.Queue()
+    pipeline = EdgePipeline()
+    pipeline.sink = WindowBuffer(pipeline.engine, outbox)
+    sender = asyncio.create_task(send_windows(make_uplink(), outbox))
+    try:
+        await pipeline.run()
+    finally:
+        sender.cancel()
+
+if __name__ == "__main__":
+    try: asyncio.run(run())
+    except KeyboardInterrupt: pass
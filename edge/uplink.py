@@ -0,0 +1,189 @@
+"""Sequenced, retrying uplink from the edge to the backend, over HTTP, MQTT or a streaming WebSocket.
+
+Every window gets the next per-device sequence number and waits in a bounded
+outbox until the backend accepts it, so an outage is followed by an in-order
+catch-up rather than lost windows. Retries reuse the same number and the
+backend drops the copies it has already processed.
+
+Sequence numbers survive restarts: the counter reserves blocks of numbers in
+a small state file, so a restart skips at most one block and never reuses one.
+"""
+import json
+import logging
+import os
+import time
+from collections import deque
+from itertools import islice
+
+import requests
+from websockets.exceptions import WebSocketException
+from websockets.sync.client import connect as ws_connect
+
+from common.mqtt import MqttError, MqttPublisher
+
+logger = logging.getLogger("Hakilix.Uplink")
+
+
+class SequenceCounter:
+    def __init__(self, path=None, block=1000):
+        self.path = path
+        self.block = block
+        self.next = 0
+        self.reserved = 0
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.next = self.reserved = int(f.read().strip() or 0)
+
+    def take(self):
+        if self.next >= self.reserved:
+            self.reserved = self.next + self.block
+            if self.path:
+                tmp = self.path + ".tmp"
+                with open(tmp, "w") as f:
+                    f.write(str(self.reserved))
+                os.replace(tmp, self.path)
+        seq = self.next
+        self.next += 1
+        return seq
+
+
+class _Outbox:
+    def __init__(self, device_id, seq_path=None, max_backlog=3600):
+        self.device_id = device_id
+        self.counter = SequenceCounter(seq_path)
+        self.outbox = deque(maxlen=max_backlog)  # oldest windows are shed if an outage outlasts the backlog
+
+    def _stamp(self, body):
+        body["device_id"] = self.device_id
+        body["seq"] = self.counter.take()
+        self.outbox.append(body)
+
+
+class Uplink(_Outbox):
+    """HTTP POST per window."""
+
+    def __init__(self, url, device_id, seq_path=None, max_backlog=3600, timeout=1.0, session=None):
+        super().__init__(device_id, seq_path, max_backlog)
+        self.url = url
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.hold_until = 0.0  # set from Retry-After when the backend is shedding load
+
+    def send(self, body):
+        """Stamp and queue a window, then try to deliver the backlog. False if anything is left queued."""
+        self._stamp(body)
+        if time.monotonic() < self.hold_until:
+            return False
+        return self.flush()
+
+    def flush(self):
+        while self.outbox:
+            try:
+                res = self.session.post(self.url, json=self.outbox[0], timeout=self.timeout)
+            except requests.RequestException as e:
+                logger.warning("Uplink failed (%d queued): %s", len(self.outbox), e)
+                return False
+            if res.status_code == 429:
+                retry_after = res.headers.get("Retry-After", "1")
+                self.hold_until = time.monotonic() + (float(retry_after) if retry_after.isdigit() else 1.0)
+            if res.status_code >= 500 or res.status_code == 429:
+                logger.warning("Uplink rejected with %d (%d queued)", res.status_code, len(self.outbox))
+                return False
+            # Anything else is final: accepted, 409 for a window the backend already has, or a 4xx a retry cannot fix.
+            self.outbox.popleft()
+        return True
+
+
+class MqttUplink(_Outbox):
+    """Batches windows into one QoS-1 MQTT message on `hakilix/<device>/windows` over a persistent connection.
+
+    A batch goes out when it reaches `batch_windows` or its oldest window is
+    `batch_seconds` old; it leaves the outbox only once the broker acks it.
+    """
+
+    def __init__(self, device_id, host, port=1883, seq_path=None, batch_windows=10, batch_seconds=1.0,
+                 max_backlog=3600, publisher=None):
+        super().__init__(device_id, seq_path, max_backlog)
+        self.topic = f"hakilix/{device_id}/windows"
+        self.batch_windows = batch_windows
+        self.batch_seconds = batch_seconds
+        self.publisher = publisher or MqttPublisher(host, port, client_id=f"hakilix-{device_id}")
+        self._oldest = None
+
+    def send(self, body):
+        self._stamp(body)
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+        if len(self.outbox) < self.batch_windows and time.monotonic() - self._oldest < self.batch_seconds:
+            self.publisher.ping_if_idle()
+            return True
+        return self.flush()
+
+    def flush(self):
+        while self.outbox:
+            batch = list(islice(self.outbox, self.batch_windows))
+            try:
+                self.publisher.publish(self.topic, json.dumps(batch).encode("utf-8"), qos=1)
+            except (OSError, MqttError) as e:
+                logger.warning("MQTT uplink failed (%d queued): %s", len(self.outbox), e)
+                return False
+            for _ in batch:
+                self.outbox.popleft()
+        self._oldest = None
+        return True
+
+
+class StreamUplink(_Outbox):
+    """Pipelines windows over one persistent device WebSocket (`/ws/device/<patient_id>`).
+
+    Up to the server-granted credit of windows are in flight at once; each
+    leaves the outbox when its in-order ack arrives. After a reconnect the
+    unacked windows are resent with their original sequence numbers.
+    """
+
+    def __init__(self, url, device_id, seq_path=None, max_backlog=3600, timeout=1.0):
+        super().__init__(device_id, seq_path, max_backlog)
+        self.url = f"{url}?device_id={device_id}"
+        self.timeout = timeout
+        self.ws = None
+        self.credit = 1
+        self.inflight = 0
+
+    def send(self, body):
+        body = {k: v for k, v in body.items() if k != "patient_id"}  # implied by the socket path
+        self._stamp(body)
+        return self.flush()
+
+    def flush(self, wait=False):
+        """Send what the credit allows and collect acks; with wait=True, block until the outbox is empty."""
+        try:
+            if self.ws is None:
+                self.ws = ws_connect(self.url, open_timeout=self.timeout).__enter__()  # long-lived; closed in close()
+                self.credit = json.loads(self.ws.recv(self.timeout))["credit"]
+                self.inflight = 0
+            while self.outbox:
+                while self.inflight < min(self.credit, len(self.outbox)):
+                    self.ws.send(json.dumps(self.outbox[self.inflight]))
+                    self.inflight += 1
+                blocking = wait or self.inflight >= self.credit
+                try:
+                    ack = json.loads(self.ws.recv(self.timeout if blocking else 0))
+                except TimeoutError:
+                    if blocking:
+                        raise
+                    return True
+                if ack["status"] == "invalid":
+                    logger.warning("Backend rejected window %s", ack["ack"])
+                self.outbox.popleft()
+                self.inflight -= 1
+                self.credit = ack["credit"]
+            return True
+        except (OSError, TimeoutError, WebSocketException) as e:
+            logger.warning("Stream uplink failed (%d queued): %s", len(self.outbox), e)
+            self.close()
+            return False
+
+    def close(self):
+        if self.ws is not None:
+            self.ws.close()
+            self.ws = None
@@ -0,0 +1,131 @@
+import time
+from bisect import bisect_left
+from edge.config import config
+
+# Bucket upper bounds in seconds, roughly log-spaced from 100us to 5s.
+LATENCY_BOUNDS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SENSORS = ("radar", "thermal", "imu")
+
+class FixedHistogram:
+    """Preallocated bucket counts; observe() and reset() never allocate."""
+    __slots__ = ("bounds", "counts", "n", "total", "max")
+
+    def __init__(self, bounds=LATENCY_BOUNDS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.n = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.n += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile, clamped to the observed max."""
+        if not self.n:
+            return 0.0
+        rank = q * self.n
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+        return self.max
+
+    def reset(self):
+        counts = self.counts
+        for i in range(len(counts)):
+            counts[i] = 0
+        self.n = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class SensorStats:
+    __slots__ = ("last_t", "interval", "jitter", "late", "dropped")
+
+    def __init__(self):
+        self.last_t = None
+        self.interval = FixedHistogram()
+        self.jitter = FixedHistogram()
+        self.late = 0
+        self.dropped = 0
+
+    def reset(self):
+        self.interval.reset()
+        self.jitter.reset()
+        self.late = 0
+        self.dropped = 0
+
+
+class EdgeTelemetry:
+    """Edge health counters for one acquisition loop.
+
+    Written only from the loop that owns it, so there are no locks; every
+    structure is allocated up front and reset in place each summary window.
+    """
+
+    def __init__(self, sensors=SENSORS, summary_seconds=None):
+        self.sensors = {name: SensorStats() for name in sensors}
+        self.decision = FixedHistogram()
+        self.uplink_retries = 0
+        self.summary_seconds = summary_seconds
+        self._window_start = time.monotonic()
+
+    def frame(self, sensor: str, t: float, expected_interval: float):
+        """Record a frame arrival at monotonic time t for a sensor expected every `expected_interval` s."""
+        s = self.sensors[sensor]
+        last, s.last_t = s.last_t, t
+        if last is None:
+            return
+        interval = t - last
+        s.interval.observe(interval)
+        s.jitter.observe(abs(interval - expected_interval))
+        if interval > 1.5 * expected_interval:
+            s.late += 1
+            s.dropped += int(interval / expected_interval + 0.5) - 1
+
+    def decided(self, latency_s: float):
+        self.decision.observe(latency_s)
+
+    def retry(self):
+        self.uplink_retries += 1
+
+    def summary(self, now=None) -> dict:
+        now = time.monotonic() if now is None else now
+        ms = lambda v: round(v * 1000.0, 2)
+        out = {
+            "window_s": round(now - self._window_start, 1),
+            "decision_ms": {"n": self.decision.n, "p50": ms(self.decision.quantile(0.5)),
+                            "p99": ms(self.decision.quantile(0.99)), "max": ms(self.decision.max)},
+            "sensors": {},
+            "uplink_retries": self.uplink_retries,
+        }
+        for name, s in self.sensors.items():
+            if s.interval.n:
+                out["sensors"][name] = {"n": s.interval.n, "interval_ms_p50": ms(s.interval.quantile(0.5)),
+                                        "jitter_ms_p99": ms(s.jitter.quantile(0.99)), "late": s.late, "dropped": s.dropped}
+        return out
+
+    def reset(self, now=None):
+        for s in self.sensors.values():
+            s.reset()
+        self.decision.reset()
+        self.uplink_retries = 0
+        self._window_start = time.monotonic() if now is None else now
+
+    def maybe_summary(self, now=None):
+        """Summary of the current window once it is due (then starts a new window), else None."""
+        now = time.monotonic() if now is None else now
+        period = self.summary_seconds or config.TELEMETRY_SUMMARY_SECONDS
+        if now - self._window_start < period:
+            return None
+        out = self.summary(now)
+        self.reset(now)
+        return out
+
+telemetry = EdgeTelemetry()
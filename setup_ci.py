@@ -36,7 +36,7 @@ jobs:
         
     - name: Run Unit Tests
       run: |
-        python -m unittest discover tests
+        python -m unittest discover -s tests -t .  # -t . imports tests as a package, so tests/__init__.py applies
 """
 
 # 3. Write the file
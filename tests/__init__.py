@@ -0,0 +1,2 @@
+import os
+os.environ.setdefault("HAKILIX_DB", ":memory:")  # never write to the tracked hakilix.db
@@ -0,0 +1,72 @@
+import asyncio
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from fastapi.testclient import TestClient
+from backend import admission, server
+from edge.uplink import Uplink
+
+FALL = {"timestamp": "2025-01-06T10:00:00", "vertical_accel_g": 3.9, "posture_angle_deg": 0.0, "movement_energy": 2.5}
+CALM = {**FALL, "vertical_accel_g": 1.0, "movement_energy": 0.1}
+
+class TestTokenBuckets(unittest.TestCase):
+    def test_burst_then_refill(self):
+        buckets = admission.TokenBuckets(rate=2, burst=3)
+        self.assertEqual([buckets.take("a", now=100.0) for _ in range(3)], [0.0] * 3)
+        self.assertAlmostEqual(buckets.take("a", now=100.0), 0.5)
+        self.assertEqual(buckets.take("b", now=100.0), 0.0)  # other keys are unaffected
+        self.assertEqual(buckets.take("a", now=100.5), 0.0)
+
+class TestFairScheduler(unittest.TestCase):
+    def test_alerts_first_then_round_robin_by_key(self):
+        async def scenario():
+            sched = admission.FairScheduler(concurrency=1, max_queued=4)
+            self.assertTrue(await sched.acquire("busy", False))
+            order = []
+            async def window(key, alert):
+                await sched.acquire(key, alert)
+                order.append(key)
+                sched.release()
+            tasks = [asyncio.create_task(window(k, k == "fall")) for k in ("a", "a", "a", "b", "fall")]
+            await asyncio.sleep(0)
+            self.assertFalse(await sched.acquire("c", False))  # telemetry queue is full
+            sched.release()
+            await asyncio.gather(*tasks)
+            return order, sched.free
+        order, free = asyncio.run(scenario())
+        self.assertEqual(order, ["fall", "a", "b", "a", "a"])
+        self.assertEqual(free, 1)
+
+class TestIngestAdmission(unittest.TestCase):
+    def test_telemetry_gets_429_but_falls_still_land(self):
+        client = TestClient(server.app)
+        limit, server.INGEST_LIMIT = server.INGEST_LIMIT, admission.TokenBuckets(rate=0.5, burst=2)
+        try:
+            codes = [client.post("/api/ingest", json={"patient_id": "ADM-01", "frames": [CALM]}).status_code for _ in range(3)]
+            throttled = client.post("/api/ingest", json={"patient_id": "ADM-01", "frames": [CALM]})
+            fall = client.post("/api/ingest", json={"patient_id": "ADM-01", "frames": [FALL]})
+        finally:
+            server.INGEST_LIMIT = limit
+        self.assertEqual(codes, [200, 200, 429])
+        self.assertEqual(throttled.headers["retry-after"], "2")
+        self.assertEqual(fall.json()["type"], "CRITICAL_FALL")
+
+    def test_uplink_holds_off_for_retry_after(self):
+        client, posts = TestClient(server.app), []
+        class Session:
+            def post(self, url, json, timeout):
+                posts.append(json["seq"])
+                return client.post("/api/ingest", json=json)
+        limit, server.INGEST_LIMIT = server.INGEST_LIMIT, admission.TokenBuckets(rate=0.1, burst=1)
+        try:
+            up = Uplink("http://backend/api/ingest", "DEV-ADM-02", session=Session())
+            results = [up.send({"patient_id": "ADM-02", "frames": [CALM]}) for _ in range(4)]
+        finally:
+            server.INGEST_LIMIT = limit
+        self.assertEqual(results, [True, False, False, False])
+        self.assertEqual(posts, [0, 1])  # nothing more is sent until the Retry-After has passed
+        self.assertEqual(len(up.outbox), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import gzip
+import os
+import sys
+import tempfile
+import unittest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from fastapi.testclient import TestClient
+from backend.assets import Asset, load_dir
+from backend.server import app
+
+class TestStaticAssets(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+
+    def test_dashboard_is_precompressed_and_revalidated(self):
+        with open(os.path.join(os.path.dirname(__file__), "..", "web", "index.html"), "rb") as f:
+            html = f.read()
+        res = self.client.get("/", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(res.headers["content-encoding"], "gzip")
+        self.assertEqual(res.content, html)  # httpx decodes the gzip body
+        self.assertLess(int(res.headers["content-length"]), len(html))
+        again = self.client.get("/", headers={"If-None-Match": res.headers["etag"]})
+        self.assertEqual((again.status_code, again.content), (304, b""))
+
+    def test_unhashed_mount_files_are_revalidated(self):
+        res = self.client.get("/frontend/js/mock_api.js", headers={"Accept-Encoding": "identity"})
+        self.assertEqual(res.status_code, 200)
+        self.assertNotIn("content-encoding", res.headers)
+        self.assertEqual(res.headers["cache-control"], "no-cache")
+        self.assertEqual(self.client.get("/public/").headers["cache-control"], "no-cache")
+        self.assertEqual(self.client.get("/public/").headers["etag"], self.client.get("/public/index.html").headers["etag"])
+        self.assertEqual(self.client.get("/public/missing.js").status_code, 404)
+
+    def test_only_hashed_names_are_long_lived(self):
+        with tempfile.TemporaryDirectory() as d:
+            for name in ("app.3f9a1c2e.js", "index.html", "v2.js"):
+                with open(os.path.join(d, name), "w") as f:
+                    f.write("x")
+            table = load_dir(d, "public, max-age=86400, immutable")
+        self.assertEqual({k: a.cache_control for k, a in table.items()},
+                         {"app.3f9a1c2e.js": "public, max-age=86400, immutable", "index.html": "no-cache", "v2.js": "no-cache"})
+
+    def test_gzip_refused_with_q_zero(self):
+        asset = Asset(b"x" * 1000, "text/plain", "no-cache")
+        res = asset.response({"accept-encoding": "gzip;q=0"})
+        self.assertEqual(res.body, b"x" * 1000)
+        self.assertEqual(gzip.decompress(asset.encoded["gzip"]), b"x" * 1000)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import random
+import sys
+import unittest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from fastapi.testclient import TestClient
+from backend.baseline import BaselineTracker, WARMUP
+from backend.server import app
+
+def frame(t, posture=90.0, steps=0.0, velocity=None):
+    return SimpleNamespace(timestamp=datetime.fromtimestamp(t, timezone.utc).isoformat(), posture_angle_deg=posture,
+                           step_rate_hz=steps, gait_velocity_mps=velocity)
+
+def walk(t, rate, velocity, n=5):
+    return [frame(t + i, steps=rate, velocity=velocity) for i in range(n)] + [frame(t + n)]
+
+class TestBaselineDrift(unittest.TestCase):
+    def test_stable_resident_does_not_drift(self):
+        rng, tracker = random.Random(1), BaselineTracker()
+        for i in range(200):
+            self.assertEqual(tracker.observe("P1", walk(i * 100, rng.gauss(1.8, 0.05), rng.gauss(1.0, 0.05))), [])
+        state = tracker.get("P1")
+        self.assertAlmostEqual(state["step_rate"]["baseline_mean"], 1.8, delta=0.05)
+        self.assertFalse(state["gait_velocity"]["drifting"])
+
+    def test_slowing_gait_is_flagged_once(self):
+        rng, tracker = random.Random(2), BaselineTracker()
+        for i in range(WARMUP * 3):
+            tracker.observe("P1", walk(i * 100, 1.8, rng.gauss(1.0, 0.05)))
+        notes = []
+        for i in range(20):
+            notes += tracker.observe("P1", walk((WARMUP * 3 + i) * 100, 1.8, rng.gauss(0.7, 0.05)))
+        self.assertEqual(len(notes), 1)
+        self.assertTrue(notes[0].startswith("Gait velocity drifting below"))
+        self.assertTrue(tracker.get("P1")["gait_velocity"]["drifting"])
+
+    def test_transfer_time_from_posture(self):
+        tracker = BaselineTracker()
+        tracker.observe("P1", [frame(0, 0.0), frame(10, 0.0), frame(13, 50.0), frame(14, 90.0)])
+        self.assertEqual(tracker.get("P1")["transfer_time"]["baseline_mean"], 4.0)
+
+class TestBaselineEndpoint(unittest.TestCase):
+    def test_endpoint(self):
+        client = TestClient(app)
+        self.assertEqual(client.get("/api/baseline/BASE-01").status_code, 404)
+        frames = [{"timestamp": "2025-01-06T10:00:%02dZ" % s, "vertical_accel_g": 1.0, "posture_angle_deg": 90.0,
+                   "movement_energy": 0.4, "step_rate_hz": 1.8 if s < 5 else 0.0, "gait_velocity_mps": 1.1} for s in range(6)]
+        client.post("/api/ingest", json={"patient_id": "BASE-01", "frames": frames})
+        res = client.get("/api/baseline/BASE-01").json()
+        self.assertEqual(res["metrics"]["gait_velocity"]["n"], 1)
+        self.assertEqual(res["metrics"]["step_rate"]["baseline_mean"], 1.8)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from pydantic import ValidationError
+from edge.config import ConfigStore, config
+from edge.core.fusion_engine import FusionEngine
+
+class TestConfig(unittest.TestCase):
+    def tearDown(self):
+        config.reset()
+
+    def test_snapshot_is_immutable(self):
+        with self.assertRaises(AttributeError):
+            config.snapshot.LIF_DECAY = 0.5
+
+    def test_invalid_update_keeps_previous_snapshot(self):
+        before = config.snapshot
+        with self.assertRaises(ValidationError):
+            config.update(LIF_THRESHOLD=-1.0)
+        self.assertIs(config.snapshot, before)
+
+    def test_update_reaches_live_engine(self):
+        engine = FusionEngine()
+        config.update(LIF_DECAY=0.5, FALL_VELOCITY_LIMIT=3.0)
+        self.assertEqual(engine.fall_velocity_limit, 3.0)
+        self.assertEqual(engine.snn.neurons['velocity'].decay, 0.5)
+
+    def test_file_hot_reload(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "edge.json")
+            with open(path, "w") as f:
+                json.dump({"FALL_VELOCITY_LIMIT": 2.5}, f)
+            store = ConfigStore(path)
+            self.assertEqual(store.snapshot.FALL_VELOCITY_LIMIT, 2.5)
+            with open(path, "w") as f:
+                json.dump({"FALL_VELOCITY_LIMIT": 1.5}, f)
+            os.utime(path, (1, 1))
+            self.assertTrue(store.poll(now=1e12))
+            self.assertEqual(store.snapshot.FALL_VELOCITY_LIMIT, 1.5)
+            with open(path, "w") as f:
+                json.dump({"LIF_DECAY": 7}, f)
+            os.utime(path, (2, 2))
+            self.assertFalse(store.poll(now=2e12))
+            self.assertEqual(store.snapshot.FALL_VELOCITY_LIMIT, 1.5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -20,7 +20,7 @@ class TestHakilixCore(unittest.TestCase):
     def test_critical_fall_logic(self):
         radar = {'velocity': 4.5, 'acceleration': 9.8}
         thermal = {'variance': 0.8, 'max_temp': 36.5}
-        config.FALL_VELOCITY_LIMIT = 2.0
+        config.update(FALL_VELOCITY_LIMIT=2.0)
         self.engine.snn.neurons['velocity'].v_mem = 2.0
         self.engine.snn.neurons['thermal'].v_mem = 2.0
         status = self.engine.process(radar, thermal)
@@ -0,0 +1,55 @@
+import os
+import sys
+import threading
+import time
+import unittest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import uvicorn
+from fastapi.testclient import TestClient
+from backend import metrics, server
+from edge.uplink import StreamUplink
+
+FALL = {"timestamp": "2025-01-06T10:00:00", "vertical_accel_g": 3.9, "posture_angle_deg": 0.0, "movement_energy": 2.5}
+CALM = {**FALL, "vertical_accel_g": 1.0, "movement_energy": 0.1}
+
+class TestDeviceStream(unittest.TestCase):
+    def test_windows_are_acked_in_order(self):
+        client = TestClient(server.app)
+        before = metrics.ALERTS.value("HIGH")
+        with client.websocket_connect("/ws/device/STREAM-01?device_id=DEV-STREAM-01") as ws:
+            self.assertEqual(ws.receive_json(), {"type": "hello", "credit": server.DEVICE_CREDIT})
+            ws.send_json({"seq": 0, "frames": [CALM]})
+            ws.send_json({"seq": 1, "frames": [FALL]})
+            ws.send_json([CALM])  # bare frame list, no envelope
+            ws.send_json({"seq": 1, "frames": [FALL]})
+            ws.send_text("not json")
+            acks = [ws.receive_json() for _ in range(5)]
+        self.assertEqual([(a["ack"], a["status"]) for a in acks],
+                         [(0, "ok"), (1, "ok"), (None, "ok"), (1, "ok"), (None, "invalid")])
+        self.assertEqual(metrics.ALERTS.value("HIGH"), before + 1)
+        self.assertEqual(server.SEQUENCES.get("DEV-STREAM-01")["duplicates"], 1)
+        self.assertEqual(len(client.get("/api/events", params={"patient_id": "STREAM-01"}).json()), 3)
+
+class TestStreamUplink(unittest.TestCase):
+    def test_pipelined_windows_survive_a_reconnect(self):
+        srv = uvicorn.Server(uvicorn.Config(server.app, port=0, log_level="warning", lifespan="off"))
+        thread = threading.Thread(target=srv.run, daemon=True)
+        thread.start()
+        while not srv.started: time.sleep(0.01)
+        port = srv.servers[0].sockets[0].getsockname()[1]
+        try:
+            up = StreamUplink(f"ws://127.0.0.1:{port}/ws/device/STREAM-02", "DEV-STREAM-02")
+            for _ in range(5): self.assertTrue(up.send({"patient_id": "STREAM-02", "frames": [CALM]}))
+            up.close()  # drop the connection with windows still unacked
+            for _ in range(3): up.send({"patient_id": "STREAM-02", "frames": [CALM]})
+            self.assertTrue(up.flush(wait=True))
+            up.close()
+            self.assertEqual(len(up.outbox), 0)
+            self.assertEqual(server.SEQUENCES.get("DEV-STREAM-02")["high_water_mark"], 7)
+            self.assertEqual(server.SEQUENCES.get("DEV-STREAM-02")["missing"], 0)
+        finally:
+            srv.should_exit = True
+            thread.join(5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import json
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from datetime import datetime
+from fastapi.testclient import TestClient
+from backend.events import EventLog
+from backend.server import ActivityState, FallDetectionResult, app
+
+FALL = {"timestamp": "2025-01-06T10:00:00", "vertical_accel_g": 3.9, "posture_angle_deg": 0.0, "movement_energy": 2.5}
+
+class TestEventSerialization(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+
+    def test_same_bytes_for_rest_and_websocket(self):
+        with self.client.websocket_connect("/ws") as ws:
+            res = self.client.post("/api/ingest", json={"patient_id": "EVT-01", "frames": [FALL]})
+            pushed = ws.receive_text()
+        self.assertEqual(pushed.encode(), res.content)
+        listed = self.client.get("/api/events", params={"limit": 1}).json()
+        self.assertEqual(listed[0], res.json())
+
+    def test_fall_is_not_duplicated_into_details(self):
+        event = self.client.post("/api/ingest", json={"patient_id": "EVT-02", "frames": [FALL]}).json()
+        self.assertEqual(event["type"], "CRITICAL_FALL")
+        self.assertEqual(event["details"], {})
+        self.assertEqual(event["fall"]["severity"], "HIGH")
+        self.assertEqual(set(event), {"id", "patient_id", "timestamp", "type", "details", "activity", "fall"})
+
+    def test_events_limit(self):
+        for _ in range(3):
+            self.client.post("/api/ingest", json={"patient_id": "EVT-03", "frames": [FALL]})
+        self.assertEqual(len(self.client.get("/api/events", params={"limit": 2}).json()), 2)
+        self.assertEqual(self.client.get("/api/events", params={"limit": 0}).json(), [])
+
+class TestEventLog(unittest.TestCase):
+    def _append(self, log, patient_id, g=1.0):
+        fall = FallDetectionResult(is_fall=g > 2.5, confidence=0.95 if g > 2.5 else 0.0, severity="HIGH" if g > 2.5 else "LOW",
+                                   reason=[f"High-G impact detected: {g:.2f}g"] if g > 2.5 else [], flag_virtual_ward_review=g > 2.5)
+        activity = ActivityState(timestamp=datetime(2025, 1, 6, 10, 0, 0, 250000), label="walking", confidence=0.7,
+                                 is_potential_risk=False, narrative=[])
+        return log.append(patient_id, "CRITICAL_FALL" if fall.is_fall else "TELEMETRY",
+                          datetime(2025, 1, 6, 10, 0, 1), fall, activity)
+
+    def test_round_trip_matches_api_shape(self):
+        log = EventLog(capacity=8)
+        event = log.to_dict(self._append(log, "HKLX-01", g=3.9))
+        self.assertEqual(event["timestamp"], "2025-01-06T10:00:01.000Z")
+        self.assertEqual(event["activity"]["timestamp"], "2025-01-06T10:00:00.250Z")
+        self.assertEqual(event["fall"], {"is_fall": True, "confidence": 0.95, "severity": "HIGH",
+                                         "reason": ["High-G impact detected: 3.90g"],
+                                         "flag_virtual_ward_review": True, "time_to_recover_seconds": None})
+        self.assertEqual(len(event["id"]), 36)
+
+    def test_ring_overwrites_oldest_and_filters_by_patient(self):
+        log = EventLog(capacity=4, body_cache=2)
+        for i in range(10):
+            self._append(log, "A" if i % 2 else "B", g=3.0 if i == 1 else 1.0)
+        self.assertEqual(len(log), 4)
+        self.assertEqual(list(log.recent(10)), [9, 8, 7, 6])
+        self.assertEqual(list(log.recent(10, patient_id="A")), [9, 7])
+        self.assertEqual(list(log.recent(1, patient_id="B")), [8])
+        self.assertNotIn(1, log._extra)
+        with self.assertRaises(KeyError):
+            log.to_dict(5)
+
+    def test_row_is_compact(self):
+        self.assertLessEqual(EventLog(capacity=1).rows.itemsize, 64)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from fastapi.testclient import TestClient
+from backend.server import app
+from edge.core.evidence import Evidence, EvidenceRecorder, FrameRingBuffer
+from edge.core.fusion_engine import FusionEngine
+
+class TestEvidence(unittest.TestCase):
+    def test_ring_buffer_wraps_in_order(self):
+        ring = FrameRingBuffer(4)
+        for i in range(6):
+            ring.push(float(i), i * 0.1, 0.0, 36.5, 0.2)
+        frames = ring.window(0.0, 10.0)
+        self.assertEqual(list(frames[:, 0]), [2.0, 3.0, 4.0, 5.0])
+
+    def test_capture_spans_pre_and_post_window(self):
+        rec = EvidenceRecorder("HKLX-01", pre_seconds=1.0, post_seconds=0.5, max_rate_hz=10)
+        ready = []
+        for i in range(40):
+            t = i * 0.1
+            if i == 20:
+                rec.trigger(t)
+            ready.extend(rec.push(t, 3.0 if i == 20 else 0.2, 0.0, 36.5, 0.4))
+        self.assertEqual(len(ready), 1)
+        t = ready[0].frames[:, 0]
+        self.assertAlmostEqual(t[0], 1.0)
+        self.assertAlmostEqual(t[-1], 2.5)
+
+    def test_payload_round_trip(self):
+        rec = EvidenceRecorder("HKLX-01", pre_seconds=0.3, post_seconds=0.2, max_rate_hz=10)
+        rec.trigger(0.5)
+        ready = []
+        for i in range(10):
+            ready.extend(rec.push(i * 0.1, i, 0.0, 36.5, 0.1))
+        payload = ready[0].to_payload()
+        frames = Evidence.decode(payload)
+        self.assertEqual(payload["fields"][0], "t")
+        self.assertEqual(frames.shape[1], 5)
+        self.assertAlmostEqual(float(frames[0, 0]), -0.3, places=4)
+
+    def test_bundle_reaches_backend_event(self):
+        engine = FusionEngine()
+        engine.recorder.configure("HKLX-01", 0.3, 0.2, 10)
+        engine.recorder.trigger(0.0)
+        for i in range(4):  # t=0.0 is a real timestamp, not "missing"
+            engine.process({"timestamp": i * 0.1, "velocity": 0.1, "acceleration": 1.0}, {"max_temp": 36.5, "variance": 0.2})
+        bundles = engine.pop_evidence()
+        self.assertEqual(len(bundles), 1)
+        self.assertAlmostEqual(float(Evidence.decode(bundles[0])[0, 0]), 0.0, places=4)
+        frame = {"timestamp": "2025-01-06T10:00:00", "vertical_accel_g": 1.0, "posture_angle_deg": 90.0, "movement_energy": 0.2}
+        client = TestClient(app)
+        self.assertEqual(client.post("/api/ingest", json={"patient_id": "EVD-01", "frames": [frame], "evidence": bundles[0]}).status_code, 200)
+        event = client.get("/api/events", params={"patient_id": "EVD-01"}).json()[0]
+        self.assertEqual(event["details"]["evidence"]["data"], bundles[0]["data"])
+
+if __name__ == '__main__':
+    unittest.main()
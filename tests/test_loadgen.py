@@ -0,0 +1,38 @@
+import asyncio
+import os
+import sys
+import unittest
+from datetime import datetime
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import httpx
+from backend.server import app
+from edge.loadgen import VirtualResident, run_load
+
+class TestLoadGen(unittest.TestCase):
+    def test_residents_are_deterministic(self):
+        start = datetime(2025, 1, 6)
+        a = VirtualResident(7, seed=42, falls_per_hour=30, start=start)
+        b = VirtualResident(7, seed=42, falls_per_hour=30, start=start)
+        self.assertEqual([a.window(1.0, 5) for _ in range(50)], [b.window(1.0, 5) for _ in range(50)])
+        self.assertNotEqual(VirtualResident(8, 42, 30, start).window(1.0, 5), VirtualResident(7, 42, 30, start).window(1.0, 5))
+
+    def test_in_process_run_reports_latency(self):
+        transport = httpx.ASGITransport(app=app)
+        report = asyncio.run(run_load("http://testserver", residents=20, duration=1.0, rate_hz=5, seed=1,
+                                      falls_per_hour=3600, transport=transport))
+        self.assertGreater(report["requests"], 0)
+        self.assertEqual(report["errors"], 0)
+        self.assertGreaterEqual(report["p99_ms"], report["p50_ms"])
+        self.assertEqual(report["alerts_returned"], report["falls_injected"])
+
+    def test_slow_backend_does_not_slow_offered_load(self):
+        async def slow(request):
+            await asyncio.sleep(0.3)
+            return httpx.Response(200, json={"type": "TELEMETRY"})
+        report = asyncio.run(run_load("http://testserver", residents=1, duration=1.0, rate_hz=10, falls_per_hour=0,
+                                      transport=httpx.MockTransport(slow)))
+        self.assertGreaterEqual(report["requests"], 9)  # a closed loop would manage about 3
+        self.assertGreaterEqual(report["p50_ms"], 300)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import io
+import json
+import logging
+import os
+import queue
+import subprocess
+import sys
+import unittest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+from common.logger import NonBlockingQueueHandler, install_async_logging, shutdown_logging
+
+class TestAsyncLogging(unittest.TestCase):
+    def tearDown(self):
+        install_async_logging(level="WARNING", stream=sys.stderr)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = NonBlockingQueueHandler(queue.Queue(1))
+        log = logging.getLogger("Hakilix.Test.Drop")
+        log.propagate = False
+        log.addHandler(handler)
+        for i in range(3):
+            log.warning("frame %d", i)
+        record = handler.queue.get_nowait()
+        self.assertEqual(handler.dropped, 2)
+        self.assertEqual((record.msg, record.args), ("frame %d", (0,)))
+
+    def test_json_output_from_writer_thread(self):
+        stream = io.StringIO()
+        install_async_logging(level="INFO", json_output=True, stream=stream)
+        logging.getLogger("Hakilix.Test").info("velocity=%.1f", 3.25)
+        logging.getLogger("Hakilix.Test").debug("gated out")
+        shutdown_logging()
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 1)
+        entry = json.loads(lines[0])
+        self.assertEqual((entry["logger"], entry["level"], entry["msg"]), ("Hakilix.Test", "INFO", "velocity=3.2"))
+
+    def test_mutable_args_are_formatted_at_the_call(self):
+        stream = io.StringIO()
+        install_async_logging(level="INFO", stream=stream)
+        zones = ["kitchen"]
+        logging.getLogger("Hakilix.Test").info("zones=%s n=%d", zones, 1)
+        zones.append("hallway")  # changed before the writer thread gets to the record
+        shutdown_logging()
+        self.assertIn("zones=['kitchen'] n=1", stream.getvalue())
+
+    def test_importing_the_server_leaves_logging_alone(self):
+        code = "import logging, backend.server; print(len(logging.getLogger().handlers))"
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True,
+                             env={**os.environ, "HAKILIX_DB": ":memory:"}).stdout
+        self.assertEqual(out.strip(), "0")
+
+if __name__ == '__main__':
+    unittest.main()
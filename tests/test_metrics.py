@@ -0,0 +1,34 @@
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from fastapi.testclient import TestClient
+from backend import metrics
+from backend.server import app
+
+class TestMetrics(unittest.TestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        h = metrics.Histogram("test_latency_seconds", "test", ("path",), buckets=(0.1, 1.0))
+        metrics.REGISTRY.remove(h)
+        for v in (0.05, 0.5, 5.0):
+            h.observe(v, "/x")
+        lines = h.samples()
+        self.assertIn('test_latency_seconds_bucket{path="/x",le="0.1"} 1', lines)
+        self.assertIn('test_latency_seconds_bucket{path="/x",le="1"} 2', lines)
+        self.assertIn('test_latency_seconds_bucket{path="/x",le="+Inf"} 3', lines)
+        self.assertIn('test_latency_seconds_count{path="/x"} 3', lines)
+
+    def test_ingest_is_instrumented(self):
+        client = TestClient(app)
+        frame = {"timestamp": "2025-01-06T10:00:00", "vertical_accel_g": 3.9, "posture_angle_deg": 0.0, "movement_energy": 2.5}
+        before = metrics.ALERTS.value("HIGH")
+        client.post("/api/ingest", json={"patient_id": "MET-01", "frames": [frame, frame]})
+        text = client.get("/metrics").text
+        self.assertEqual(metrics.ALERTS.value("HIGH"), before + 1)
+        self.assertIn('hakilix_ingest_frames_total{patient_id="MET-01"} 2', text)
+        self.assertIn('path="/api/ingest"', text)
+        self.assertIn('hakilix_analytics_stage_seconds_count{stage="detect_fall"}', text)
+        self.assertIn("hakilix_ws_clients 0", text)
+
+if __name__ == '__main__':
+    unittest.main()
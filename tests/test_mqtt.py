@@ -0,0 +1,90 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from fastapi.testclient import TestClient
+from backend import metrics, server
+from backend.mqtt_broker import MiniBroker
+from backend.mqtt_ingest import MAX_ATTEMPTS, MqttIngest
+from edge.uplink import MqttUplink
+from common import mqtt
+from common.mqtt import MqttPublisher
+
+FALL = {"timestamp": "2025-01-06T10:00:00", "vertical_accel_g": 3.9, "posture_angle_deg": 0.0, "movement_energy": 2.5}
+CALM = {**FALL, "vertical_accel_g": 1.0, "movement_energy": 0.1}
+
+class TestCodec(unittest.TestCase):
+    def test_publish_round_trip_and_wildcards(self):
+        raw = mqtt.publish("hakilix/D1/windows", b"x" * 300, qos=1, packet_id=42, dup=True)
+        flags, body = raw[0] & 0x0F, raw[3:]  # 2-byte remaining length for a 300-byte payload
+        self.assertEqual(mqtt.parse_publish(flags, body), ("hakilix/D1/windows", 42, b"x" * 300, 1, True))
+        self.assertTrue(mqtt.topic_matches("hakilix/+/windows", "hakilix/D1/windows"))
+        self.assertTrue(mqtt.topic_matches("hakilix/#", "hakilix/D1/windows"))
+        self.assertFalse(mqtt.topic_matches("hakilix/+", "hakilix/D1/windows"))
+
+class TestMqttIngest(unittest.TestCase):
+    def test_batches_reach_pipeline_and_redelivery_is_dropped(self):
+        async def scenario():
+            broker = await MiniBroker(port=0).start()
+            ingest = await MqttIngest(server._ingest_from_mqtt, "127.0.0.1", broker.port).start()
+            await asyncio.wait_for(ingest.connected.wait(), 5)
+            up = MqttUplink("DEV-MQTT-01", "127.0.0.1", broker.port, batch_windows=3, batch_seconds=60)
+            before = metrics.ALERTS.value("HIGH")
+            sent = [await asyncio.to_thread(up.send, {"patient_id": "MQTT-01", "frames": [f]}) for f in (CALM, CALM, FALL)]
+            # The broker redelivers the same batch, as after a lost PUBACK.
+            await asyncio.to_thread(up.publisher.publish, up.topic, b'[{"patient_id": "MQTT-01", "device_id": "DEV-MQTT-01", "seq": 2, "frames": [%s]}]'
+                                    % server.events.dumps(FALL))
+            for _ in range(100):
+                if (server.SEQUENCES.get("DEV-MQTT-01") or {}).get("duplicates"):
+                    break
+                await asyncio.sleep(0.02)
+            up.publisher.close()
+            await ingest.close()
+            await broker.close()
+            return sent, before
+
+        sent, before = asyncio.run(scenario())
+        self.assertEqual(sent, [True, True, True])
+        self.assertEqual(metrics.ALERTS.value("HIGH"), before + 1)
+        self.assertEqual(server.SEQUENCES.get("DEV-MQTT-01")["duplicates"], 1)
+        self.assertEqual(server.SEQUENCES.get("DEV-MQTT-01")["high_water_mark"], 2)
+
+    def test_failed_window_is_not_acked_and_comes_back(self):
+        async def scenario(failures):
+            broker = await MiniBroker(port=0).start()
+            seen = []
+            async def handler(window):
+                seen.append(window["n"])
+                if window["n"] == 2 and seen.count(2) <= failures:
+                    raise RuntimeError("database is locked")
+            ingest = await MqttIngest(handler, "127.0.0.1", broker.port, client_id="backend-test").start()
+            await asyncio.wait_for(ingest.connected.wait(), 5)
+            pub = MqttPublisher("127.0.0.1", broker.port, client_id="edge-test")
+            await asyncio.to_thread(pub.publish, "hakilix/D9/windows", b'[{"n": 1}, {"n": 2}]')
+            for _ in range(200):
+                if not broker.sessions["backend-test"].inflight and seen.count(2) > min(failures, MAX_ATTEMPTS - 1):
+                    break
+                await asyncio.sleep(0.02)
+            inflight = dict(broker.sessions["backend-test"].inflight)
+            pub.close()
+            await ingest.close()
+            await broker.close()
+            return seen, inflight
+
+        seen, inflight = asyncio.run(scenario(failures=1))
+        self.assertEqual(seen, [1, 2, 1, 2])  # redelivered whole; window 1 is a duplicate by sequence in the real pipeline
+        self.assertEqual(inflight, {})       # acked once it went through
+        seen, inflight = asyncio.run(scenario(failures=99))
+        self.assertEqual(seen.count(2), MAX_ATTEMPTS)  # then given up on rather than blocking the subscription
+        self.assertEqual(inflight, {})
+
+    def test_shared_mode_needs_a_shared_subscription(self):
+        with mock.patch.multiple(server, SHARED=True, MQTT_BROKER="127.0.0.1:1883", MQTT_TOPIC="hakilix/+/windows"):
+            with self.assertRaises(RuntimeError):
+                with TestClient(server.app):
+                    pass
+
+if __name__ == '__main__':
+    unittest.main()
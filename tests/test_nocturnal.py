@@ -0,0 +1,53 @@
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from types import SimpleNamespace
+from fastapi.testclient import TestClient
+from backend.nocturnal import NocturnalTracker
+from backend.server import app
+
+def frame(ts, zone, in_bed):
+    return SimpleNamespace(timestamp=ts, zone=zone, is_in_bed=in_bed)
+
+NIGHT = [
+    frame("2025-01-06T21:30:00Z", "bathroom", False),  # evening, not counted
+    frame("2025-01-06T22:30:00Z", "bedroom", True),
+    frame("2025-01-07T01:00:00Z", "bedroom", False),   # bed exit
+    frame("2025-01-07T01:01:00Z", "bathroom", False),  # bathroom visit
+    frame("2025-01-07T01:05:00Z", "bedroom", True),
+    frame("2025-01-07T04:00:00Z", "hallway", False),   # bed exit
+    frame("2025-01-07T04:02:00Z", "bathroom", False),  # bathroom visit
+    frame("2025-01-07T04:03:00Z", "bathroom", False),  # same visit
+    frame("2025-01-07T04:06:00Z", "bedroom", True),
+]
+
+class TestNocturnalTracker(unittest.TestCase):
+    def test_counts_per_night(self):
+        tracker = NocturnalTracker()
+        tracker.observe("P1", NIGHT[:5])
+        tracker.observe("P1", NIGHT[5:])  # state carries across windows
+        self.assertEqual(tracker.get("P1")["current"], {"night": "2025-01-06", "bed_exits": 2, "bathroom_visits": 2})
+        tracker.observe("P1", [frame("2025-01-07T09:00:00Z", "kitchen", False)])
+        state = tracker.get("P1")
+        self.assertIsNone(state["current"])
+        self.assertEqual(state["history"][0]["night"], "2025-01-06")
+        self.assertEqual(tracker.bathroom_visits("P1"), 2)
+
+class TestRiskScoreUsesNights(unittest.TestCase):
+    def test_visits_derived_from_telemetry(self):
+        client = TestClient(app)
+        frames = []
+        for i, z in enumerate(["bedroom", "bathroom", "bedroom", "bathroom", "hallway", "bathroom"]):
+            frames.append({"timestamp": "2025-01-07T02:%02d:00Z" % i, "vertical_accel_g": 1.0, "posture_angle_deg": 90.0,
+                           "movement_energy": 0.02, "zone": z, "is_in_bed": False})
+        client.post("/api/ingest", json={"patient_id": "NIGHT-01", "frames": frames})
+        base = {"gaitVelocity": 1.2, "timeToStand": 5, "recentFallsCount": 0, "age": 60}
+        self.assertEqual(client.post("/api/risk-score", json=base).json()["riskScore"], 0)
+        derived = client.post("/api/risk-score", json={**base, "patientId": "NIGHT-01"}).json()
+        self.assertEqual(derived["riskScore"], 15)
+        self.assertIn("3 night-time bathroom visits", derived["explanation"][0])
+        self.assertEqual(client.get("/api/nocturnal/NIGHT-01").json()["current"]["bathroom_visits"], 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import asyncio
+from edge.core.pipeline import EdgePipeline
+from edge.core.rate_controller import AdaptiveRateController
+from edge.main import WindowBuffer
+from edge.utils.telemetry import EdgeTelemetry
+
+class StubDriver:
+    def __init__(self, frames): self.frames = iter(frames)
+    async def connect(self): pass
+    async def get_frame(self): return next(self.frames)
+
+class TestAdaptiveRate(unittest.TestCase):
+    def setUp(self):
+        self.rate = AdaptiveRateController(active_hz=10, idle_hz=1, idle_after_s=5, energy_level=0.6, membrane_level=0.5)
+
+    def test_drops_to_idle_after_sustained_quiet(self):
+        for t in range(5):
+            self.rate.observe(float(t), 0.1, 0.0)
+            self.assertFalse(self.rate.idle)
+        self.rate.observe(5.0, 0.1, 0.0)
+        self.assertTrue(self.rate.idle)
+        self.assertEqual(self.rate.interval, 1.0)
+
+    def test_motion_or_membrane_restores_full_rate(self):
+        self.rate.observe(0.0, 0.0, 0.0)
+        self.rate.observe(10.0, 0.0, 0.0)
+        self.assertTrue(self.rate.idle)
+        self.rate.observe(11.0, 1.2, 0.0)
+        self.assertAlmostEqual(self.rate.interval, 0.1)
+        self.rate.observe(20.0, 0.0, 0.0)
+        self.rate.observe(21.0, 0.0, 0.8)
+        self.assertFalse(self.rate.idle)
+
+class TestPipeline(unittest.TestCase):
+    def test_drives_rate_and_batches_windows(self):
+        rate = AdaptiveRateController(active_hz=10, idle_hz=1, idle_after_s=5, energy_level=0.6, membrane_level=0.5)
+        ts = [i / 8 for i in range(80)]  # exact in binary, so windows split cleanly
+        radar = StubDriver({"timestamp": t, "velocity": 0.0, "acceleration": 0.0} for t in ts)
+        thermal = StubDriver({"timestamp": t, "max_temp": 36.5, "variance": 0.1} for t in ts)
+        pipeline = EdgePipeline(radar, thermal, rate=rate, telemetry=EdgeTelemetry())
+        outbox = asyncio.Queue()
+        pipeline.sink = WindowBuffer(pipeline.engine, outbox)
+        async def go():
+            for _ in ts:
+                await pipeline.step()
+        asyncio.run(go())
+        self.assertTrue(rate.idle)  # quiet frames slowed the drivers down
+        windows = [outbox.get_nowait() for _ in range(outbox.qsize())]
+        self.assertEqual(sum(len(w["frames"]) for w in windows) + len(pipeline.sink.frames), 80)
+        self.assertEqual([len(w["frames"]) for w in windows], [9] * 8)  # WINDOW_SECONDS of frames each
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+import os
+import sys
+import tempfile
+import unittest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from edge.drivers.replay_driver import ReplayDriver, save_session
+from edge.replay import replay, synthesize_session
+
+class TestReplay(unittest.TestCase):
+    def test_pairs_latest_thermal_frame(self):
+        with tempfile.TemporaryDirectory() as d:
+            save_session(d, [[0.0, 0.1, 1.0], [0.1, 0.2, 2.0], [0.2, 0.3, 3.0]],
+                         [[0.05, 36.5, 0.4], [0.15, 36.6, 0.5]])
+            pairs = list(ReplayDriver(d))
+        self.assertEqual([th["variance"] for _, th in pairs], [0.0, 0.4, 0.5])
+        self.assertEqual(pairs[2][0]["velocity"], 0.3)
+
+    def test_detects_recorded_falls(self):
+        with tempfile.TemporaryDirectory() as d:
+            synthesize_session(d, seconds=120, falls=(30.0, 90.0), seed=1)
+            report = replay(d)
+        self.assertEqual(report["frames"], 1200)
+        onsets = sorted({int(a["t"]) for a in report["alerts"]})
+        self.assertEqual(onsets, [30, 90])
+        self.assertEqual(report["evidence_bundles"], 2)
+        self.assertGreater(report["frames_per_sec"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
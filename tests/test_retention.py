@@ -0,0 +1,72 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.retention import Compactor, read_archive
+from backend.storage import Storage
+
+DAY = 86400
+NOW = 1767225600  # 2026-01-01T00:00:00Z
+
+class TestCompaction(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.db = Storage(os.path.join(self.dir.name, "test.db"))
+        rows = []
+        for i in range(30):
+            ts_ms = (NOW - 40 * DAY + i * 60) * 1000  # old telemetry, one per minute
+            rows.append(("P1", "TELEMETRY", '{"n": %d}' % i, "t", ts_ms))
+        rows.append(("P1", "CRITICAL_FALL", "{}", "t", (NOW - 40 * DAY) * 1000))
+        rows.append(("P1", "TELEMETRY", "{}", "t", (NOW - DAY) * 1000))
+        self.db.insert_events(rows)
+
+    def tearDown(self):
+        self.db.close()
+        self.dir.cleanup()
+
+    def test_old_telemetry_is_summarized_and_archived(self):
+        archive = os.path.join(self.dir.name, "archive")
+        stats = Compactor(self.db, raw_days=7, archive_dir=archive, batch=8).run_once(now=NOW)
+        self.assertEqual(stats["compacted"], 30)
+        left = self.db.conn.execute("SELECT type, count(*) FROM events GROUP BY type ORDER BY type").fetchall()
+        self.assertEqual(left, [("CRITICAL_FALL", 1), ("TELEMETRY", 1)])
+        summary = self.db.conn.execute("SELECT sum(events) FROM event_summaries WHERE type = 'TELEMETRY'").fetchone()
+        self.assertEqual(summary, (30,))
+        archived = list(read_archive(os.path.join(archive, "events-2025-11.ndjson.gz")))
+        self.assertEqual([e["details"]["n"] for e in archived], list(range(30)))
+
+    def test_second_pass_is_a_no_op(self):
+        Compactor(self.db, raw_days=7, archive_dir=os.path.join(self.dir.name, "a")).run_once(now=NOW)
+        self.assertEqual(Compactor(self.db, raw_days=7, archive_dir=os.path.join(self.dir.name, "a")).run_once(now=NOW)["compacted"], 0)
+
+    def test_concurrent_workers_count_each_row_once(self):
+        archive = os.path.join(self.dir.name, "archive")
+        others = [Storage(self.db.path) for _ in range(3)]  # one connection per worker process
+        try:
+            with ThreadPoolExecutor(len(others)) as pool:
+                stats = list(pool.map(lambda db: Compactor(db, raw_days=7, archive_dir=archive, batch=4).run_once(now=NOW), others))
+        finally:
+            for db in others: db.close()
+        self.assertEqual(sum(s["compacted"] for s in stats), 30)
+        self.assertEqual(self.db.conn.execute("SELECT sum(events) FROM event_summaries").fetchone(), (30,))
+        self.assertEqual(len(list(read_archive(os.path.join(archive, "events-2025-11.ndjson.gz")))), 30)
+
+    def test_legacy_table_is_migrated(self):
+        path = os.path.join(self.dir.name, "legacy.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, patient_id TEXT, type TEXT, details TEXT, timestamp TEXT)")
+        conn.execute("INSERT INTO events (patient_id, type, details, timestamp) VALUES ('P', 'TELEMETRY', '{}', '2025-12-12T12:30:50.500')")
+        conn.commit()
+        conn.close()
+        db = Storage(path)
+        self.assertEqual(db.conn.execute("SELECT ts_ms FROM events").fetchone(), (1765542650500,))
+        self.assertEqual(db.conn.execute("PRAGMA auto_vacuum").fetchone(), (0,))  # no full VACUUM on open
+        db.convert_to_incremental_vacuum()
+        self.assertEqual(db.conn.execute("PRAGMA auto_vacuum").fetchone(), (2,))
+        db.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from fastapi.testclient import TestClient
+from backend.rollups import RollupEngine
+from backend.storage import Storage
+from backend import server, storage
+from backend.server import app
+
+T0 = 1736157600  # 2025-01-06T10:00:00Z, on an hour boundary
+
+def frame(t, energy=0.1, g=1.0, steps=0.0):
+    return SimpleNamespace(timestamp=datetime.fromtimestamp(t, timezone.utc).isoformat(),
+                           movement_energy=energy, vertical_accel_g=g, step_rate_hz=steps)
+
+class TestRollupEngine(unittest.TestCase):
+    def test_minute_bucket_aggregates(self):
+        r = RollupEngine()
+        r.add_window("P1", [frame(T0 + 1, 0.2, 1.1, 1.5), frame(T0 + 2, 0.4, -2.8, 0.0), frame(T0 + 3, 0.6, 1.0, 2.5)], "walking")
+        (b,) = r.query("P1", 60, T0, T0 + 60)
+        self.assertEqual(b["frames"], 3)
+        self.assertEqual((b["energy"]["min"], b["energy"]["max"]), (0.2, 0.6))
+        self.assertAlmostEqual(b["energy"]["mean"], 0.4)
+        self.assertEqual(b["peak_g"], 2.8)
+        self.assertEqual(b["step_rate"], 2.0)
+        self.assertEqual(b["labels"], {"walking": 3})
+
+    def test_closed_buckets_roll_up_and_persist(self):
+        r, db = RollupEngine(), Storage(":memory:")
+        for minute in range(16):
+            r.add_window("P1", [frame(T0 + minute * 60 + 5)], "idle")
+        db.upsert_rollups(*r.drain())
+        minutes = r.query("P1", 60, T0, T0 + 3600, db.query_rollups("P1", 60, T0, T0 + 3600))
+        self.assertEqual(len(minutes), 16)
+        quarters = r.query("P1", 900, T0, T0 + 3600, db.query_rollups("P1", 900, T0, T0 + 3600))
+        self.assertEqual([q["frames"] for q in quarters], [15, 1])
+        hour = r.query("P1", 3600, T0, T0 + 3600, db.query_rollups("P1", 3600, T0, T0 + 3600))
+        self.assertEqual(hour[0]["frames"], 16)
+        self.assertEqual(hour[0]["labels"], {"idle": 16})
+
+    def test_late_frames_merge_into_stored_bucket(self):
+        r, db = RollupEngine(), Storage(":memory:")
+        r.add_window("P1", [frame(T0 + 10, 0.5)], "active")
+        r.add_window("P1", [frame(T0 + 70)], "idle")
+        db.upsert_rollups(*r.drain())
+        r.add_window("P1", [frame(T0 + 20, 0.9)], "active")
+        db.upsert_rollups(*r.drain())
+        rows, labels = db.query_rollups("P1", 60, T0, T0 + 60)
+        self.assertEqual(rows[0][1:4], (2, 0.5, 0.9))
+        self.assertEqual(labels, [(T0, "active", 2)])
+
+class TestRollupEndpoint(unittest.TestCase):
+    def test_range_query(self):
+        client = TestClient(app)
+        frames = [{"timestamp": "2025-01-06T10:00:%02dZ" % s, "vertical_accel_g": 1.0, "posture_angle_deg": 0.0,
+                   "movement_energy": 0.4, "step_rate_hz": 1.8} for s in range(10)]
+        client.post("/api/ingest", json={"patient_id": "ROLL-01", "frames": frames})
+        res = client.get("/api/rollups/ROLL-01", params={"resolution": 900, "start": T0, "end": T0 + 3600}).json()
+        self.assertEqual(res["buckets"][0]["t"], "2025-01-06T10:00:00Z")
+        self.assertEqual(res["buckets"][0]["frames"], 10)
+        self.assertEqual(res["buckets"][0]["labels"], {"walking": 10})
+        self.assertEqual(client.get("/api/rollups/ROLL-01", params={"resolution": 7}).status_code, 400)
+
+class TestFlush(unittest.TestCase):
+    def test_failed_write_is_retried_on_the_next_flush(self):
+        server.ROLLUPS.add_window("FLUSH-01", [frame(T0 + 5)], "idle")
+        server.ROLLUPS.add_window("FLUSH-01", [frame(T0 + 65)], "idle")  # closes the first minute
+        body = '{"patient_id":"FLUSH-01"}'
+        server._PENDING_EVENTS.append(("FLUSH-01", "TELEMETRY", body, "2025-01-06T10:00:05Z", (T0 + 5) * 1000))
+        db = storage.get_storage()
+        with mock.patch.object(db, "upsert_rollups", side_effect=RuntimeError("disk I/O error")):
+            with self.assertRaises(RuntimeError):
+                asyncio.run(server.flush_storage())
+        asyncio.run(server.flush_storage())
+        self.assertEqual(db.query_rollups("FLUSH-01", 60, T0, T0 + 60)[0][0][1], 1)
+        self.assertEqual(db.recent_events(5, "FLUSH-01"), [body])
+
+if __name__ == '__main__':
+    unittest.main()
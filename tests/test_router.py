@@ -0,0 +1,85 @@
+import os
+import socket
+import sys
+import tempfile
+import unittest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from collections import Counter
+import httpx
+from fastapi.testclient import TestClient
+from backend import server
+from backend.router import HashRing, create_app, spawn_shards, wait_ready
+
+PATIENT = {"display_name": "Mr S. Hard", "year_of_birth": 1941, "living_setting": "Own home", "programme": "Falls prevention", "clinical_focus": "Gait"}
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+class TestHashRing(unittest.TestCase):
+    def test_balanced_and_stable(self):
+        keys = [f"PAT-{i:05d}" for i in range(20000)]
+        three = HashRing(["a", "b", "c"])
+        counts = Counter(three.node_for(k) for k in keys)
+        self.assertLess(max(counts.values()) / min(counts.values()), 1.3)
+        four = HashRing(["a", "b", "c", "d"])
+        moved = [k for k in keys if three.node_for(k) != four.node_for(k)]
+        self.assertTrue(all(four.node_for(k) == "d" for k in moved))  # only keys taken by the new node move
+        self.assertLess(len(moved) / len(keys), 0.35)
+
+class TestRelay(unittest.TestCase):
+    def test_throttled_reply_keeps_retry_after(self):
+        def shard(request):
+            return httpx.Response(429, json={"detail": "slow down"}, headers={"Retry-After": "2"})
+        app = create_app(["http://shard-a"])
+        app.state.client = httpx.AsyncClient(transport=httpx.MockTransport(shard))
+        res = TestClient(app).post("/api/ingest", json={"patient_id": "THR-01", "frames": []})
+        self.assertEqual(res.status_code, 429)
+        self.assertEqual(res.headers["retry-after"], "2")
+        self.assertEqual(res.json(), {"detail": "slow down"})
+
+class TestRouterWithLocalShards(unittest.TestCase):
+    def test_ingest_and_events_across_processes(self):
+        ports = [free_port(), free_port()]
+        with tempfile.TemporaryDirectory() as d:
+            procs = [spawn_shards(1, p, d)[0] for p in ports]
+            try:
+                urls = [f"http://127.0.0.1:{p}" for p in ports]
+                wait_ready(urls)
+                frame = {"timestamp": "2025-01-06T10:00:00Z", "vertical_accel_g": 1.0, "posture_angle_deg": 90.0, "movement_energy": 0.1}
+                with TestClient(create_app(urls)) as router:
+                    ring = router.app.state.ring
+                    patients = [f"SHD-{i:02d}" for i in range(12)]
+                    for pid in patients:
+                        self.assertEqual(router.post("/api/ingest", json={"patient_id": pid, "frames": [frame]}).status_code, 200)
+                    for url in urls:  # each shard holds exactly its own residents
+                        owned = {e["patient_id"] for e in httpx.get(f"{url}/api/events").json()}
+                        self.assertEqual(owned, {p for p in patients if ring.node_for(p) == url})
+                    merged = router.get("/api/events", params={"limit": 50}).json()
+                    self.assertEqual({e["patient_id"] for e in merged}, set(patients))
+                    self.assertEqual([e["timestamp"] for e in merged], sorted((e["timestamp"] for e in merged), reverse=True))
+                    self.assertEqual(len(router.get("/api/events", params={"patient_id": "SHD-03"}).json()), 1)
+                    for pid in ("SHD-01", "SHD-02", "SHD-05"):  # CRUD lands on the owning shard only
+                        self.assertEqual(router.post("/api/patients", json={**PATIENT, "patient_id": pid}).status_code, 200)
+                    for url in urls:
+                        ids = {p["patient_id"] for p in httpx.get(f"{url}/api/patients").json()}
+                        self.assertEqual(ids & {"SHD-01", "SHD-02", "SHD-05"}, {p for p in ("SHD-01", "SHD-02", "SHD-05") if ring.node_for(p) == url})
+                    listed = [p["patient_id"] for p in router.get("/api/patients").json()]
+                    self.assertEqual(listed, sorted({p.patient_id for p in server.PATIENTS} | {"SHD-01", "SHD-02", "SHD-05"}))  # each resident once
+                    self.assertEqual(router.delete("/api/patients/SHD-02").status_code, 200)
+                    self.assertNotIn("SHD-02", {p["patient_id"] for p in router.get("/api/patients").json()})
+                    for pid in patients:  # per-resident views come from the shard that saw the window
+                        self.assertEqual(router.get(f"/api/nocturnal/{pid}").status_code, 200)
+                    with router.websocket_connect("/ws/device/SHD-07") as ws:
+                        self.assertEqual(ws.receive_json()["type"], "hello")
+                        ws.send_json({"seq": 1, "frames": [frame]})
+                        self.assertEqual(ws.receive_json()["status"], "ok")
+                    self.assertEqual(router.get("/api/uplink/SHD-07").json()["high_water_mark"], 1)
+            finally:
+                for p in procs:
+                    p.terminate()
+                    p.wait()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import sys
+import tempfile
+import unittest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import requests
+from fastapi.testclient import TestClient
+from backend import metrics, server
+from backend.sequences import DUPLICATE, NEW, STALE, WINDOW, DeviceSequence
+from backend.server import app
+from edge.uplink import SequenceCounter, Uplink
+
+FALL = {"timestamp": "2025-01-06T10:00:00", "vertical_accel_g": 3.9, "posture_angle_deg": 0.0, "movement_energy": 2.5}
+
+class TestDeviceSequence(unittest.TestCase):
+    def test_duplicates_gaps_and_late_fill(self):
+        dev = DeviceSequence()
+        self.assertEqual([dev.check(s) for s in (0, 1, 2)], [NEW] * 3)
+        self.assertEqual(dev.check(1), DUPLICATE)
+        self.assertEqual(dev.check(6), NEW)  # 3, 4, 5 missing
+        self.assertEqual((dev.missing, dev.gaps), (3, 3))
+        self.assertEqual(dev.check(4), NEW)  # retried late
+        self.assertEqual(dev.check(4), DUPLICATE)
+        self.assertEqual(dev.missing, 2)
+        dev.check(6 + WINDOW)
+        self.assertEqual(dev.check(6), STALE)
+        self.assertEqual(dev.check(10 ** 9), NEW)  # counter jumped: re-anchor, not a billion-window gap
+        self.assertEqual((dev.resets, dev.missing), (1, 0))
+
+class TestIdempotentIngest(unittest.TestCase):
+    def test_retry_returns_original_event_without_new_alert(self):
+        client = TestClient(app)
+        window = {"patient_id": "SEQ-01", "device_id": "DEV-SEQ-01", "seq": 7, "frames": [FALL]}
+        before = metrics.ALERTS.value("HIGH")
+        first = client.post("/api/ingest", json=window)
+        retry = client.post("/api/ingest", json=window)
+        self.assertEqual(first.content, retry.content)
+        self.assertEqual(metrics.ALERTS.value("HIGH"), before + 1)
+        self.assertEqual(len(client.get("/api/events", params={"patient_id": "SEQ-01"}).json()), 1)
+        self.assertEqual(client.get("/api/uplink/DEV-SEQ-01").json()["duplicates"], 1)
+
+    def test_failed_window_is_processed_on_retry(self):
+        client = TestClient(app, raise_server_exceptions=False)
+        window = {"patient_id": "SEQ-03", "device_id": "DEV-SEQ-03", "seq": 0, "frames": [FALL]}
+        add_window = server.ROLLUPS.add_window
+        def broken(*args, **kwargs): raise RuntimeError("disk full")
+        server.ROLLUPS.add_window = broken
+        try:
+            self.assertEqual(client.post("/api/ingest", json=window).status_code, 500)
+        finally:
+            server.ROLLUPS.add_window = add_window
+        retry = client.post("/api/ingest", json=window)
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry.json()["type"], "CRITICAL_FALL")
+        self.assertEqual(len(client.get("/api/events", params={"patient_id": "SEQ-03"}).json()), 1)
+
+class FlakySession:
+    def __init__(self, client):
+        self.client, self.down, self.sent = client, False, []
+    def post(self, url, json, timeout):
+        if self.down: raise requests.ConnectionError("offline")
+        self.sent.append(json["seq"])
+        return self.client.post("/api/ingest", json=json)
+
+class TestUplink(unittest.TestCase):
+    def test_outage_backlog_is_replayed_in_order(self):
+        session = FlakySession(TestClient(app))
+        up = Uplink("http://backend/api/ingest", "DEV-SEQ-02", session=session)
+        frame = {**FALL, "vertical_accel_g": 1.0, "movement_energy": 0.1}
+        self.assertTrue(up.send({"patient_id": "SEQ-02", "frames": [frame]}))
+        session.down = True
+        self.assertFalse(up.send({"patient_id": "SEQ-02", "frames": [frame]}))
+        self.assertFalse(up.send({"patient_id": "SEQ-02", "frames": [frame]}))
+        session.down = False
+        self.assertTrue(up.send({"patient_id": "SEQ-02", "frames": [frame]}))
+        self.assertEqual(session.sent, [0, 1, 2, 3])
+
+    def test_counter_never_reuses_numbers_across_restarts(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "dev.seq")
+            first = SequenceCounter(path, block=10)
+            taken = [first.take() for _ in range(3)]
+            self.assertGreater(SequenceCounter(path, block=10).take(), max(taken))
+
+if __name__ == '__main__':
+    unittest.main()
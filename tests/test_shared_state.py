@@ -0,0 +1,94 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import json
+from types import SimpleNamespace
+from backend.broker import BrokerClient
+from backend.nocturnal import NocturnalTracker
+from backend.patientstate import SharedPatientState
+from backend.registry import SqliteRegistry
+from backend.sequences import DUPLICATE, NEW, SequenceTracker
+from backend.server import PATIENTS, Patient
+from backend.storage import Storage
+
+class TestBroker(unittest.TestCase):
+    def test_fan_out_between_clients(self):
+        async def scenario(path):
+            inboxes = [asyncio.Queue() for _ in range(3)]
+            clients = []
+            for q in inboxes:
+                async def on_message(topic, payload, q=q): await q.put((topic, payload))
+                clients.append(await BrokerClient(on_message, path).start())
+                await asyncio.wait_for(clients[-1].connected.wait(), 2)
+            self.assertIsNotNone(clients[0].server)  # first client hosts the broker
+            self.assertIsNone(clients[1].server)
+            clients[1].publish("events", b'{"id": 1}')
+            got = [await asyncio.wait_for(inboxes[i].get(), 2) for i in (0, 2)]
+            self.assertTrue(inboxes[1].empty())  # no echo to the publisher
+            # The host goes away: a survivor takes over and delivery resumes.
+            await clients[0].close()
+            await asyncio.wait_for(clients[1].connected.wait(), 2)
+            for c in clients[1:]:
+                while not c.connected.is_set(): await asyncio.sleep(0.01)
+            await asyncio.sleep(0.05)
+            clients[2].publish("events", b"again")
+            again = await asyncio.wait_for(inboxes[1].get(), 2)
+            for c in clients[1:]: await c.close()
+            return got, again
+        with tempfile.TemporaryDirectory() as d:
+            got, again = asyncio.run(scenario(os.path.join(d, "b.sock")))
+        self.assertEqual(got, [("events", b'{"id": 1}')] * 2)
+        self.assertEqual(again, ("events", b"again"))
+
+class TestSqliteRegistry(unittest.TestCase):
+    def test_registry_is_shared_through_the_database(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "shared.db")
+            a = SqliteRegistry(Storage(path), Patient, PATIENTS)
+            b = SqliteRegistry(Storage(path), Patient, PATIENTS)  # second worker: does not reseed
+            self.assertEqual(len(b.all()), len(PATIENTS))
+            new = Patient(patient_id="SHR-1", display_name="X", year_of_birth=1950, living_setting="Home", programme="P", clinical_focus="C")
+            self.assertTrue(a.create(new))
+            self.assertFalse(b.create(new))
+            self.assertTrue(b.update("SHR-1", new.model_copy(update={"display_name": "Y"})))
+            self.assertEqual(a.all()[-1].display_name, "Y")
+            a.delete("SHR-1")
+            self.assertEqual(len(b.all()), len(PATIENTS))
+
+def night(ts, zone, in_bed):
+    return SimpleNamespace(timestamp=ts, zone=zone, is_in_bed=in_bed)
+
+class TestSharedPatientState(unittest.TestCase):
+    def test_workers_continue_each_others_state(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "shared.db")
+            workers = [SharedPatientState(Storage(path), {"nocturnal": NocturnalTracker()}, SequenceTracker()) for _ in range(2)]
+            trackers = [w.trackers["nocturnal"] for w in workers]
+            windows = [[night("2025-01-06T22:30:00Z", "bedroom", True), night("2025-01-07T01:00:00Z", "bedroom", False)],
+                       [night("2025-01-07T01:01:00Z", "bathroom", False), night("2025-01-07T01:05:00Z", "bedroom", True)],
+                       [night("2025-01-07T04:00:00Z", "hallway", False), night("2025-01-07T04:02:00Z", "bathroom", False)]]
+            for seq, frames in enumerate(windows):  # alternate workers, as a load balancer would
+                w = workers[seq % 2]
+                version = w.load("P1")
+                self.assertEqual(w.sequences.check("dev-1", seq), NEW)
+                trackers[seq % 2].observe("P1", frames)
+                self.assertTrue(w.save("P1", version, ("dev-1",)))
+            workers[1].load("P1")
+            self.assertEqual(trackers[1].get("P1")["current"], {"night": "2025-01-06", "bed_exits": 2, "bathroom_visits": 2})
+            self.assertEqual(workers[1].sequences.check("dev-1", 2), DUPLICATE)  # a retry landing on the other worker
+            stale = workers[0].load("P1")
+            self.assertTrue(workers[1].save("P1", workers[1].load("P1")))
+            self.assertFalse(workers[0].save("P1", stale))  # lost the race: the caller reruns on fresh state
+
+    def test_legacy_event_rows_are_returned_as_events(self):
+        db = Storage(":memory:")
+        db.conn.execute("INSERT INTO events (patient_id, type, details, timestamp, ts_ms) VALUES ('OLD-1', 'TELEMETRY', '{\"peak_g\": 0.97}', '2025-12-12T12:30:50', 1765542650000)")
+        event = json.loads(db.recent_events(10)[0])
+        self.assertEqual((event["patient_id"], event["type"], event["details"]), ("OLD-1", "TELEMETRY", {"peak_g": 0.97}))
+        self.assertTrue(event["id"])
+
+if __name__ == '__main__':
+    unittest.main()
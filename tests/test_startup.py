@@ -0,0 +1,39 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import unittest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from fastapi.testclient import TestClient
+from backend import events, server, storage
+from backend.statesync import ALERT
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+class TestStartup(unittest.TestCase):
+    def test_optional_subsystems_are_not_imported_up_front(self):
+        code = "import sys, backend.server; print(sorted(m for m in ('uvicorn', 'numpy', 'backend.broker', 'backend.mqtt_ingest', 'backend.retention') if m in sys.modules))"
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True,
+                             env={**os.environ, "HAKILIX_DB": ":memory:"}).stdout
+        self.assertEqual(out.strip(), "[]")
+
+    def test_warm_up_loads_alerts_in_bulk_then_reports_ready(self):
+        ts_ms = events.to_ms(server.datetime.utcnow())
+        body = json.dumps({"fall": {"severity": "HIGH"}})
+        stale_ms = ts_ms - int(server.ALERT_TTL_S * 1000) - 60_000  # already dealt with before the restart
+        storage.get_storage().insert_events([("WARM-01", "CRITICAL_FALL", body, events.ms_to_iso(ts_ms), ts_ms),
+                                             ("WARM-02", "CRITICAL_FALL", body, events.ms_to_iso(stale_ms), stale_ms)])
+        client = TestClient(server.app)
+        server.READY.clear()
+        self.assertEqual(client.get("/api/ready").status_code, 503)
+        asyncio.run(server.warm_up())
+        self.assertEqual(server.STATE.get(ALERT)["WARM-01"]["severity"], "HIGH")
+        self.assertNotIn("WARM-02", server.STATE.get(ALERT))
+        ready = client.get("/api/ready")
+        self.assertEqual(ready.status_code, 200)
+        self.assertGreaterEqual(ready.json()["patients"], 1)
+        self.assertIsNotNone(server.WEB_INDEX)
+
+if __name__ == '__main__':
+    unittest.main()
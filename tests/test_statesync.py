@@ -0,0 +1,85 @@
+import os
+import sys
+import tempfile
+import unittest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from fastapi.testclient import TestClient
+from backend.server import app
+from backend.statesync import ALERT, PATIENT, STATUS, SqliteStateLog, StateLog
+from backend.storage import Storage
+
+FALL = {"timestamp": "2025-01-06T10:00:00", "vertical_accel_g": 3.9, "posture_angle_deg": 0.0, "movement_energy": 2.5}
+NEW = {"patient_id": "SYNC-01", "display_name": "Mr S. Sync", "year_of_birth": 1944, "living_setting": "Own home", "programme": "Falls prevention", "clinical_focus": "Gait"}
+
+class TestStateLog(unittest.TestCase):
+    def test_delta_sends_each_changed_key_once(self):
+        log = StateLog()
+        log.set(PATIENT, "A", {"n": 1})
+        rev = log.rev
+        for label in ("idle", "walking", "idle", "walking"): log.set(STATUS, "A", label)
+        self.assertIsNone(log.set(STATUS, "A", "walking"))  # unchanged: no new revision
+        log.delete(PATIENT, "A")
+        delta = log.changes_since(rev, log.epoch)
+        self.assertFalse(delta["reset"])
+        self.assertEqual([(c["kind"], c["value"]) for c in delta["changes"]], [(STATUS, "walking"), (PATIENT, None)])
+        self.assertEqual(delta["rev"], rev + 5)
+        self.assertTrue(log.changes_since(rev, "another-worker")["reset"])
+
+    def test_pruned_tombstones_force_a_snapshot(self):
+        log = StateLog(max_tombstones=4)
+        for i in range(10):
+            log.set(PATIENT, str(i), i)
+            log.delete(PATIENT, str(i))
+        log.set(PATIENT, "live", 1)
+        self.assertLessEqual(log.tombstones, 4)
+        snapshot = log.changes_since(1, log.epoch)
+        self.assertTrue(snapshot["reset"])
+        self.assertEqual([c["key"] for c in snapshot["changes"]], ["live"])
+
+    def test_workers_share_one_revision_sequence(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "shared.db")
+            a, b = SqliteStateLog(Storage(path), max_tombstones=4), SqliteStateLog(Storage(path), max_tombstones=4)
+            self.assertEqual(a.epoch, b.epoch)
+            base = a.changes_since()["rev"]
+            a.set(PATIENT, "A", {"n": 1})
+            b.set(STATUS, "A", "walking")
+            self.assertIsNone(a.set(STATUS, "A", "walking"))
+            a.delete(PATIENT, "A")
+            delta = b.changes_since(base, a.epoch)  # a client of worker a catching up from worker b
+            self.assertFalse(delta["reset"])
+            self.assertEqual([(c["rev"], c["kind"], c["value"]) for c in delta["changes"]],
+                             [(base + 2, STATUS, "walking"), (base + 3, PATIENT, None)])
+            for i in range(10):
+                b.set(PATIENT, str(i), i)
+                b.delete(PATIENT, str(i))
+            self.assertTrue(a.changes_since(base, a.epoch)["reset"])
+            self.assertEqual(a.get(STATUS), {"A": "walking"})
+
+class TestStateApi(unittest.TestCase):
+    def test_crud_and_alerts_arrive_as_deltas(self):
+        with TestClient(app) as client:  # one event loop for the socket and the requests
+            base = client.get("/api/state").json()
+            with client.websocket_connect(f"/ws/state?since={base['rev']}&epoch={base['epoch']}") as ws:
+                self.assertEqual(ws.receive_json()["changes"], [])
+                client.post("/api/patients", json=NEW)
+                client.post("/api/ingest", json={"patient_id": "SYNC-01", "frames": [FALL]})
+                client.delete("/api/patients/SYNC-01")
+                pushed = [ws.receive_json() for _ in range(4)]
+            delta = client.get("/api/state", params={"since": base["rev"], "epoch": base["epoch"]}).json()
+        self.assertEqual([m["from"] for m in pushed], [base["rev"] + i for i in range(4)])
+        self.assertEqual([c["kind"] for m in pushed for c in m["changes"]], ["patient", "status", "alert", "patient"])
+        self.assertEqual(delta["rev"], base["rev"] + 4)
+        self.assertEqual({(c["kind"], c["key"]) for c in delta["changes"]}, {("patient", "SYNC-01"), ("status", "SYNC-01"), ("alert", "SYNC-01")})
+
+    def test_clearing_an_alert(self):
+        with TestClient(app) as client:
+            client.post("/api/ingest", json={"patient_id": "SYNC-02", "frames": [FALL]})
+            base = client.get("/api/state").json()
+            self.assertIn(("alert", "SYNC-02"), {(c["kind"], c["key"]) for c in base["changes"]})
+            self.assertEqual(client.delete("/api/alerts/SYNC-02").status_code, 200)
+            delta = client.get("/api/state", params={"since": base["rev"], "epoch": base["epoch"]}).json()
+        self.assertEqual(delta["changes"], [{"rev": base["rev"] + 1, "kind": ALERT, "key": "SYNC-02", "value": None}])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from fastapi.testclient import TestClient
+from backend.server import app
+from edge.utils.telemetry import EdgeTelemetry, FixedHistogram
+
+class TestEdgeTelemetry(unittest.TestCase):
+    def test_histogram_quantiles_and_reset(self):
+        h = FixedHistogram((0.001, 0.01, 0.1))
+        for v in [0.0005] * 98 + [0.05, 3.0]:
+            h.observe(v)
+        self.assertEqual(h.quantile(0.5), 0.001)
+        self.assertEqual(h.quantile(0.99), 0.1)
+        self.assertEqual(h.quantile(1.0), 3.0)
+        counts = h.counts
+        h.reset()
+        self.assertIs(h.counts, counts)
+        self.assertEqual((h.n, sum(h.counts)), (0, 0))
+
+    def test_late_and_dropped_frames(self):
+        tel = EdgeTelemetry(sensors=("radar",), summary_seconds=10)
+        for t in (0.0, 0.1, 0.2, 0.5, 0.6):
+            tel.frame("radar", t, 0.1)
+        tel.retry()
+        self.assertIsNone(tel.maybe_summary(now=tel._window_start + 1))
+        summary = tel.maybe_summary(now=tel._window_start + 10)
+        radar = summary["sensors"]["radar"]
+        self.assertEqual((radar["n"], radar["late"], radar["dropped"]), (4, 1, 2))
+        self.assertEqual(summary["uplink_retries"], 1)
+        self.assertEqual(tel.uplink_retries, 0)
+
+    def test_summary_piggybacks_on_ingest(self):
+        client = TestClient(app)
+        frame = {"timestamp": "2025-01-06T10:00:00", "vertical_accel_g": 1.0, "posture_angle_deg": 90.0, "movement_energy": 0.2}
+        summary = {"window_s": 60.0, "decision_ms": {"n": 60, "p50": 2.5, "p99": 10.0, "max": 12.0}, "sensors": {}, "uplink_retries": 3}
+        client.post("/api/ingest", json={"patient_id": "TEL-01", "frames": [frame], "telemetry": summary})
+        self.assertEqual(client.get("/api/edge-health").json()["TEL-01"]["uplink_retries"], 3)
+        self.assertIn('hakilix_edge_uplink_retries{patient_id="TEL-01"} 3', client.get("/metrics").text)
+
+    def test_malformed_summary_is_refused(self):
+        client = TestClient(app)
+        frame = {"timestamp": "2025-01-06T10:00:00", "vertical_accel_g": 1.0, "posture_angle_deg": 90.0, "movement_energy": 0.2}
+        for bad in ({"decision_ms": 5}, {"sensors": {"radar": [1, 2]}}, {"uplink_retries": -1}):
+            res = client.post("/api/ingest", json={"patient_id": "TEL-02", "frames": [frame], "telemetry": bad})
+            self.assertEqual(res.status_code, 422)
+        self.assertNotIn("TEL-02", client.get("/api/edge-health").json())
+        self.assertEqual(client.get("/metrics").status_code, 200)
+
+if __name__ == '__main__':
+    unittest.main()
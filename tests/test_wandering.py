@@ -0,0 +1,71 @@
+import os
+import random
+import sys
+import unittest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from fastapi.testclient import TestClient
+from backend.wandering import WanderingDetector
+from backend.server import app
+
+DAY0 = 1736157600  # 2025-01-06T10:00:00Z
+NIGHT0 = DAY0 + 15 * 3600  # 01:00 the next morning
+
+def frames(zones, t0, step=20):
+    return [SimpleNamespace(timestamp=datetime.fromtimestamp(t0 + i * step, timezone.utc).isoformat(), zone=z)
+            for i, z in enumerate(zones)]
+
+class TestWandering(unittest.TestCase):
+    def test_pacing_loop_is_flagged_once(self):
+        d = WanderingDetector()
+        notes = d.observe("P1", frames(["hallway", "kitchen"] * 10, DAY0))
+        self.assertTrue(d.is_wandering("P1"))
+        self.assertEqual(len(notes), 1)
+        self.assertEqual(d.observe("P1", frames(["hallway", "kitchen"] * 2, DAY0 + 400)), [])
+
+    def test_flag_clears_while_resident_stays_put(self):
+        d = WanderingDetector()
+        d.observe("P1", frames(["hallway", "kitchen"] * 10, DAY0))
+        self.assertTrue(d.is_wandering("P1"))
+        d.observe("P1", frames(["kitchen"] * 3, DAY0 + 1200, step=60))  # 20 minutes sitting in the kitchen
+        self.assertFalse(d.is_wandering("P1"))
+        d.observe("P1", frames(["kitchen"], DAY0 + 24 * 3600))
+        self.assertFalse(d.is_wandering("P1"))
+        self.assertEqual(d.get("P1")["window_transitions"], 0)
+
+    def test_aimless_movement_is_flagged(self):
+        rng, zones = random.Random(3), ["bedroom"]
+        while len(zones) < 20:
+            z = rng.choice(["bedroom", "bathroom", "kitchen", "living_room", "hallway"])
+            if z != zones[-1]: zones.append(z)
+        d = WanderingDetector()
+        d.observe("P1", frames(zones, DAY0))
+        self.assertTrue(d.is_wandering("P1"))
+        self.assertGreater(d.get("P1")["entropy_bits"], 1.8)
+
+    def test_ordinary_day_is_not_flagged(self):
+        d = WanderingDetector()
+        zones = ["bedroom", "bathroom", "kitchen", "living_room", "kitchen", "living_room", "bathroom", "bedroom"]
+        d.observe("P1", frames(zones, DAY0, step=900))
+        self.assertFalse(d.is_wandering("P1"))
+
+    def test_rare_night_move(self):
+        d = WanderingDetector()
+        for night in range(60):  # bedroom <-> bathroom trips every night
+            d.observe("P1", frames(["bedroom", "bathroom", "bedroom"], NIGHT0 + night * 86400, step=300))
+        notes = d.observe("P1", frames(["bedroom", "hallway"], NIGHT0 + 61 * 86400, step=300))
+        self.assertEqual(notes, ["Unusual night-time movement: bedroom -> hallway"])
+
+class TestWanderingIngest(unittest.TestCase):
+    def test_ingest_sets_potential_risk(self):
+        client = TestClient(app)
+        window = [{"timestamp": datetime.fromtimestamp(DAY0 + i * 10, timezone.utc).isoformat(), "vertical_accel_g": 1.0,
+                   "posture_angle_deg": 90.0, "movement_energy": 0.4, "zone": "hallway" if i % 2 else "kitchen"} for i in range(20)]
+        event = client.post("/api/ingest", json={"patient_id": "WANDER-01", "frames": window}).json()
+        self.assertTrue(event["activity"]["is_potential_risk"])
+        self.assertTrue(event["activity"]["narrative"][0].startswith("Possible wandering"))
+        self.assertTrue(client.get("/api/wandering/WANDER-01").json()["wandering"])
+
+if __name__ == '__main__':
+    unittest.main()